@@ -0,0 +1,84 @@
+"""Cost of re-reading an unchanged task with a large ``data`` blob.
+
+Compares a full fetch with ``get_task(fresh=True)`` revalidating the recorded task (``If-None-Match``
+answered with ``304 Not Modified``). Requests are served in-process by a stand-in for the API that
+honours ETags. Reports the time per call and the response body bytes received.
+
+    python -m benchmarks.bench_conditional_get
+"""
+
+import hashlib
+import json
+import timeit
+import warnings
+from unittest import mock
+
+import httpx
+
+from taskbadger import get_task
+from taskbadger._registry import registry
+from taskbadger.sdk import init
+
+TASK = {
+    "id": "0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+    "organization": "org",
+    "project": "project",
+    "name": "process upload",
+    "status": "success",
+    "value": 100,
+    "value_max": 100,
+    "value_percent": 100,
+    "data": {"rows": [{"line": i, "file": "import.csv", "errors": []} for i in range(2000)]},
+    "created": "2024-05-01T10:00:00.123456Z",
+    "updated": "2024-05-01T10:05:00.654321Z",
+    "start_time": "2024-05-01T10:00:01.000000Z",
+    "end_time": "2024-05-01T10:05:00.654321Z",
+    "time_to_start": "1.0",
+    "max_runtime": None,
+    "stale_timeout": None,
+    "url": "https://taskbadger.net/org/project/tasks/0f1e2d3c4b5a69788796a5b4c3d2e1f0/",
+    "public_url": None,
+    "tags": {"worker": "w1"},
+}
+BODY = json.dumps(TASK).encode()
+ETAG = f'"{hashlib.sha1(BODY).hexdigest()}"'
+received = []
+
+
+def _serve(transport, request):
+    if request.headers.get("If-None-Match") == ETAG:
+        response = httpx.Response(304, headers={"ETag": ETAG})
+    else:
+        response = httpx.Response(200, content=BODY, headers={"ETag": ETAG, "Content-Type": "application/json"})
+    received.append(len(response.content))
+    return response
+
+
+def full():
+    registry.reset()
+    return get_task(TASK["id"], fresh=True)
+
+
+def conditional():
+    return get_task(TASK["id"], fresh=True)
+
+
+def main(number=200):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token")
+
+    with mock.patch.object(httpx.HTTPTransport, "handle_request", _serve):
+        results = {}
+        for fn in (full, conditional):
+            fn()
+            received.clear()
+            best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+            results[fn.__name__] = best
+            per_call = sum(received) / len(received)
+            print(f"{fn.__name__:>12}: {best * 1e3:.2f} ms/call, {per_call:,.0f} body bytes/call")
+    print(f"     speedup: {results['full'] / results['conditional']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
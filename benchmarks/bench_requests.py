@@ -0,0 +1,61 @@
+"""Per-call CPU cost of building task update requests.
+
+Compares the generated endpoint path (``PatchedTaskRequest`` model, ``to_dict`` and URL quoting on
+every call; httpx then encodes the body with the standard library) with the lean path used by
+``update_task(return_task=False)``, which also encodes the body. No requests are sent.
+
+    python -m benchmarks.bench_requests
+"""
+
+import json
+import timeit
+import warnings
+
+from taskbadger import StatusEnum
+from taskbadger._requests import update_body, update_request
+from taskbadger.internal.api.task_endpoints import task_partial_update
+from taskbadger.sdk import _update_task_args, init
+
+FIELDS = dict(
+    name=None,
+    status=StatusEnum.PROCESSING,
+    value=50,
+    value_max=None,
+    data={"rows": 500, "file": "import.csv"},
+    max_runtime=None,
+    stale_timeout=None,
+    actions=None,
+    tags={"worker": "w1"},
+    queue=None,
+    external_id=None,
+)
+
+
+def generated():
+    kwargs = _update_task_args("0f1e2d3c4b5a69788796a5b4c3d2e1f0", *FIELDS.values())
+    request = task_partial_update._get_kwargs(**kwargs)
+    json.dumps(request["json"])
+    return request
+
+
+def lean():
+    body = update_body(*FIELDS.values())
+    return update_request("org", "project", "0f1e2d3c4b5a69788796a5b4c3d2e1f0", body)
+
+
+def main(number=50_000):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token")
+    assert generated()["json"] == json.loads(lean()["content"])
+
+    results = {}
+    for fn in (generated, lean):
+        best = min(timeit.repeat(fn, number=number, repeat=5))
+        results[fn.__name__] = best / number * 1e6
+        print(f"{fn.__name__:>10}: {results[fn.__name__]:.2f} µs/call")
+    print(f"   speedup: {results['generated'] / results['lean']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cost of entering a scope per request.
+
+Each request enters a scope, adds a value and builds the data of a new task from it, as
+``create_task`` does. Compares deep-copying the scope on enter (the previous implementation) with
+layered scopes. The process-wide scope holds 50 values, including a few lists and dicts.
+
+    python -m benchmarks.bench_scope
+"""
+
+import timeit
+from copy import deepcopy
+
+from taskbadger.mug import Scope
+
+CONTEXT = {f"key{i}": f"value{i}" for i in range(40)}
+CONTEXT.update({f"list{i}": list(range(10)) for i in range(5)})
+CONTEXT.update({f"dict{i}": {"a": 1, "b": [1, 2]} for i in range(5)})
+TAGS = {"env": "prod", "region": "eu-west-1", "service": "api"}
+
+
+class DeepCopyScope:
+    def __init__(self):
+        self.stack = []
+        self.context = dict(CONTEXT)
+        self.tags = dict(TAGS)
+
+    def __enter__(self):
+        self.stack.append((self.context, self.tags))
+        self.context = deepcopy(self.context)
+        self.tags = deepcopy(self.tags)
+        return self
+
+    def __exit__(self, *args):
+        self.context, self.tags = self.stack.pop()
+
+
+def _layered_scope():
+    scope = Scope()
+    scope.context.update(CONTEXT)
+    scope.tag(TAGS)
+    return scope
+
+
+DEEPCOPY = DeepCopyScope()
+LAYERED = _layered_scope()
+
+
+def deepcopy_scope():
+    with DEEPCOPY as scope:
+        scope.context["request_id"] = "abc"
+        return {**scope.context, **{"rows": 1}}, {**scope.tags}
+
+
+def layered():
+    with LAYERED as scope:
+        scope["request_id"] = "abc"
+        return scope.merge_data({"rows": 1}), scope.merge_tags()
+
+
+def main(number=5000):
+    assert deepcopy_scope() == layered()
+    results = {}
+    for fn in (deepcopy_scope, layered):
+        best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        results[fn.__name__] = best
+        print(f"{fn.__name__:>15}: {best * 1e6:.2f} µs/request")
+    print(f"        speedup: {results['deepcopy_scope'] / results['layered']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Cost of parsing a page of 1,000 tasks.
+
+Compares the generated ``PaginatedTaskList.from_dict`` with the lazy page returned by ``list_tasks``,
+reading the five columns shown by ``taskbadger list``. Reports the time per page and the number of
+memory blocks still allocated for the page (from ``tracemalloc``).
+
+    python -m benchmarks.bench_task_parsing
+"""
+
+import gc
+import json
+import timeit
+import tracemalloc
+
+from taskbadger._lazy import task_page
+from taskbadger.internal.models import PaginatedTaskList
+
+TASK = {
+    "id": "0f1e2d3c4b5a69788796a5b4c3d2e1f0",
+    "organization": "org",
+    "project": "project",
+    "name": "process upload",
+    "status": "success",
+    "value": 100,
+    "value_max": 100,
+    "value_percent": 100,
+    "data": {"rows": 500, "file": "import.csv"},
+    "created": "2024-05-01T10:00:00.123456Z",
+    "updated": "2024-05-01T10:05:00.654321Z",
+    "start_time": "2024-05-01T10:00:01.000000Z",
+    "end_time": "2024-05-01T10:05:00.654321Z",
+    "time_to_start": "1.0",
+    "max_runtime": None,
+    "stale_timeout": None,
+    "url": "https://taskbadger.net/org/project/tasks/0f1e2d3c4b5a69788796a5b4c3d2e1f0/",
+    "public_url": None,
+    "tags": {"worker": "w1"},
+}
+PAGE = json.dumps({"results": [TASK] * 1000, "next": None, "previous": None})
+
+
+def _columns(page):
+    for task in page.results:
+        (task.id, task.created.isoformat(), task.name, task.status, task.value_percent)
+
+
+def generated():
+    page = PaginatedTaskList.from_dict(json.loads(PAGE))
+    _columns(page)
+    return page
+
+
+def lazy():
+    page = task_page(json.loads(PAGE))
+    _columns(page)
+    return page
+
+
+def _blocks(fn):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    page = fn()  # noqa: F841 (keep the page alive for the snapshot)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+
+def main(number=20):
+    results = {}
+    for fn in (generated, lazy):
+        best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+        results[fn.__name__] = best
+        print(f"{fn.__name__:>10}: {best * 1e3:.2f} ms/1000 tasks, {_blocks(fn)} blocks allocated")
+    print(f"   speedup: {results['generated'] / results['lazy']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
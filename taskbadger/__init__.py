@@ -1,9 +1,32 @@
 from .decorators import track
 from .integrations import Action, EmailIntegration, WebhookIntegration
 from .internal.models import StatusEnum
-from .mug import Badger, Session
-from .safe_sdk import create_task_safe, update_task_safe
-from .sdk import DefaultMergeStrategy, Task, create_task, get_task, init, update_task
+from .mug import (
+    AsyncSession,
+    Badger,
+    CircuitBreakerPolicy,
+    DispatchConfig,
+    RateLimitPolicy,
+    RetryPolicy,
+    Session,
+    SpoolConfig,
+    TaskCacheConfig,
+    TransportConfig,
+)
+from .pipeline import create_task_future, pipeline, update_task_future
+from .safe_sdk import circuit_breaker_state, create_task_safe, task_cache_stats, update_task_safe
+from .sdk import (
+    AsyncTask,
+    DefaultMergeStrategy,
+    Task,
+    create_task,
+    create_task_async,
+    get_task,
+    get_task_async,
+    init,
+    update_task,
+    update_task_async,
+)
 
 __all__ = [
     "track",
@@ -12,15 +35,32 @@ __all__ = [
     "WebhookIntegration",
     "StatusEnum",
     "Badger",
+    "AsyncSession",
     "Session",
+    "TransportConfig",
+    "RetryPolicy",
+    "CircuitBreakerPolicy",
+    "RateLimitPolicy",
+    "DispatchConfig",
+    "SpoolConfig",
+    "TaskCacheConfig",
     "create_task_safe",
     "update_task_safe",
+    "circuit_breaker_state",
+    "task_cache_stats",
+    "create_task_future",
+    "update_task_future",
+    "pipeline",
     "DefaultMergeStrategy",
     "Task",
+    "AsyncTask",
     "create_task",
+    "create_task_async",
     "get_task",
+    "get_task_async",
     "init",
     "update_task",
+    "update_task_async",
 ]
 
 from importlib.metadata import PackageNotFoundError, version
@@ -0,0 +1,188 @@
+"""Process-wide circuit breaker for API requests. Not part of the public API.
+
+When ``TransportConfig.circuit_breaker`` is set, the pooled clients wrap their
+transport in a ``BreakerTransport`` which records the outcome of every
+request (after retries) on the shared ``circuit_breaker``:
+
+* closed: requests are sent. ``failure_threshold`` consecutive failures
+  (transport errors, timeouts, 5xx and 429 responses) open the circuit.
+* open: requests fail immediately with ``CircuitOpen`` instead of waiting for
+  a timeout. After ``reset_timeout`` the circuit becomes half-open.
+* half-open: a single probe request is let through. Success closes the
+  circuit, failure opens it again.
+
+``safe_sdk`` checks ``is_open`` before sending so calls made while the circuit
+is open are skipped (or queued for later if ``spill`` is enabled) without
+logging an error for each one.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+
+import httpx
+
+from .exceptions import CircuitOpen, DeadlineExceeded
+
+log = logging.getLogger("taskbadger")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.reset_timeout = 0.0
+        self.short_circuited = 0
+        self._probing = False
+
+    def is_open(self) -> bool:
+        """True while requests are being short-circuited. Does not claim the half-open probe."""
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN and time.monotonic() >= self.opened_at + self.reset_timeout:
+            return False
+        return self.state == OPEN or self._probing
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 if requests can be sent now)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.opened_at + self.reset_timeout:
+                log.info("Circuit breaker half-open, probing the Task Badger API")
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_skipped(self) -> None:
+        """Count a call that was skipped by the caller because the circuit is open."""
+        with self._lock:
+            self.short_circuited += 1
+
+    def release(self) -> None:
+        """Give up the half-open probe without recording an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                log.info("Circuit breaker closed")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self, policy) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.consecutive_failures >= policy.failure_threshold:
+                if self.state != OPEN:
+                    log.warning(
+                        "Circuit breaker opened after %s consecutive failures, pausing requests for %ss",
+                        self.consecutive_failures,
+                        policy.reset_timeout,
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.reset_timeout = policy.reset_timeout
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "short_circuited": self.short_circuited,
+            "retry_in": self.retry_in(),
+        }
+
+
+circuit_breaker = CircuitBreaker()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=circuit_breaker.reset)
+
+
+def is_failure(response: httpx.Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class BreakerTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, policy, breaker: CircuitBreaker = None):
+        self.transport = transport
+        self.policy = policy
+        self.breaker = breaker or circuit_breaker
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpen(self.breaker.retry_in())
+        try:
+            response = self.transport.handle_request(request)
+        except DeadlineExceeded:
+            # the request was never sent so this says nothing about the API
+            self.breaker.release()
+            raise
+        except httpx.TransportError:
+            self.breaker.record_failure(self.policy)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        _record(self.breaker, self.policy, response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncBreakerTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy, breaker: CircuitBreaker = None):
+        self.transport = transport
+        self.policy = policy
+        self.breaker = breaker or circuit_breaker
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.breaker.allow():
+            raise CircuitOpen(self.breaker.retry_in())
+        try:
+            response = await self.transport.handle_async_request(request)
+        except DeadlineExceeded:
+            self.breaker.release()
+            raise
+        except httpx.TransportError:
+            self.breaker.record_failure(self.policy)
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        _record(self.breaker, self.policy, response)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _record(breaker: CircuitBreaker, policy, response: httpx.Response) -> None:
+    if is_failure(response):
+        breaker.record_failure(policy)
+    else:
+        breaker.record_success()
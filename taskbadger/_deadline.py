@@ -0,0 +1,124 @@
+"""End-to-end time budget for integration hooks. Not part of the public API.
+
+``hook_deadline`` is applied to each integration hook (Celery signal handlers,
+Procrastinate status updates and ``track``). If ``init`` was given a
+``hook_deadline`` it sets a deadline in a context variable which is enforced
+for every request made within the hook:
+
+* ``DeadlineTransport`` (the innermost transport of the pooled clients) caps
+  the connect/read/write/pool timeouts of each attempt to the time remaining,
+  and fails requests immediately with ``DeadlineExceeded`` once it is spent.
+* ``RetryTransport`` doesn't retry if the backoff would overrun the deadline.
+  Without a ``hook_deadline`` requests made within a hook aren't retried at
+  all so a failing API can't block the application for the whole backoff.
+
+A hook that does several requests (e.g. a GET followed by a PATCH) therefore
+shares a single budget. Updates that run out of time are handed to the
+background dispatcher by ``safe_sdk`` rather than dropped. Nested hooks keep
+the earlier deadline.
+
+The background dispatch thread runs in its own context and is not subject to
+any deadline.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from contextvars import ContextVar
+
+import httpx
+
+from .exceptions import DeadlineExceeded
+
+_deadline: ContextVar[float | None] = ContextVar("taskbadger_deadline", default=None)
+_in_hook: ContextVar[bool] = ContextVar("taskbadger_in_hook", default=False)
+
+TIMEOUT_KEYS = ("connect", "read", "write", "pool")
+
+
+@contextlib.contextmanager
+def hook_deadline():
+    """Limit the time spent on API requests by the enclosed hook to the configured ``hook_deadline``.
+
+    Can be used as a context manager or as a decorator.
+    """
+    # imported here to avoid a circular import: mug imports the transports from this module
+    from .mug import GLOBAL_MUG, _local
+
+    # read the settings without binding a Badger to the current context (see ``Badger.current``)
+    settings = (_local.get(None) or GLOBAL_MUG).settings
+    budget = settings.hook_deadline if settings is not None else None
+    hook_token = _in_hook.set(True)
+    if budget is None:
+        try:
+            yield
+        finally:
+            _in_hook.reset(hook_token)
+        return
+
+    deadline = time.monotonic() + budget
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+        _in_hook.reset(hook_token)
+
+
+def remaining() -> float | None:
+    """Time left before the current deadline (seconds) or None if there is no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def in_hook() -> bool:
+    """True within ``hook_deadline``, whether or not a deadline is configured."""
+    return _in_hook.get()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def _apply_deadline(request: httpx.Request) -> None:
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineExceeded("Tracking deadline exceeded", request=request)
+    timeout = dict(request.extensions.get("timeout", {}))
+    for key in TIMEOUT_KEYS:
+        value = timeout.get(key)
+        timeout[key] = left if value is None else min(value, left)
+    request.extensions["timeout"] = timeout
+
+
+class DeadlineTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_deadline(request)
+        return self.transport.handle_request(request)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncDeadlineTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_deadline(request)
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
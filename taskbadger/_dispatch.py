@@ -0,0 +1,282 @@
+"""Background dispatch of task updates. Not part of the public API.
+
+When ``init`` is given a ``DispatchConfig``, task updates made via
+``update_task_safe``, ``Task.update`` and the integration hooks are put on an
+in-process queue and sent by a single daemon thread using the pooled client.
+API latency therefore no longer adds to the runtime of the code being tracked.
+
+Updates to the same task that are still waiting to be sent are coalesced:
+later field values replace earlier ones (tags are merged) so a burst of
+progress updates results in a single PATCH per ``coalesce_window``. Updates
+for different tasks are sent in the order they were first queued.
+
+Queued updates are kept in two lanes. Updates that move a task to a terminal
+state (``_integrations.TERMINAL_STATES``) go in the high-priority lane: they
+are sent first, without waiting for the coalesce window, and are never
+dropped. A progress update already queued for the task is merged in and moves
+with it. All other updates go in the low-priority lane which holds at most
+``max_queue_size`` tasks. When it is full the ``overflow`` policy applies:
+``inline`` makes ``submit_update`` return False so the caller sends the update
+itself (back-pressure), ``drop_oldest`` drops the oldest queued progress
+update (memory stays flat and the caller never blocks).
+
+Queued updates are numbered per task (see ``_sequence``): an update is not
+sent if a newer one to the same task has already been acknowledged and never
+moves a task out of a terminal state this process has sent.
+
+Creates are always sent inline since every caller needs the id assigned by
+the server.
+
+While the circuit breaker is open the background thread holds queued updates
+(still coalescing them) until a probe request is allowed. ``spill_update`` is
+used by ``safe_sdk`` to queue updates while the circuit is open even if
+background dispatch is not otherwise enabled.
+
+Updates that fail because the API is unavailable, or that are still queued
+when ``flush`` times out, are saved to the on-disk spool if one is configured.
+
+The queue is flushed at interpreter exit and on Celery worker shutdown, and
+discarded in forked children (the parent still owns and sends those items).
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from ._breaker import circuit_breaker
+from ._sequence import is_terminal, sending, sequencer
+from ._spool import is_transient, spool
+from .mug import Badger, DispatchConfig, _local
+
+log = logging.getLogger("taskbadger")
+
+
+class PendingUpdate:
+    """Fields waiting to be sent for a single task."""
+
+    def __init__(self, mug, task_id, seq, fields):
+        self.mug = mug
+        self.task_id = task_id
+        # sequence number of the latest update merged in
+        self.seq = seq
+        self.fields = {}
+        self.queued_at = time.monotonic()
+        self.merge(fields)
+
+    def merge(self, fields: dict):
+        for key, value in fields.items():
+            if value is None:
+                continue
+            if key == "tags":
+                value = {**self.fields.get("tags", {}), **value}
+            elif key == "actions":
+                value = self.fields.get("actions", []) + list(value)
+            self.fields[key] = value
+
+
+class Dispatcher:
+    def __init__(self):
+        self.flush_timeout = 5.0
+        self.coalesce_window = 0.0
+        self.reset()
+
+    def submit_update(self, task_id: str, **fields) -> bool:
+        """Queue an update for ``task_id`` to be sent from the background thread.
+
+        Returns:
+            bool: True if the update was queued. False if background dispatch is not
+            enabled, the queue is full (and the overflow policy is ``inline``) or this is
+            called from the background thread itself. In that case the caller should send
+            the update inline.
+        """
+        if not Badger.is_configured():
+            return False
+        return self._submit(task_id, fields, Badger.current.settings.dispatch)
+
+    def spill_update(self, task_id: str, **fields) -> bool:
+        """Queue an update to be sent once the circuit breaker allows it, using the default
+        ``DispatchConfig`` if background dispatch is not enabled.
+
+        Returns:
+            bool: True if the update was queued.
+        """
+        if not Badger.is_configured():
+            return False
+        return self._submit(task_id, fields, Badger.current.settings.dispatch or DispatchConfig())
+
+    def _submit(self, task_id: str, fields: dict, config: DispatchConfig | None) -> bool:
+        if config is None or threading.current_thread() is self._thread:
+            return False
+
+        terminal = is_terminal(fields.get("status"))
+        with self._cond:
+            pending = self._high.get(task_id) or self._low.get(task_id)
+            if pending is not None:
+                pending.merge(fields)
+                pending.seq = sequencer.next(task_id)
+                if terminal and task_id in self._low:
+                    self._high[task_id] = self._low.pop(task_id)
+                    self._cond.notify()
+                return True
+
+            if not terminal and len(self._low) >= config.max_queue_size:
+                if config.overflow != "drop_oldest" or not self._low:
+                    log.debug("Background queue is full, sending update inline")
+                    return False
+                _, dropped = self._low.popitem(last=False)
+                self.dropped += 1
+                log.debug("Background queue is full, dropped update to task '%s'", dropped.task_id)
+
+            self.flush_timeout = config.flush_timeout
+            self.coalesce_window = config.coalesce_window
+            # Send the update using a copy of the caller's Badger so it sees the same
+            # settings without sharing the caller's session state across threads.
+            lane = self._high if terminal else self._low
+            lane[task_id] = PendingUpdate(Badger(Badger.current), task_id, sequencer.next(task_id), fields)
+            self._cond.notify()
+            self._ensure_started()
+        return True
+
+    def pending(self) -> int:
+        """Number of tasks with updates waiting to be sent."""
+        with self._cond:
+            return len(self._high) + len(self._low)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Send all queued updates without waiting for the coalesce window and block
+        until they have been sent.
+
+        Arguments:
+            timeout: Maximum time to wait (seconds). Defaults to the configured ``flush_timeout``.
+
+        Returns:
+            bool: True if the queue was drained, False if the timeout expired first.
+        """
+        timeout = self.flush_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._flushing.set()
+        try:
+            with self._cond:
+                self._cond.notify_all()
+                while self._high or self._low or self._in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        log.warning("Timed out sending %s background updates", len(self._high) + len(self._low))
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    return True
+        finally:
+            self._flushing.clear()
+        self._spool_pending()
+        return False
+
+    def _spool_pending(self):
+        """Save updates that are still queued to the spool (if configured) so they survive shutdown."""
+        with self._cond:
+            pending = [*self._high.values(), *self._low.values()]
+        for item in pending:
+            context = contextvars.Context()
+            context.run(_local.set, item.mug)
+            context.run(spool.add_update, item.task_id, item.fields)
+
+    def reset(self) -> None:
+        """Discard queued updates and the worker thread (used in forked children)."""
+        self._cond = threading.Condition(threading.Lock())
+        # terminal updates: sent first and never dropped
+        self._high: dict[str, PendingUpdate] = {}
+        # progress updates: bounded by ``max_queue_size``
+        self._low: collections.OrderedDict[str, PendingUpdate] = collections.OrderedDict()
+        self._in_flight = 0
+        self._flushing = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.dropped = 0
+
+    def shutdown(self, timeout: float = None) -> None:
+        """Flush queued updates, stop the worker thread and reset the dispatcher.
+
+        Arguments:
+            timeout: Maximum time to wait for the flush and for the worker thread to exit (seconds).
+        """
+        self.flush(timeout)
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+        self.reset()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            # assigned before starting: the thread exits once it is no longer ``self._thread``
+            self._thread = threading.Thread(target=self._run, name="taskbadger-dispatch", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            pending = self._next()
+            if pending is None:
+                return
+            try:
+                self._send(pending)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _next(self) -> PendingUpdate | None:
+        """Wait for the next update to send. Returns None once this is no longer the worker thread."""
+        with self._cond:
+            while True:
+                if self._thread is not threading.current_thread():
+                    return None
+                flushing = self._flushing.is_set()
+                lane = self._high or self._low
+                if not lane:
+                    self._cond.wait()
+                    continue
+                pending = next(iter(lane.values()))
+                # give further progress updates to the same task a chance to be merged in
+                remaining = pending.queued_at + self.coalesce_window - time.monotonic()
+                if lane is self._low and remaining > 0 and not flushing:
+                    self._cond.wait(remaining)
+                    continue
+                # on flush the update is attempted regardless and fails fast if the circuit is still open
+                if circuit_breaker.is_open() and not flushing:
+                    self._cond.wait(max(circuit_breaker.retry_in(), 0.1))
+                    continue
+                del lane[pending.task_id]
+                self._in_flight += 1
+                return pending
+
+    def _send(self, pending: PendingUpdate):
+        # imported here to avoid a circular import: sdk uses the dispatcher
+        from .sdk import update_task
+
+        # an update to the task may have been sent inline since this one was queued
+        fields = sequencer.check(pending.task_id, pending.seq, pending.fields)
+        if fields is None:
+            return
+
+        context = contextvars.Context()
+        context.run(_local.set, pending.mug)
+        context.run(sending, pending.seq)
+        try:
+            context.run(update_task, pending.task_id, return_task=False, **fields)
+        except Exception as e:
+            if is_transient(e) and context.run(spool.add_update, pending.task_id, fields):
+                log.debug("Error updating task '%s', saved to spool: %s", pending.task_id, e)
+            else:
+                log.warning("Error updating task '%s': %s", pending.task_id, e)
+
+
+dispatcher = Dispatcher()
+atexit.register(dispatcher.flush)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=dispatcher.reset)
@@ -2,9 +2,11 @@
 (Celery, Procrastinate). Not part of the public API.
 
 A single module-level ``TaskCache`` (``task_cache``) is shared across all
-integrations; task ids are UUIDs so cross-integration key collisions are not
-a concern. ``BaseSystemIntegration`` provides the common ctor/include-exclude
-shape; subclasses override ``track_task`` if they need to filter additional
+integrations and worker threads; task ids are UUIDs so cross-integration key
+collisions are not a concern. Its limits are set with ``TaskCacheConfig``.
+The cache is cleared in forked children (e.g. Celery prefork workers).
+``BaseSystemIntegration`` provides the common ctor/include-exclude shape;
+subclasses override ``track_task`` if they need to filter additional
 task names (e.g. Procrastinate built-ins).
 """
 
@@ -12,10 +14,15 @@ from __future__ import annotations
 
 import collections
 import logging
+import os
 import re
+import sys
+import threading
+import time
 
 from . import sdk
 from .internal.models import StatusEnum
+from .mug import Badger, TaskCacheConfig
 from .systems import System
 
 log = logging.getLogger("taskbadger")
@@ -28,30 +35,168 @@ TERMINAL_STATES = {
 }
 
 
+# the task model, its tags and the cache entry without any data
+ENTRY_OVERHEAD = 1024
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires")
+
+    def __init__(self, value, size: int, expires: float | None):
+        self.value = value
+        self.size = size
+        self.expires = expires
+
+
+# bounds on the walk of a cached task's data by ``approximate_size``
+SIZE_MAX_ITEMS = 1000
+SIZE_MAX_DEPTH = 20
+SIZE_MIN_SHARE = 16
+
+
+def approximate_size(value) -> int:
+    """Approximate memory used by a cached task: a fixed overhead plus the size of its ``data``.
+
+    The data is walked down to ``SIZE_MAX_DEPTH`` levels, measuring at most ``SIZE_MAX_ITEMS``
+    values with ``sys.getsizeof``. The limit is shared between the items of each container and the
+    size of items left unmeasured is extrapolated from the ones that were.
+    """
+    # don't trigger the lazy attribute lookups of ``sdk.Task`` (``PendingTask`` would wait for its create)
+    data = getattr(getattr(value, "_task", value), "data", None)
+    if not isinstance(data, dict) or not data:
+        return ENTRY_OVERHEAD
+    size, _ = _deep_sizeof(data, SIZE_MAX_ITEMS, SIZE_MAX_DEPTH)
+    return ENTRY_OVERHEAD + size
+
+
+def _deep_sizeof(value, budget: int, depth: int) -> tuple[int, int]:
+    """Returns the approximate size of ``value`` and the number of values measured (at most ``budget``)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        count = 2 * len(value)
+        items = (item for pair in value.items() for item in pair)
+    elif isinstance(value, list | tuple | set | frozenset):
+        count = len(value)
+        items = iter(value)
+    else:
+        return size, 1
+    if depth <= 0 or not count:
+        return size, 1
+    used = 1
+    measured = seen = 0
+    for item in items:
+        left = budget - used
+        if left <= 0:
+            break
+        # with more items than budget, measure a sample of them whole rather than only their tops
+        share = max(left // (count - seen), min(left, SIZE_MIN_SHARE))
+        item_size, item_used = _deep_sizeof(item, share, depth - 1)
+        measured += item_size
+        used += item_used
+        seen += 1
+    if seen < count:
+        measured = measured * count // seen if seen else 0
+    return size + measured, used
+
+
 class TaskCache:
-    """Bounded LRU-ish cache for TaskBadger Task objects.
+    """Thread-safe LRU cache for TaskBadger Task objects.
 
     Keys are arbitrary hashable values chosen by the caller (typically the
-    task id). Auto-prunes on ``set`` when ``maxsize`` is exceeded.
-    """
+    task id). Limits are read from ``TaskCacheConfig`` (the ``task_cache``
+    setting, or ``config`` if given): the least recently used entries are
+    evicted when there are more than ``max_entries`` or their approximate size
+    exceeds ``max_bytes``, and entries expire ``ttl`` seconds after they are set.
 
-    def __init__(self, maxsize: int = 128):
-        self.cache: collections.OrderedDict = collections.OrderedDict()
-        self.maxsize = maxsize
+    ``hits``, ``misses`` (including expired entries), ``evictions`` and
+    ``expirations`` count lookups and removals since the last ``reset``.
+    """
 
-    def set(self, key, value) -> None:
-        self.cache[key] = value
-        if len(self.cache) > self.maxsize:
-            self.cache.popitem(last=False)
+    def __init__(self, config: TaskCacheConfig = None):
+        self.config = config
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard all entries and counters (used in forked children)."""
+        self._lock = threading.Lock()
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _get_config(self) -> TaskCacheConfig:
+        if self.config is not None:
+            return self.config
+        settings = Badger.current.settings
+        return (settings.task_cache if settings is not None else None) or TaskCacheConfig()
+
+    def set(self, key, value, ttl: float = None) -> None:
+        """Cache ``value``. ``ttl`` overrides the configured time to live of the entry."""
+        config = self._get_config()
+        size = approximate_size(value)
+        ttl = ttl if ttl is not None else config.ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            if size > config.max_bytes:
+                return
+            self._entries[key] = _Entry(value, size, expires)
+            self.bytes += size
+            while len(self._entries) > config.max_entries or self.bytes > config.max_bytes:
+                _, entry = self._entries.popitem(last=False)
+                self.bytes -= entry.size
+                self.evictions += 1
 
     def get(self, key):
-        return self.cache.get(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
 
     def unset(self, key) -> None:
-        self.cache.pop(key, None)
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Counters and current usage, for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
 
 
 task_cache = TaskCache()
+if hasattr(os, "register_at_fork"):
+    # tasks cached by the parent (e.g. a Celery prefork master) are not owned by the child
+    os.register_at_fork(after_in_child=task_cache.reset)
 
 
 def safe_get_task(task_id: str):
@@ -0,0 +1,99 @@
+"""JSON encoding and decoding of task payloads. Not part of the public API.
+
+Task data can be large (captured output, recorded task arguments) and is
+encoded for every update. ``orjson`` is used when installed
+(``pip install 'taskbadger[json]'``), falling back to the standard library.
+
+Both codecs accept and produce the same documents as the standard library:
+values ``orjson`` can't handle itself (integers over 64 bits) are encoded by
+the standard library, and so are values the standard library rejects
+(datetimes, dataclasses) so they raise ``TypeError`` whichever codec is used.
+Documents with integers over 64 bits, which ``orjson`` would decode as floats,
+are decoded by the standard library. Invalid documents raise ``ValueError``.
+
+The codec encodes request bodies and decodes responses of all API requests,
+and copies the task arguments recorded by the integrations. It can be chosen
+with ``init(json_codec=...)``: the name of a codec in ``CODECS`` or any object
+with ``dumps(obj) -> bytes`` and ``loads(data) -> Any`` methods. The codec is
+shared by the whole process.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import importlib.util
+import json
+import re
+from collections.abc import Callable
+from typing import Any
+
+# integer literals that may not fit in 64 bits (or strings with as many digits: decoding them is just slower)
+_BIG_INT = re.compile(r"\d{19}")
+_BIG_INT_BYTES = re.compile(rb"\d{19}")
+
+
+@dataclasses.dataclass(frozen=True)
+class Codec:
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes | str], Any]
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _stdlib() -> Codec:
+    return Codec("json", _stdlib_dumps, json.loads)
+
+
+def _orjson() -> Codec:
+    import orjson
+
+    # hand datetimes and dataclasses to ``default`` (there is none) so they are rejected like the stdlib does
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # orjson.JSONEncodeError subclasses TypeError
+            return _stdlib_dumps(obj)
+
+    def loads(data: bytes | str) -> Any:
+        big_int = _BIG_INT if isinstance(data, str) else _BIG_INT_BYTES
+        if big_int.search(data):
+            return json.loads(data)
+        # orjson.JSONDecodeError subclasses ValueError
+        return orjson.loads(data)
+
+    return Codec("orjson", dumps, loads)
+
+
+CODECS = {"orjson": _orjson, "json": _stdlib}
+
+
+def get_codec(name: str = None) -> Codec:
+    """Load a codec by name, or the fastest one installed."""
+    if name is not None:
+        return CODECS[name]()
+    for name, factory in CODECS.items():
+        if name == "json" or importlib.util.find_spec(name) is not None:
+            return factory()
+
+
+codec = get_codec()
+
+
+def set_codec(name_or_codec: str | Codec) -> None:
+    """Use a codec given by name (see ``CODECS``) or a codec object for all requests."""
+    global codec
+    codec = get_codec(name_or_codec) if isinstance(name_or_codec, str) else name_or_codec
+
+
+def dumps(obj: Any) -> bytes:
+    return codec.dumps(obj)
+
+
+def loads(data: bytes | str) -> Any:
+    return codec.loads(data)
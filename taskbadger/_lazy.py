@@ -0,0 +1,136 @@
+"""Lazily parsed tasks. Not part of the public API.
+
+``internal.models.Task.from_dict`` copies the response dict, parses every
+datetime with ``dateutil`` and builds a ``TaskTags`` object for each task. A
+page of tasks from ``list_tasks`` is often only used for a few fields (the
+CLI shows five columns), so its tasks are ``LazyTask`` objects instead: they
+keep the decoded JSON and parse each field the first time it is read.
+
+``LazyTask`` has the same attributes and ``to_dict`` as the generated model.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from dateutil.parser import isoparse
+
+from taskbadger.internal.models import PaginatedTaskList, StatusEnum, TaskTags
+from taskbadger.internal.types import UNSET, Unset
+
+FIELDS = frozenset(
+    {
+        "id",
+        "organization",
+        "project",
+        "name",
+        "value_percent",
+        "created",
+        "updated",
+        "url",
+        "public_url",
+        "queue",
+        "external_id",
+        "status",
+        "value",
+        "value_max",
+        "data",
+        "start_time",
+        "end_time",
+        "time_to_start",
+        "max_runtime",
+        "stale_timeout",
+        "tags",
+    }
+)
+
+
+def parse_datetime(value: str) -> datetime.datetime:
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        # 'Z' suffix (before Python 3.11) and other ISO 8601 forms
+        return isoparse(value)
+
+
+def _optional_datetime(value):
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+_PARSERS = {
+    "created": parse_datetime,
+    "updated": parse_datetime,
+    "start_time": _optional_datetime,
+    "end_time": _optional_datetime,
+    "status": StatusEnum,
+    "tags": TaskTags.from_dict,
+}
+
+
+def _to_json(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, StatusEnum):
+        return value.value
+    if isinstance(value, TaskTags):
+        return value.to_dict()
+    return value
+
+
+class LazyTask:
+    """A task from the API that parses its fields on first access."""
+
+    __slots__ = ("_raw",)
+
+    def __init__(self, raw: dict[str, Any]):
+        # the decoded JSON: parsed (and assigned) values replace the raw ones
+        self._raw = raw
+
+    def __getattr__(self, name: str):
+        if name not in FIELDS:
+            raise AttributeError(f"'LazyTask' object has no attribute '{name}'")
+        value = self._raw.get(name, UNSET)
+        parser = _PARSERS.get(name)
+        # anything but raw JSON (str or dict) was parsed or assigned already
+        if parser is None or type(value) not in (str, dict):
+            return value
+        value = self._raw[name] = parser(value)
+        return value
+
+    def __setattr__(self, name: str, value):
+        if name in LazyTask.__slots__:
+            object.__setattr__(self, name, value)
+        elif name in FIELDS:
+            self._raw[name] = value
+        else:
+            raise AttributeError(f"'LazyTask' object has no attribute '{name}'")
+
+    @property
+    def additional_properties(self) -> dict[str, Any]:
+        return {key: value for key, value in self._raw.items() if key not in FIELDS}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: _to_json(value) for key, value in self._raw.items() if not isinstance(value, Unset)}
+
+    def __eq__(self, other):
+        if not isinstance(other, LazyTask):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"LazyTask(id={self.id!r}, name={self.name!r})"
+
+
+def task_page(raw: dict[str, Any]) -> PaginatedTaskList:
+    """A page of tasks from ``list_tasks`` with ``LazyTask`` results."""
+    raw = dict(raw)
+    page = PaginatedTaskList(
+        results=[LazyTask(task) for task in raw.pop("results")],
+        next_=raw.pop("next", UNSET),
+        previous=raw.pop("previous", UNSET),
+    )
+    page.additional_properties = raw
+    return page
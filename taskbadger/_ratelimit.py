@@ -0,0 +1,169 @@
+"""Client-side rate limiting of API requests. Not part of the public API.
+
+When ``TransportConfig.rate_limit`` is set, the pooled clients wrap their
+transport in a ``RateLimitTransport``. Every request, including each retry,
+takes a token from the bucket of the project it is for (taken from the
+``/api/<organization>/<project>/`` request path). Buckets are shared by all
+clients in the process and refill at ``rate`` tokens per second up to
+``burst``.
+
+When the bucket is empty the request waits for its turn: a burst of calls is
+spread out instead of being sent at once. If the wait would be longer than
+``max_wait`` (or overrun the hook deadline) the request is not sent and
+``RateLimited`` (or ``DeadlineExceeded``) is raised so the safe SDK functions
+can spool or queue it instead of blocking the caller.
+
+The limit adapts to the API: a 429 response halves the rate of the project
+and pauses its requests for the ``Retry-After`` period. Each successful
+response then restores a fraction of the configured rate.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import httpx
+
+from . import _deadline
+from ._retry import parse_retry_after
+from .exceptions import DeadlineExceeded, RateLimited
+
+log = logging.getLogger("taskbadger")
+
+# the rate never drops below this fraction of the configured rate
+MIN_RATE_FRACTION = 1 / 16
+# fraction of the configured rate restored by each successful response
+RECOVERY_FRACTION = 1 / 20
+
+
+class TokenBucket:
+    """Token bucket for the requests to a single project."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.rate = policy.rate
+        self.tokens = float(policy.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, request: httpx.Request) -> float:
+        """Take a token for ``request``.
+
+        Returns:
+            float: The time to wait before sending the request (seconds).
+
+        Raises:
+            RateLimited: If the wait would be longer than ``max_wait``.
+            DeadlineExceeded: If the wait would overrun the hook deadline.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # tokens can go negative: requests queue up behind each other
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate, self.paused_until - now)
+            left = _deadline.remaining()
+            if left is not None and wait >= left:
+                self.tokens += 1
+                raise DeadlineExceeded("Tracking deadline exceeded waiting for the rate limit", request=request)
+            if wait > self.policy.max_wait:
+                self.tokens += 1
+                raise RateLimited(429, b"", retry_after=wait)
+        return wait
+
+    def record(self, response: httpx.Response) -> None:
+        with self._lock:
+            if response.status_code == 429:
+                self._throttled(parse_retry_after(response.headers.get("Retry-After")))
+            elif response.status_code < 500 and self.rate < self.policy.rate:
+                self.rate = min(self.policy.rate, self.rate + self.policy.rate * RECOVERY_FRACTION)
+
+    def _throttled(self, retry_after: float | None):
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.policy.rate * MIN_RATE_FRACTION, self.rate / 2)
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        self.paused_until = max(self.paused_until, now + pause)
+        self.tokens = min(self.tokens, 0.0)
+        log.debug("Rate limited by the API, pausing requests for %.2fs at %.2f requests/s", pause, self.rate)
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.policy.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Registry of the token buckets of all projects."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all buckets (used in forked children)."""
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple, TokenBucket] = {}
+
+    def bucket(self, request: httpx.Request, policy) -> TokenBucket:
+        key = _project_key(request)
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.policy != policy:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None or bucket.policy != policy:
+                    bucket = self._buckets[key] = TokenBucket(policy)
+        return bucket
+
+
+rate_limiter = RateLimiter()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=rate_limiter.reset)
+
+
+def _project_key(request: httpx.Request) -> tuple:
+    parts = request.url.path.split("/")
+    if len(parts) > 3 and parts[1] == "api":
+        return request.url.host, parts[2], parts[3]
+    return (request.url.host,)
+
+
+class RateLimitTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, policy, limiter: RateLimiter = None):
+        self.transport = transport
+        self.policy = policy
+        self.limiter = limiter or rate_limiter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = self.limiter.bucket(request, self.policy)
+        delay = bucket.acquire(request)
+        if delay:
+            time.sleep(delay)
+        response = self.transport.handle_request(request)
+        bucket.record(response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncRateLimitTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy, limiter: RateLimiter = None):
+        self.transport = transport
+        self.policy = policy
+        self.limiter = limiter or rate_limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        bucket = self.limiter.bucket(request, self.policy)
+        delay = bucket.acquire(request)
+        if delay:
+            await asyncio.sleep(delay)
+        response = await self.transport.handle_async_request(request)
+        bucket.record(response)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,154 @@
+"""Tasks as last returned by the API to this process. Not part of the public API.
+
+Every create, update and get response contains the full task. The registry
+keeps the latest one for each task so ``get_task`` doesn't have to fetch state
+this process has just written (the integrations read a task before updating it
+to check its status or merge data).
+
+An entry is only used while it is current:
+
+* it was recorded at the task's latest update sequence number (see
+  ``_sequence``): any update made since (inline, queued, spooled or sent
+  without parsing the response) makes it stale. Creates and gets are only
+  recorded when no update to the task is waiting to be sent;
+* it is younger than ``ttl`` seconds, since other processes may update the task.
+
+Entries that aren't current are kept with the ``ETag`` and ``Last-Modified``
+headers of their response so ``get_task`` can revalidate them with a
+conditional request: a ``304 Not Modified`` has no body to download or parse.
+
+``get_task(task_id, fresh=True)`` bypasses the registry (but still revalidates).
+State is kept for the most recently used ``maxsize`` tasks and is discarded in
+forked children.
+"""
+
+from __future__ import annotations
+
+import collections
+import copy
+import os
+import threading
+import time
+from collections.abc import Mapping
+
+from ._sequence import sequencer
+from .internal.types import Unset
+
+
+def _copy(task):
+    """A copy of ``task`` that shares no mutable state with it."""
+    task = copy.copy(task)
+    if not isinstance(task.data, Unset):
+        task.data = copy.deepcopy(task.data)
+    if not isinstance(task.tags, Unset):
+        task.tags = copy.deepcopy(task.tags)
+    task.additional_properties = copy.deepcopy(task.additional_properties)
+    return task
+
+
+class _Entry:
+    __slots__ = ("task", "seq", "expires", "etag", "last_modified")
+
+    def __init__(self, task, seq: int, expires: float, etag: str | None, last_modified: str | None):
+        self.task = task
+        self.seq = seq
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class TaskRegistry:
+    def __init__(self, maxsize: int = 1000, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all tasks (used in forked children)."""
+        self._lock = threading.Lock()
+        self._tasks: collections.OrderedDict[str, _Entry] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    def record(self, task, seq: int = None, headers: Mapping[str, str] = None) -> None:
+        """Record a task returned by the API.
+
+        Arguments:
+            task: The task from the response (``internal.models.Task``).
+            seq: The sequence number of the update the response is for. Creates and gets are
+                recorded at the latest update acknowledged by the API (and not at all while an
+                update is being sent).
+            headers: The response headers.
+        """
+        if task is None:
+            return
+        if seq is None:
+            seq = sequencer.settled(task.id)
+            if seq is None:
+                return
+        headers = headers or {}
+        with self._lock:
+            entry = self._tasks.get(task.id)
+            if entry is not None and entry.seq > seq:
+                # a response to a later update was recorded first
+                return
+            # the caller keeps the task and may apply local updates to it (including to its data)
+            self._tasks[task.id] = _Entry(
+                _copy(task),
+                seq,
+                time.monotonic() + self.ttl,
+                headers.get("ETag"),
+                headers.get("Last-Modified"),
+            )
+            self._tasks.move_to_end(task.id)
+            if len(self._tasks) > self.maxsize:
+                self._tasks.popitem(last=False)
+
+    def get(self, task_id: str):
+        """A copy of the recorded task or None if there is no current entry."""
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None or entry.expires <= time.monotonic() or entry.seq != sequencer.issued(task_id):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._tasks.move_to_end(task_id)
+            return _copy(entry.task)
+
+    def conditional_headers(self, task_id: str) -> dict[str, str]:
+        """Headers to revalidate the recorded task with (empty if it can't be)."""
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            headers = {}
+            if entry is not None:
+                if entry.etag:
+                    headers["If-None-Match"] = entry.etag
+                if entry.last_modified:
+                    headers["If-Modified-Since"] = entry.last_modified
+            return headers
+
+    def not_modified(self, task_id: str):
+        """The API confirmed that the recorded task is unchanged.
+
+        Returns:
+            A copy of the recorded task or None if it was evicted since the request was made.
+        """
+        with self._lock:
+            entry = self._tasks.get(task_id)
+            if entry is None:
+                return None
+            self.revalidated += 1
+            # still stale if updates were made since it was recorded: they may not have been sent yet
+            entry.expires = time.monotonic() + self.ttl
+            self._tasks.move_to_end(task_id)
+            return _copy(entry.task)
+
+    def discard(self, task_id: str) -> None:
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+
+registry = TaskRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
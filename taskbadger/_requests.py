@@ -0,0 +1,116 @@
+"""Request building and response parsing with the ``_json`` codec. Not part of the public API.
+
+The generated endpoint functions encode request bodies and decode responses
+with the standard library through httpx. ``endpoint_request`` and
+``task_response`` are used instead of their ``sync_detailed`` /
+``asyncio_detailed`` functions: they reuse the URL and headers built by the
+endpoint module but encode and decode the JSON with the configured codec (see
+``_json``).
+
+The generated functions also build an attrs model from the arguments, convert
+it straight back to a dict with ``to_dict`` and format and quote the URL on
+every call. Updates sent by ``update_task(return_task=False)`` (the background
+dispatcher, the spool, pings and the integrations) skip all of that:
+``update_request`` builds the JSON body as a plain dict and the URL prefix of
+each project is quoted once and cached. The body is the same as the one sent
+by the generated ``task_partial_update``.
+"""
+
+from __future__ import annotations
+
+import functools
+from http import HTTPStatus
+from types import ModuleType
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+
+from taskbadger import _json
+from taskbadger.internal import errors
+from taskbadger.internal.models import StatusEnum, Task
+from taskbadger.internal.types import Response
+
+_HEADERS = {"Content-Type": "application/json"}
+
+
+@functools.lru_cache(maxsize=128)
+def tasks_path(organization_slug: str, project_slug: str) -> str:
+    """The path of the task list endpoint of a project."""
+    return f"/api/{quote(str(organization_slug), safe='')}/{quote(str(project_slug), safe='')}/tasks/"
+
+
+def endpoint_request(endpoint: ModuleType, **kwargs) -> dict[str, Any]:
+    """Keyword arguments for ``httpx.Client.request`` to call a generated endpoint module
+    (e.g. ``task_create``) with the JSON body encoded by ``_json``."""
+    request = endpoint._get_kwargs(**kwargs)
+    if "json" in request:
+        request["content"] = _json.dumps(request.pop("json"))
+    return request
+
+
+def task_response(client, response: httpx.Response, success: HTTPStatus) -> Response[Task]:
+    """The response of a generated task endpoint with the task decoded by ``_json`` if the
+    status is ``success``."""
+    if response.status_code == success:
+        parsed = Task.from_dict(_json.loads(response.content))
+    elif client.raise_on_unexpected_status:
+        raise errors.UnexpectedStatus(response.status_code, response.content)
+    else:
+        parsed = None
+    return Response(
+        status_code=HTTPStatus(response.status_code),
+        content=response.content,
+        headers=response.headers,
+        parsed=parsed,
+    )
+
+
+def update_request(organization_slug: str, project_slug: str, id: str, body: dict[str, Any]) -> dict[str, Any]:
+    """Keyword arguments for ``httpx.Client.request`` to send a partial update of a task."""
+    return {
+        "method": "PATCH",
+        "url": f"{tasks_path(organization_slug, project_slug)}{quote(str(id), safe='')}/",
+        "content": _json.dumps(body),
+        "headers": _HEADERS,
+    }
+
+
+def update_body(
+    name=None,
+    status=None,
+    value=None,
+    value_max=None,
+    data=None,
+    max_runtime=None,
+    stale_timeout=None,
+    actions=None,
+    tags=None,
+    queue=None,
+    external_id=None,
+) -> dict[str, Any]:
+    """The JSON body of a partial update. Fields that are None (or empty ``data``) are not sent."""
+    body = {}
+    if actions:
+        body["actions"] = [a.to_dict() for a in actions]
+    if name is not None:
+        body["name"] = name
+    if queue is not None:
+        body["queue"] = queue
+    if external_id is not None:
+        body["external_id"] = external_id
+    if status is not None:
+        body["status"] = StatusEnum(status).value
+    if value is not None:
+        body["value"] = value
+    if value_max is not None:
+        body["value_max"] = value_max
+    if data:
+        body["data"] = data
+    if max_runtime is not None:
+        body["max_runtime"] = max_runtime
+    if stale_timeout is not None:
+        body["stale_timeout"] = stale_timeout
+    if tags:
+        body["tags"] = dict(tags)
+    return body
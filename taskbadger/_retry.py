@@ -0,0 +1,241 @@
+"""Retrying HTTP transports. Not part of the public API.
+
+``RetryTransport`` / ``AsyncRetryTransport`` wrap the httpx transport of the
+pooled clients so every SDK call is retried on transient failures according
+to the configured ``RetryPolicy``:
+
+* Only requests that are safe to repeat are retried: GET, HEAD and PATCH
+  (task updates set absolute values), and, if ``RetryPolicy.retry_creates``
+  is set, POST requests that carry an ``Idempotency-Key`` header. Connection
+  errors are retried for any method since the request never reached the
+  server.
+* ``create_task`` runs under ``idempotent`` with a key derived from the task's
+  ``external_id`` (random if it has none). The key is sent as the
+  ``Idempotency-Key`` header of the POST and, since every attempt re-sends the
+  same request, is reused by all retries. Creates are only retried when
+  opted in since a server that ignores the key would create a duplicate task.
+* Delays grow exponentially with full jitter. A ``Retry-After`` header on the
+  response is honoured; if it asks for a longer wait than ``max_backoff`` the
+  response is returned as is rather than blocking the caller.
+* Retries draw from a process-wide ``RetryBudget``. Each request adds a
+  fraction of a token and each retry spends a whole one, so during a long
+  outage retries add at most ``budget_ratio`` on top of the normal load.
+* Requests made under a hook deadline are not retried if the delay would
+  overrun it, and requests made by a hook without a deadline are not retried
+  at all so the backoff can't block the application.
+
+Individual requests can opt out with ``extensions={"retry": False}``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import email.utils
+import logging
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+import httpx
+
+from . import _deadline
+
+log = logging.getLogger("taskbadger")
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH"})
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# errors raised before the request was sent, always safe to retry
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_idempotency_key: ContextVar[str | None] = ContextVar("taskbadger_idempotency_key", default=None)
+
+
+def idempotency_key(settings, external_id: str | None = None) -> str:
+    """Return an idempotency key for a create: the same for every create of ``external_id``
+    in the project, random if there is no external id."""
+    if external_id is None:
+        return uuid.uuid4().hex
+    name = f"{settings.organization_slug}/{settings.project_slug}/{external_id}"
+    return uuid.uuid5(uuid.NAMESPACE_URL, name).hex
+
+
+@contextlib.contextmanager
+def idempotent(key: str):
+    """Send POST requests made in the block with ``key`` as their ``Idempotency-Key``."""
+    token = _idempotency_key.set(key)
+    try:
+        yield
+    finally:
+        _idempotency_key.reset(token)
+
+
+def _apply_idempotency_key(request: httpx.Request) -> None:
+    key = _idempotency_key.get()
+    if key is not None and request.method == "POST" and IDEMPOTENCY_HEADER not in request.headers:
+        request.headers[IDEMPOTENCY_HEADER] = key
+
+
+class RetryBudget:
+    """Token bucket shared by all retrying transports in the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: float | None = None
+
+    def deposit(self, policy) -> None:
+        with self._lock:
+            tokens = policy.budget_burst if self._tokens is None else self._tokens
+            self._tokens = min(policy.budget_burst, tokens + policy.budget_ratio)
+
+    def withdraw(self, policy) -> bool:
+        with self._lock:
+            tokens = policy.budget_burst if self._tokens is None else self._tokens
+            if tokens < 1:
+                self._tokens = tokens
+                return False
+            self._tokens = tokens - 1
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tokens = None
+
+
+retry_budget = RetryBudget()
+
+
+class _RetryState:
+    """Retry decisions for a single request."""
+
+    def __init__(self, request: httpx.Request, policy, budget: RetryBudget):
+        self.request = request
+        self.policy = policy
+        self.budget = budget
+        self.attempt = 0
+        self.enabled = request.extensions.get("retry", True)
+        self.idempotent = request.method in IDEMPOTENT_METHODS or (
+            policy.retry_creates and IDEMPOTENCY_HEADER in request.headers
+        )
+        budget.deposit(policy)
+
+    def delay_for_response(self, response: httpx.Response) -> float | None:
+        """Return the time to wait before retrying or None if the response should be returned."""
+        if response.status_code not in self.policy.retry_statuses or not self.idempotent:
+            return None
+        delay = self._backoff()
+        if self.policy.respect_retry_after:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.policy.max_backoff:
+                    return None
+                delay = retry_after
+        return self._take(delay, response.status_code)
+
+    def delay_for_error(self, error: httpx.TransportError) -> float | None:
+        if not isinstance(error, CONNECT_ERRORS) and not self.idempotent:
+            return None
+        return self._take(self._backoff(), error)
+
+    def _backoff(self) -> float:
+        delay = min(self.policy.max_backoff, self.policy.backoff_factor * (2**self.attempt))
+        if self.policy.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def _take(self, delay: float, reason) -> float | None:
+        if not self.enabled or self.attempt >= self.policy.max_retries:
+            return None
+        left = _deadline.remaining()
+        if left is None and _deadline.in_hook():
+            return None
+        if left is not None and delay >= left:
+            return None
+        if not self.budget.withdraw(self.policy):
+            log.debug("Retry budget exhausted, not retrying %s %s", self.request.method, self.request.url)
+            return None
+        self.attempt += 1
+        log.debug(
+            "Retrying %s %s in %.2fs (attempt %s): %s",
+            self.request.method,
+            self.request.url,
+            delay,
+            self.attempt,
+            reason,
+        )
+        return delay
+
+
+class RetryTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, policy, budget: RetryBudget = None):
+        self.transport = transport
+        self.policy = policy
+        self.budget = budget or retry_budget
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_idempotency_key(request)
+        state = _RetryState(request, self.policy, self.budget)
+        while True:
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                delay = state.delay_for_error(e)
+                if delay is None:
+                    raise
+            else:
+                delay = state.delay_for_response(response)
+                if delay is None:
+                    return response
+                response.close()
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy, budget: RetryBudget = None):
+        self.transport = transport
+        self.policy = policy
+        self.budget = budget or retry_budget
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_idempotency_key(request)
+        state = _RetryState(request, self.policy, self.budget)
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                delay = state.delay_for_error(e)
+                if delay is None:
+                    raise
+            else:
+                delay = state.delay_for_response(response)
+                if delay is None:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,189 @@
+"""Per-task sequencing of updates. Not part of the public API.
+
+Every update gets a sequence number for its task when the caller makes it:
+``update_task`` numbers inline updates as they are sent and the dispatcher
+numbers queued updates when they are submitted (a coalesced update carries
+the number of the latest update merged into it). The highest number
+acknowledged by the API is recorded for each task.
+
+Before an update that was queued (background dispatch or the spool) is sent,
+``check`` makes sure that:
+
+* it doesn't overwrite fields set by a newer update that was already
+  acknowledged, so a stale ``value=40`` can't land after ``value=90``. The
+  sequence number of the latest acknowledged update is kept per field (and per
+  tag since tags are merged), so the fields of the stale update that the newer
+  one didn't touch are still sent;
+* it doesn't move a task that this process already sent to a terminal state
+  back to a non-terminal one (the status is removed from the update).
+
+Inline updates are sent in the order the caller makes them and are not
+checked, but they are numbered and acknowledged like the others.
+
+State is kept for the most recently updated ``maxsize`` tasks and is
+discarded in forked children.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextvars
+import logging
+import os
+import threading
+
+log = logging.getLogger("taskbadger")
+
+# the sequence number of a queued update while it is being sent
+_queued: contextvars.ContextVar[int | None] = contextvars.ContextVar("taskbadger_sequence", default=None)
+
+
+def is_terminal(status) -> bool:
+    # imported here to avoid a circular import: _integrations imports sdk which uses the sequencer
+    from ._integrations import TERMINAL_STATES
+
+    return status in TERMINAL_STATES
+
+
+class _TaskState:
+    __slots__ = ("issued", "acknowledged", "fields", "terminal")
+
+    def __init__(self):
+        self.issued = 0
+        self.acknowledged = 0
+        # field name (or ``("tags", key)``) -> sequence number of the latest acknowledged update setting it
+        self.fields: dict = {}
+        self.terminal = False
+
+
+def _field_keys(fields: dict):
+    for name, value in fields.items():
+        if value is None:
+            continue
+        if name == "tags":
+            yield from (("tags", key) for key in value)
+        else:
+            yield name
+
+
+class Sequencer:
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all tasks (used in forked children)."""
+        self._lock = threading.Lock()
+        self._tasks: collections.OrderedDict[str, _TaskState] = collections.OrderedDict()
+        # number of queued updates not sent because newer ones already set all of their fields
+        self.discarded = 0
+
+    def next(self, task_id: str) -> int:
+        """Assign the next sequence number for ``task_id``."""
+        with self._lock:
+            state = self._state(task_id)
+            state.issued += 1
+            return state.issued
+
+    def issued(self, task_id: str) -> int:
+        """The sequence number of the latest update made to ``task_id`` (0 if there are none)."""
+        with self._lock:
+            state = self._tasks.get(task_id)
+            return state.issued if state is not None else 0
+
+    def settled(self, task_id: str) -> int | None:
+        """The sequence number of the latest update made to ``task_id`` if the API has
+        acknowledged it, None while it is queued or being sent."""
+        with self._lock:
+            state = self._tasks.get(task_id)
+            if state is None:
+                return 0
+            return state.issued if state.acknowledged >= state.issued else None
+
+    def check(self, task_id: str, seq: int | None, fields: dict) -> dict | None:
+        """Check a queued update before it is sent.
+
+        Arguments:
+            task_id: The ID of the task.
+            seq: The sequence number assigned when the update was queued or None if it
+                isn't known (spooled updates).
+            fields: The update fields.
+
+        Returns:
+            The fields to send (without the fields set by newer acknowledged updates, and without
+            ``status`` if it would overwrite a terminal status sent by this process) or None if
+            the update should not be sent.
+        """
+        with self._lock:
+            state = self._state(task_id)
+            if seq is not None and seq < state.acknowledged:
+                fields = self._not_overwritten(state, seq, fields)
+                if fields is None:
+                    self.discarded += 1
+                    log.debug("Not sending stale update to task '%s' (%s < %s)", task_id, seq, state.acknowledged)
+                    return None
+            status = fields.get("status")
+            if state.terminal and status is not None and not is_terminal(status):
+                log.debug("Not moving task '%s' out of a terminal state", task_id)
+                fields = {key: value for key, value in fields.items() if key != "status"}
+                if not any(value is not None for value in fields.values()):
+                    return None
+        return fields
+
+    def start(self, task_id: str, status) -> int:
+        """Called when an update is sent.
+
+        Returns:
+            int: The sequence number of the update: the one assigned when it was queued
+            or a new one for inline updates.
+        """
+        seq = _queued.get()
+        if seq is None:
+            seq = self.next(task_id)
+        if is_terminal(status):
+            with self._lock:
+                self._state(task_id).terminal = True
+        return seq
+
+    def acknowledge(self, task_id: str, seq: int, fields: dict = None) -> None:
+        """Record that the API accepted update ``seq`` for ``task_id``, setting ``fields``."""
+        with self._lock:
+            state = self._state(task_id)
+            state.acknowledged = max(state.acknowledged, seq)
+            for key in _field_keys(fields or {}):
+                state.fields[key] = max(state.fields.get(key, 0), seq)
+
+    @staticmethod
+    def _not_overwritten(state: _TaskState, seq: int, fields: dict) -> dict | None:
+        """The fields of update ``seq`` that no newer acknowledged update has set, None if there are none."""
+        remaining = {}
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if name == "tags":
+                value = {key: tag for key, tag in value.items() if state.fields.get(("tags", key), 0) <= seq}
+                if value:
+                    remaining[name] = value
+            elif state.fields.get(name, 0) <= seq:
+                remaining[name] = value
+        return remaining or None
+
+    def _state(self, task_id: str) -> _TaskState:
+        state = self._tasks.get(task_id)
+        if state is None:
+            state = self._tasks[task_id] = _TaskState()
+            if len(self._tasks) > self.maxsize:
+                self._tasks.popitem(last=False)
+        else:
+            self._tasks.move_to_end(task_id)
+        return state
+
+
+def sending(seq: int | None) -> None:
+    """Set the sequence number of the queued update about to be sent in the current context."""
+    _queued.set(seq)
+
+
+sequencer = Sequencer()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=sequencer.reset)
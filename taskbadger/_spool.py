@@ -0,0 +1,348 @@
+"""Durable on-disk spool for updates. Not part of the public API.
+
+When ``init`` is given a ``SpoolConfig``, updates that can't be sent because
+the API is unreachable (transport errors, timeouts, 5xx/429 responses, an open
+circuit breaker or a hook deadline with no room left in the background queue)
+are written to a SQLite file instead of being dropped.
+
+Creates are not spooled. The caller of a failed create gets no task ID, so
+updates to the task (including its final status) can't be made, and replaying
+the create later would leave a task stuck in its initial state until it goes
+stale.
+
+Compaction happens on write: all spooled updates to the same task are merged
+into a single row (later values win, tags are merged) which keeps its place
+in the replay order.
+
+A daemon thread replays the spool in order, oldest first. It runs when the
+spool is written to, after a successful request and every ``replay_interval``
+seconds while there is anything to send. Replay stops at the first transient
+failure and resumes later; rows rejected by the API (4xx) are dropped. Rows are
+tagged with the organization and project they belong to and are only replayed
+with matching settings. The API token is never written to disk.
+
+Several processes (e.g. Celery prefork children) may share a spool file: rows
+are claimed (marked with the process that sends them and when) in a
+transaction before being sent and deleted once the API has responded. Rows
+claimed by a process that died before finishing are sent again after
+``claim_timeout``. Updates spooled while their row is being sent are merged
+into it and the row is kept to send them.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import httpx
+
+from ._breaker import circuit_breaker
+from ._sequence import sequencer
+from .exceptions import CircuitOpen, UnexpectedStatus
+from .mug import Badger, _local
+
+log = logging.getLogger("taskbadger")
+
+UPDATE = "update"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    organization_slug TEXT NOT NULL,
+    project_slug TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    task_id TEXT,
+    fields TEXT NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    -- set when fields are merged into the row while it is claimed
+    merged INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS operations_task ON operations (organization_slug, project_slug, task_id);
+"""
+
+
+def is_transient(error: Exception) -> bool:
+    """True if the request may succeed if sent again later."""
+    if isinstance(error, httpx.TransportError | CircuitOpen):
+        return True
+    return isinstance(error, UnexpectedStatus) and (error.status_code >= 500 or error.status_code == 429)
+
+
+def merge_fields(fields: dict, newer: dict) -> dict:
+    """Merge update fields, ``newer`` taking precedence. Tags are merged."""
+    merged = dict(fields)
+    for key, value in newer.items():
+        if value is None:
+            continue
+        if key == "tags":
+            value = {**merged.get("tags", {}), **value}
+        merged[key] = value
+    return merged
+
+
+class Spool:
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the connection and replay thread (used in forked children)."""
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._path: str | None = None
+        self._mug: Badger | None = None
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+        # True while the spool may hold operations (avoids querying it after every request)
+        self._backlog = True
+        # identifies the rows claimed by this process
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def add_update(self, task_id: str, fields: dict) -> bool:
+        """Spool an update, merging it into any update already spooled for the task.
+
+        Returns:
+            bool: True if the update was written to the spool.
+        """
+        return self._add(UPDATE, task_id, fields)
+
+    def _add(self, kind: str, task_id: str | None, fields: dict) -> bool:
+        if not Badger.is_configured():
+            return False
+        settings = Badger.current.settings
+        config = settings.spool
+        if config is None:
+            return False
+        if fields.get("actions"):
+            log.warning("Task actions can't be spooled, sending %s without them", kind)
+        fields = {key: value for key, value in fields.items() if value is not None and key != "actions"}
+        try:
+            payload = json.dumps(fields)
+        except (TypeError, ValueError) as e:
+            log.warning("Error spooling %s: %s", kind, e)
+            return False
+
+        try:
+            with self._lock:
+                conn = self._connect(config)
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    row = None
+                    if task_id is not None:
+                        row = conn.execute(
+                            "SELECT seq, fields FROM operations"
+                            " WHERE organization_slug = ? AND project_slug = ? AND task_id = ?",
+                            (settings.organization_slug, settings.project_slug, task_id),
+                        ).fetchone()
+                    if row is not None:
+                        payload = json.dumps(merge_fields(json.loads(row[1]), fields))
+                        conn.execute(
+                            "UPDATE operations SET fields = ?, merged = claimed_by IS NOT NULL WHERE seq = ?",
+                            (payload, row[0]),
+                        )
+                    else:
+                        (count,) = conn.execute("SELECT COUNT(*) FROM operations").fetchone()
+                        if count >= config.max_entries:
+                            log.warning("Spool is full, dropping %s", kind)
+                            return False
+                        conn.execute(
+                            "INSERT INTO operations (organization_slug, project_slug, kind, task_id, fields)"
+                            " VALUES (?, ?, ?, ?, ?)",
+                            (settings.organization_slug, settings.project_slug, kind, task_id, payload),
+                        )
+                self._mug = Badger(settings)
+                self._backlog = True
+        except sqlite3.Error as e:
+            log.warning("Error spooling %s: %s", kind, e)
+            return False
+
+        # the API is unreachable right now: try again after ``replay_interval``
+        self._ensure_started()
+        return True
+
+    def pending(self) -> int:
+        """Number of operations waiting in the spool for the current settings."""
+        if not Badger.is_configured() or Badger.current.settings.spool is None:
+            return 0
+        settings = Badger.current.settings
+        with self._lock:
+            conn = self._connect(settings.spool)
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM operations WHERE organization_slug = ? AND project_slug = ?",
+                (settings.organization_slug, settings.project_slug),
+            ).fetchone()
+        return count
+
+    def notify_success(self) -> None:
+        """Called after a successful request: connectivity is back so replay anything spooled."""
+        if self._backlog:
+            self.wake()
+
+    def wake(self) -> None:
+        """Trigger a replay attempt from the background thread if the spool is in use."""
+        if Badger.is_configured() and Badger.current.settings.spool is not None:
+            self._mug = Badger(Badger.current.settings)
+        if self._mug is None:
+            return
+        self._wakeup.set()
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            # assigned before starting: the thread exits once it is no longer ``self._thread``
+            self._thread = threading.Thread(target=self._run, name="taskbadger-spool", daemon=True)
+            self._thread.start()
+
+    def replay(self) -> int:
+        """Send spooled operations in order until the spool is empty or a transient error occurs.
+
+        Returns:
+            int: The number of operations sent.
+        """
+        mug = self._mug
+        if mug is None or mug.settings is None or mug.settings.spool is None:
+            return 0
+
+        context = contextvars.Context()
+        context.run(_local.set, mug)
+        sent = 0
+        while not circuit_breaker.is_open():
+            row = self._claim(mug.settings)
+            if row is None:
+                self._backlog = False
+                break
+            seq, kind, task_id, fields = row
+            try:
+                context.run(_send, kind, task_id, fields)
+            except Exception as e:
+                if is_transient(e):
+                    log.debug("Error replaying spooled %s, will try again later: %s", kind, e)
+                    self._release(mug.settings, seq)
+                    break
+                log.warning("Dropping spooled %s rejected by the API: %s", kind, e)
+            else:
+                sent += 1
+            self._done(mug.settings, seq)
+        return sent
+
+    def shutdown(self, timeout: float = None) -> None:
+        """Stop the replay thread, close the connection and reset the spool.
+
+        Arguments:
+            timeout: Maximum time to wait for a replay in progress to finish (seconds).
+        """
+        thread, self._thread = self._thread, None
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout)
+        self.close()
+        self.reset()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+            self._path = None
+
+    def _claim(self, settings):
+        """Claim the oldest row that isn't being sent by another process."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect(settings.spool)
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT seq, kind, task_id, fields FROM operations"
+                    " WHERE organization_slug = ? AND project_slug = ? AND (claimed_by IS NULL OR claimed_at < ?)"
+                    " ORDER BY seq LIMIT 1",
+                    (settings.organization_slug, settings.project_slug, now - settings.spool.claim_timeout),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE operations SET claimed_by = ?, claimed_at = ?, merged = 0 WHERE seq = ?",
+                        (self._owner, now, row[0]),
+                    )
+        if row is None:
+            return None
+        seq, kind, task_id, fields = row
+        return seq, kind, task_id, json.loads(fields)
+
+    def _done(self, settings, seq: int):
+        """Delete a claimed row once the API has responded, unless updates were merged into it since."""
+        with self._lock:
+            conn = self._connect(settings.spool)
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                deleted = conn.execute(
+                    "DELETE FROM operations WHERE seq = ? AND claimed_by = ? AND merged = 0", (seq, self._owner)
+                ).rowcount
+                if not deleted:
+                    self._unclaim(conn, seq)
+
+    def _release(self, settings, seq: int):
+        """Give up a claimed row so it is sent again later, keeping its place in the replay order."""
+        with self._lock:
+            conn = self._connect(settings.spool)
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._unclaim(conn, seq)
+
+    def _unclaim(self, conn, seq: int):
+        conn.execute(
+            "UPDATE operations SET claimed_by = NULL, claimed_at = NULL WHERE seq = ? AND claimed_by = ?",
+            (seq, self._owner),
+        )
+
+    def _connect(self, config) -> sqlite3.Connection:
+        path = os.fspath(config.path)
+        if self._conn is None or self._path != path:
+            if self._conn is not None:
+                self._conn.close()
+            # autocommit mode: transactions are started explicitly with BEGIN IMMEDIATE
+            self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+            self._path = path
+        return self._conn
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._replay_interval())
+            if self._thread is not threading.current_thread():
+                return
+            self._wakeup.clear()
+            try:
+                self.replay()
+            except Exception as e:
+                log.warning("Error replaying spool: %s", e)
+
+    def _replay_interval(self) -> float:
+        mug = self._mug
+        if mug is None or mug.settings is None or mug.settings.spool is None:
+            return 60.0
+        return max(circuit_breaker.retry_in(), mug.settings.spool.replay_interval)
+
+
+def _send(kind: str, task_id: str | None, fields: dict):
+    # imported here to avoid a circular import: sdk uses the spool
+    from .internal.models import StatusEnum
+    from .sdk import update_task
+
+    if "status" in fields:
+        fields["status"] = StatusEnum(fields["status"])
+    # the spool doesn't keep sequence numbers but a terminal status sent since must not be overwritten
+    fields = sequencer.check(task_id, None, fields)
+    if fields is not None:
+        update_task(task_id, return_task=False, **fields)
+
+
+spool = Spool()
+if hasattr(os, "register_at_fork"):
+    # the connection must not be shared with the parent. The file itself can be.
+    os.register_at_fork(after_in_child=spool.reset)
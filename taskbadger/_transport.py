@@ -0,0 +1,239 @@
+"""Process-wide HTTP connection pooling. Not part of the public API.
+
+A single module-level ``ClientPool`` (``client_pool``) owns one long-lived
+``httpx.Client`` per ``(base_url, token, transport)`` combination. Every ``Session`` (and
+therefore every SDK call and integration hook) borrows that client so TCP
+connections, TLS sessions and the SSL context are reused instead of being
+rebuilt on every call. Failed requests are retried by the client's transport
+according to ``TransportConfig.retry`` (see ``_retry``) and short-circuited by
+the optional circuit breaker (see ``_breaker``) and are paced by the optional
+rate limit (see ``_ratelimit``). Requests made by integration hooks are
+limited by the hook deadline (see ``_deadline``).
+
+The pool is discarded in forked children (e.g. Celery prefork workers) and
+rebuilt lazily so that parent and child never share a socket. Worker
+integrations call ``warm_up`` at process start so the first task doesn't pay
+for the connection setup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import ipaddress
+import logging
+import os
+import ssl
+import threading
+import urllib.request
+import weakref
+
+import httpx
+
+from ._breaker import AsyncBreakerTransport, BreakerTransport
+from ._deadline import AsyncDeadlineTransport, DeadlineTransport
+from ._ratelimit import AsyncRateLimitTransport, RateLimitTransport
+from ._retry import AsyncRetryTransport, RetryTransport
+from .exceptions import CircuitOpen
+from .internal import AuthenticatedClient
+
+log = logging.getLogger("taskbadger")
+
+
+class ClientPool:
+    """Thread-safe registry of shared ``httpx.Client`` instances.
+
+    ``get_client`` returns a fresh (cheap) ``AuthenticatedClient`` wrapper on
+    each call, but all wrappers for the same settings share the underlying
+    ``httpx.Client`` and its connection pool. The pooled clients are never
+    entered/exited by callers; they are closed by ``close`` (registered with
+    ``atexit``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[tuple, httpx.Client] = {}
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._ssl_context: ssl.SSLContext | None = None
+
+    def get_client(self, settings) -> AuthenticatedClient:
+        client = AuthenticatedClient(settings.base_url, settings.token)
+        client.set_httpx_client(self.get_httpx_client(settings))
+        return client
+
+    def get_httpx_client(self, settings) -> httpx.Client:
+        key = (settings.base_url, settings.token, settings.transport)
+        client = self._clients.get(key)
+        if client is not None and not client.is_closed:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._clients[key] = httpx.Client(**self._client_kwargs(settings, is_async=False))
+        return client
+
+    def get_async_client(self, settings) -> AuthenticatedClient:
+        client = AuthenticatedClient(settings.base_url, settings.token)
+        client.set_async_httpx_client(self.get_async_httpx_client(settings))
+        return client
+
+    def get_async_httpx_client(self, settings) -> httpx.AsyncClient:
+        """Return the shared ``httpx.AsyncClient`` for the running event loop.
+
+        Async connections can't be shared between event loops so one client is
+        kept per loop (and dropped along with the loop).
+        """
+        loop = asyncio.get_running_loop()
+        key = (settings.base_url, settings.token, settings.transport)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = clients[key] = httpx.AsyncClient(**self._client_kwargs(settings, is_async=True))
+        return client
+
+    def _client_kwargs(self, settings, is_async: bool) -> dict:
+        config = settings.transport
+        httpx_args = dict(config.httpx_args)
+        # the client ignores these when given a transport so they are applied to the transport instead
+        transport = httpx_args.pop("transport", None)
+        verify = httpx_args.pop("verify", None)
+        verify = self.ssl_context() if verify is None else verify
+        transport_cls = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+        if transport is None:
+            transport = transport_cls(verify=verify, limits=config.limits(), http2=config.http2)
+        # the client doesn't read proxies from the environment when given a transport either, and
+        # wouldn't wrap the proxy transports it creates
+        mounts = {}
+        for pattern, proxy in self._proxies(httpx_args).items():
+            if proxy is not None:
+                # a ``Proxy`` rather than a URL: older httpx versions only accept ``Proxy`` instances
+                proxy = proxy if isinstance(proxy, httpx.Proxy) else httpx.Proxy(proxy)
+                proxy = self._wrap(
+                    transport_cls(verify=verify, limits=config.limits(), http2=config.http2, proxy=proxy),
+                    config,
+                    is_async,
+                )
+            mounts[pattern] = proxy
+        mounts.update(httpx_args.pop("mounts", None) or {})
+        return {
+            "base_url": settings.base_url,
+            "headers": {"Authorization": f"Bearer {settings.token}"},
+            "timeout": config.timeout(),
+            "transport": self._wrap(transport, config, is_async),
+            "mounts": mounts,
+            **httpx_args,
+        }
+
+    @staticmethod
+    def _proxies(httpx_args: dict) -> dict:
+        """URL patterns mapped to the proxy to use for them (None for no proxy), as httpx would."""
+        proxy = httpx_args.pop("proxy", None)
+        if proxy is not None:
+            return {"all://": proxy}
+        if httpx_args.get("trust_env", True):
+            return _environment_proxies()
+        return {}
+
+    @staticmethod
+    def _wrap(transport, config, is_async: bool):
+        """Apply the hook deadline, rate limit, retries and circuit breaker to ``transport``."""
+        transport = (AsyncDeadlineTransport if is_async else DeadlineTransport)(transport)
+        if config.rate_limit is not None:
+            # inside the retry transport so that every attempt is rate limited
+            rate_limit_cls = AsyncRateLimitTransport if is_async else RateLimitTransport
+            transport = rate_limit_cls(transport, config.rate_limit)
+        if config.retry is not None:
+            retry_cls = AsyncRetryTransport if is_async else RetryTransport
+            transport = retry_cls(transport, config.retry)
+        if config.circuit_breaker is not None:
+            breaker_cls = AsyncBreakerTransport if is_async else BreakerTransport
+            transport = breaker_cls(transport, config.circuit_breaker)
+        return transport
+
+    def warm_up(self, settings) -> bool:
+        """Open a keep-alive connection to the API host ahead of the first real request.
+
+        This moves the DNS lookup and TCP/TLS handshake out of the first tracked
+        task. The connection is returned to the pool so later requests reuse it.
+        Errors are logged and swallowed.
+
+        Returns:
+            bool: True if the connection was established, False otherwise
+        """
+        try:
+            self.get_httpx_client(settings).head("/", extensions={"retry": False})
+        except (httpx.HTTPError, CircuitOpen) as e:
+            log.warning("Error connecting to '%s': %s", settings.base_url, e)
+            return False
+        return True
+
+    def ssl_context(self) -> ssl.SSLContext:
+        """Return the SSL context shared by all pooled clients."""
+        if self._ssl_context is None:
+            self._ssl_context = httpx.create_ssl_context()
+        return self._ssl_context
+
+    def close(self) -> None:
+        """Close all pooled clients. New clients are created lazily on next use."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close the async clients belonging to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            await client.aclose()
+
+    def reset(self) -> None:
+        """Forget all pooled clients without closing them.
+
+        Used in a forked child: the inherited sockets are shared with the parent
+        so closing them here would tear down the parent's connections. The lock
+        is replaced as well since it may have been held by another thread at the
+        time of the fork.
+        """
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+
+
+def _environment_proxies() -> dict:
+    """The proxies configured by the ``HTTP_PROXY``, ``HTTPS_PROXY``, ``ALL_PROXY`` and ``NO_PROXY``
+    environment variables (or the system settings) as httpx mount patterns, like httpx reads them."""
+    proxies = urllib.request.getproxies()
+    mounts = {}
+    for scheme in ("http", "https", "all"):
+        url = proxies.get(scheme)
+        if url:
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+
+    for host in proxies.get("no", "").split(","):
+        host = host.strip()
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+            continue
+        try:
+            address = ipaddress.ip_network(host, strict=False)
+        except ValueError:
+            pattern = "all://localhost" if host.lower() == "localhost" else f"all://*{host}"
+        else:
+            pattern = f"all://[{host}]" if address.version == 6 else f"all://{host}"
+        mounts[pattern] = None
+    return mounts
+
+
+client_pool = ClientPool()
+atexit.register(client_pool.close)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_pool.reset)
@@ -1,5 +1,4 @@
 import functools
-import json
 import logging
 
 import celery
@@ -9,11 +8,17 @@ from celery.signals import (
     task_prerun,
     task_retry,
     task_success,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
 )
 from kombu import serialization
 
-from . import sdk
+from . import _json, sdk
+from ._deadline import expired, hook_deadline
+from ._dispatch import dispatcher
 from ._integrations import TERMINAL_STATES, safe_get_task, task_cache
+from ._transport import client_pool
 from .internal.models import StatusEnum
 from .mug import Badger
 from .safe_sdk import create_task_safe, update_task_safe
@@ -121,6 +126,7 @@ class Task(celery.Task):
 
 
 @before_task_publish.connect
+@hook_deadline()
 def task_publish_handler(sender=None, headers=None, body=None, **kwargs):
     routing_key = kwargs.get("routing_key")
     headers = headers if "task" in headers else body
@@ -160,7 +166,7 @@ def task_publish_handler(sender=None, headers=None, body=None, **kwargs):
         }
         try:
             _, _, value = serialization.dumps(data, serializer="json")
-            data = json.loads(value)
+            data = _json.loads(value)
         except Exception:
             log.error("Error serializing task arguments for task '%s'", name)
         else:
@@ -233,7 +239,7 @@ def _maybe_create_task(signal_sender):
         if celery_system and celery_system.record_task_args:
             try:
                 _, _, value = serialization.dumps({"items": items_list}, serializer="json")
-                items_data = json.loads(value)
+                items_data = _json.loads(value)
                 data["celery_task_items"] = items_data["items"]
             except Exception:
                 log.warning("Error serializing canvas items for task '%s'", task_name)
@@ -259,29 +265,48 @@ def _maybe_create_task(signal_sender):
 
 
 @task_prerun.connect
+@hook_deadline()
 def task_prerun_handler(sender=None, **kwargs):
     _maybe_create_task(sender)
     _update_task(sender, StatusEnum.PROCESSING)
 
 
 @task_success.connect
+@hook_deadline()
 def task_success_handler(sender=None, **kwargs):
     _update_task(sender, StatusEnum.SUCCESS)
     exit_session(sender)
 
 
 @task_failure.connect
+@hook_deadline()
 def task_failure_handler(sender=None, einfo=None, **kwargs):
     _update_task(sender, StatusEnum.ERROR, einfo)
     exit_session(sender)
 
 
 @task_retry.connect
+@hook_deadline()
 def task_retry_handler(sender=None, einfo=None, **kwargs):
     _update_task(sender, StatusEnum.ERROR, einfo)
     exit_session(sender)
 
 
+@worker_process_init.connect
+def worker_process_init_handler(**kwargs):
+    """Connect to the API as soon as a worker process starts (e.g. after a prefork
+    child is spawned) so that the first task doesn't pay for DNS and TCP/TLS setup."""
+    if Badger.is_configured():
+        client_pool.warm_up(Badger.current.settings)
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def worker_shutdown_handler(**kwargs):
+    """Send any task updates still queued for background dispatch before the worker exits."""
+    dispatcher.flush()
+
+
 def _update_task(signal_sender, status, einfo=None):
     task_id = _get_taskbadger_task_id(signal_sender.request)
     if not task_id:
@@ -294,6 +319,10 @@ def _update_task(signal_sender, status, einfo=None):
         task = safe_get_task(task_id)
 
     if task is None:
+        if expired():
+            # the current state couldn't be fetched in time: queue the status update
+            # rather than dropping it
+            update_task_safe(task_id, status=status, return_task=False)
         return
 
     if task.status in TERMINAL_STATES:
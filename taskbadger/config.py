@@ -7,6 +7,8 @@ import tomlkit
 import typer
 from tomlkit import document, table
 
+from taskbadger.exceptions import ConfigurationError
+from taskbadger.mug import CircuitBreakerPolicy, RateLimitPolicy, RetryPolicy, TransportConfig
 from taskbadger.sdk import _TB_HOST, _init, _parse_token
 
 APP_NAME = "taskbadger"
@@ -19,12 +21,28 @@ class Config:
     project_slug: str = None
     host: str = _TB_HOST
     tags: dict = None
+    transport: dict = None
 
     def is_valid(self):
         return bool(self.token and self.organization_slug and self.project_slug)
 
     def init_api(self):
-        _init(self.host, self.organization_slug, self.project_slug, self.token)
+        _init(self.host, self.organization_slug, self.project_slug, self.token, transport=self.get_transport())
+
+    def get_transport(self) -> TransportConfig:
+        transport = dict(self.transport or {})
+        try:
+            if "retry" in transport:
+                transport["retry"] = _get_retry_policy(transport["retry"])
+            if "circuit_breaker" in transport:
+                breaker = transport["circuit_breaker"]
+                transport["circuit_breaker"] = CircuitBreakerPolicy(**breaker) if breaker else None
+            if "rate_limit" in transport:
+                rate_limit = transport["rate_limit"]
+                transport["rate_limit"] = RateLimitPolicy(**rate_limit) if rate_limit else None
+            return TransportConfig(**transport)
+        except TypeError as e:
+            raise ConfigurationError(f"Invalid transport configuration: {e}") from e
 
     @staticmethod
     def from_dict(config_dict, **overrides) -> "Config":
@@ -63,6 +81,7 @@ class Config:
             project_slug=project_slug,
             host=overrides.get("host") or auth.get("host"),
             tags=config_dict.get("tags", {}),
+            transport=config_dict.get("transport", {}),
         )
 
     def __str__(self):
@@ -72,6 +91,9 @@ class Config:
         tags = ""
         if self.tags:
             tags = "Tags:\n  " + "\n  ".join(f"{k}: {v}" for k, v in self.tags.items())
+        transport = ""
+        if self.transport:
+            transport = "\nTransport:\n  " + "\n  ".join(f"{k}: {v}" for k, v in self.transport.items())
         return (
             textwrap.dedent(
                 f"""
@@ -82,6 +104,7 @@ class Config:
             )
             + host
             + tags
+            + transport
         )
 
 
@@ -103,6 +126,11 @@ def write_config(config):
         for key, value in config.tags.items():
             tags.add(key, value)
         doc.add("tags", tags)
+    if config.transport:
+        transport = table()
+        for key, value in config.transport.items():
+            transport.add(key, value)
+        doc.add("transport", transport)
 
     config_path = _get_config_path()
     if not config_path.parent.exists():
@@ -131,3 +159,18 @@ def _get_config_path():
     app_dir = typer.get_app_dir(APP_NAME)
     config_path: Path = Path(app_dir) / "config"
     return config_path
+
+
+def _get_retry_policy(retry) -> RetryPolicy | None:
+    """Build the retry policy from the ``retry`` option of the transport table.
+
+    ``retry = false`` disables retries, a table configures them.
+    """
+    if retry is False:
+        return None
+    if retry is True:
+        return RetryPolicy()
+    retry = dict(retry)
+    if "retry_statuses" in retry:
+        retry["retry_statuses"] = frozenset(retry["retry_statuses"])
+    return RetryPolicy(**retry)
@@ -1,9 +1,11 @@
 import logging
 from functools import wraps
 
+from ._deadline import hook_deadline
+from ._spool import is_transient, spool
 from .mug import Session
 from .safe_sdk import create_task_safe
-from .sdk import StatusEnum
+from .sdk import PendingTask, StatusEnum
 
 log = logging.getLogger("taskbadger")
 
@@ -45,8 +47,11 @@ def track(
         @wraps(func)
         @Session()
         def _inner(*args, **kwargs):
+            # don't hold up the function: the task is created in the background and
+            # updates made before it exists are sent once it does
             task = create_task_safe(
                 task_name,
+                wait=False,
                 status=StatusEnum.PROCESSING,
                 max_runtime=max_runtime,
                 monitor_id=monitor_id,
@@ -71,13 +76,22 @@ def track(
     return _decorator if func is None else _decorator(func)
 
 
+@hook_deadline()
 def _update_task(task, **kwargs):
     if task:
         _update_safe(task, **kwargs)
 
 
-def _update_safe(task, **kwargs):
+def _update_safe(task, data=None, data_merge_strategy=None, **kwargs):
+    # until the task has been created, updates are kept and merged into the data of the created task
+    if isinstance(task, PendingTask) and task._buffer(kwargs, data, data_merge_strategy):
+        return
     try:
+        # merge up front so the same data can be spooled if the update fails
+        kwargs["data"] = task._merge_data(data, data_merge_strategy)
         task.update(**kwargs)
     except Exception as e:
-        log.warning("Error updating task '%s': %s", task.id, e)
+        if is_transient(e) and spool.add_update(task.id, kwargs):
+            log.debug("Error updating task '%s', saved to spool: %s", task.id, e)
+        else:
+            log.warning("Error updating task '%s': %s", task.id, e)
@@ -1,3 +1,6 @@
+import httpx
+
+
 class ConfigurationError(Exception):
     pass
 
@@ -28,3 +31,24 @@ class UnexpectedStatus(TaskbadgerException):
 
 class ServerError(UnexpectedStatus):
     pass
+
+
+class RateLimited(UnexpectedStatus):
+    """Raised for 429 responses and instead of sending a request that would wait longer than the
+    client-side rate limit allows."""
+
+    def __init__(self, status_code: int, content: bytes, retry_after: float | None = None):
+        super().__init__(status_code, content)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(TaskbadgerException):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"Task Badger API unavailable, requests paused for {retry_in:.1f}s")
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised instead of sending a request once the hook deadline has been used up."""
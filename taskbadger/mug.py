@@ -1,9 +1,14 @@
 import dataclasses
-from collections.abc import Callable
+import os
+from collections.abc import Callable, Mapping, MutableMapping
 from contextlib import ContextDecorator
 from contextvars import ContextVar
 from copy import deepcopy
+from typing import Any, Literal
 
+import httpx
+
+from taskbadger._transport import client_pool
 from taskbadger.internal import AuthenticatedClient
 from taskbadger.systems import System
 
@@ -13,6 +18,191 @@ _local = ContextVar("taskbadger_client")
 Callback = str | Callable[[dict], dict | None]
 
 
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """Retries for failed requests to the Task Badger API.
+
+    Only requests that are safe to repeat are retried: reads and updates, and creates if
+    ``retry_creates`` is set. Retries are limited by a process-wide budget so that a long outage
+    does not multiply the load on the API.
+
+    Arguments:
+        max_retries: Maximum number of retries per request.
+        backoff_factor: Base delay (seconds). The delay before retry ``n`` is ``backoff_factor * 2**n``.
+        max_backoff: Maximum delay between retries (seconds). Responses with a longer ``Retry-After``
+            are not retried.
+        jitter: Randomize delays ("full jitter") so clients don't retry in lockstep.
+        retry_statuses: Response status codes that are retried.
+        respect_retry_after: Use the ``Retry-After`` response header as the delay when present.
+        budget_ratio: Fraction of a retry earned by each request.
+        budget_burst: Maximum number of retries that can be spent at once.
+        retry_creates: Also retry creates that failed after reaching the server. They carry an
+            ``Idempotency-Key`` header but only enable this if the API deduplicates on it, otherwise
+            a retried create can produce a duplicate task.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 10.0
+    jitter: bool = True
+    retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+    respect_retry_after: bool = True
+    budget_ratio: float = 0.1
+    budget_burst: float = 10.0
+    retry_creates: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    """Stop sending requests while the Task Badger API is unavailable.
+
+    The circuit breaker is shared by all clients in the process. While it is open, requests fail
+    immediately with `CircuitOpen` and the safe SDK functions skip the call instead of waiting for
+    a timeout.
+
+    Arguments:
+        failure_threshold: Number of consecutive failed requests (errors, timeouts, 5xx or 429
+            responses) after which the circuit opens.
+        reset_timeout: Time to wait before letting a probe request through (seconds).
+        spill: While the circuit is open, queue updates from the safe SDK functions and send them
+            from the background thread once the API is available again instead of dropping them.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    spill: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class RateLimitPolicy:
+    """Limit the rate of requests sent to the Task Badger API.
+
+    Requests to each project share a token bucket across the process. When it is empty requests wait
+    for their turn. The rate is lowered automatically when the API responds with 429 and recovers as
+    requests succeed.
+
+    Arguments:
+        rate: Maximum sustained number of requests per second.
+        burst: Maximum number of requests that can be sent at once.
+        max_wait: Maximum time a request waits for the rate limit (seconds). Requests that would wait
+            longer fail with `RateLimited` (the safe SDK functions spool them if a spool is configured).
+    """
+
+    rate: float = 50.0
+    burst: int = 100
+    max_wait: float = 10.0
+
+
+@dataclasses.dataclass(frozen=True)
+class TransportConfig:
+    """HTTP transport options used for all requests to the Task Badger API.
+
+    Arguments:
+        connect_timeout: Maximum time to wait for a connection to be established (seconds).
+        read_timeout: Maximum time to wait for a response chunk (seconds).
+        write_timeout: Maximum time to wait for a request chunk to be sent (seconds).
+        pool_timeout: Maximum time to wait for a connection from the pool (seconds).
+        max_connections: Maximum number of concurrent connections.
+        max_keepalive_connections: Maximum number of idle connections kept open.
+        keepalive_expiry: Time after which idle connections are closed (seconds).
+        http2: Use HTTP/2 so concurrent requests are multiplexed over a single connection.
+            Requires the `h2` package (`pip install 'taskbadger[http2]'`).
+        retry: Retry policy for failed requests. Set to `None` to disable retries.
+        circuit_breaker: Circuit breaker policy. Disabled by default.
+        rate_limit: Client-side rate limit. Disabled by default.
+        httpx_args: Additional arguments passed to the `httpx.Client` constructor.
+    """
+
+    connect_timeout: float = 5.0
+    read_timeout: float = 5.0
+    write_timeout: float = 5.0
+    pool_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    retry: RetryPolicy | None = RetryPolicy()
+    circuit_breaker: CircuitBreakerPolicy | None = None
+    rate_limit: RateLimitPolicy | None = None
+    httpx_args: dict[str, Any] = dataclasses.field(default_factory=dict, hash=False)
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class DispatchConfig:
+    """Options for sending task updates from a background thread.
+
+    Arguments:
+        max_queue_size: Maximum number of tasks with queued progress updates. Updates that set a terminal
+            status are always queued.
+        overflow: What to do with a progress update when the queue is full: `"inline"` sends it from the
+            calling thread, `"drop_oldest"` drops the oldest queued progress update to make room.
+        flush_timeout: Maximum time to wait for queued updates to be sent at shutdown (seconds).
+        coalesce_window: Time to hold an update before sending it (seconds). Further updates to the same
+            task within this window are merged into a single request.
+    """
+
+    max_queue_size: int = 1000
+    overflow: Literal["inline", "drop_oldest"] = "inline"
+    flush_timeout: float = 5.0
+    coalesce_window: float = 0.5
+
+
+@dataclasses.dataclass(frozen=True)
+class SpoolConfig:
+    """Options for persisting updates that can't be sent to an on-disk spool.
+
+    Creates are not spooled: later updates need the ID of the task.
+
+    Arguments:
+        path: Path of the SQLite file used for the spool. It may be shared by several processes.
+        replay_interval: Time between attempts to send spooled operations (seconds).
+        max_entries: Maximum number of operations kept in the spool. Updates to tasks that are already
+            spooled are always accepted since they are merged into the existing entry.
+        claim_timeout: Time after which an operation that a process started sending but didn't finish
+            (e.g. because it was killed) is sent again (seconds).
+    """
+
+    path: str | os.PathLike
+    replay_interval: float = 30.0
+    max_entries: int = 100_000
+    claim_timeout: float = 300.0
+
+
+@dataclasses.dataclass(frozen=True)
+class TaskCacheConfig:
+    """Limits of the cache of tasks shared by the system integrations (Celery, Procrastinate).
+
+    The integrations keep the tasks they create so later hooks of the same job can update them without
+    fetching them first. The least recently used tasks are evicted when either limit is exceeded.
+
+    Arguments:
+        max_entries: Maximum number of cached tasks.
+        max_bytes: Approximate maximum size of the cached tasks (bytes), dominated by their `data`. Tasks
+            larger than this are not cached.
+        ttl: Time after which a cached task is fetched again (seconds). `None` keeps tasks until they are
+            evicted.
+    """
+
+    max_entries: int = 1000
+    max_bytes: int = 16 * 1024 * 1024
+    ttl: float | None = 3600.0
+
+
 @dataclasses.dataclass
 class Settings:
     base_url: str
@@ -21,9 +211,17 @@ class Settings:
     project_slug: str
     systems: dict[str, System] = dataclasses.field(default_factory=dict)
     before_create: Callback = None
+    transport: TransportConfig = dataclasses.field(default_factory=TransportConfig)
+    dispatch: DispatchConfig | None = None
+    hook_deadline: float | None = None
+    spool: SpoolConfig | None = None
+    task_cache: TaskCacheConfig | None = None
 
     def get_client(self):
-        return AuthenticatedClient(self.base_url, self.token)
+        return client_pool.get_client(self)
+
+    def get_async_client(self):
+        return client_pool.get_async_client(self)
 
     def as_kwargs(self):
         return {
@@ -59,7 +257,30 @@ class Session(ContextDecorator):
             sess.__exit__(*args, **kwargs)
 
 
+class AsyncSession:
+    """Async counterpart of `Session` providing a client backed by the shared
+    ``httpx.AsyncClient`` for the running event loop."""
+
+    def __init__(self):
+        self._client = None
+
+    async def __aenter__(self) -> AuthenticatedClient | None:
+        if Badger.is_configured():
+            self._client = Badger.current.async_client()
+        return self._client
+
+    async def __aexit__(self, *args, **kwargs) -> None:
+        self._client = None
+
+
 class ReentrantSession:
+    """Hold a client for the duration of the outermost ``with`` block.
+
+    The client is borrowed from the process-wide pool so connections are kept
+    alive between sessions; exiting the session releases the client but does
+    not close the underlying connections.
+    """
+
     def __init__(self):
         self.client = None
         self.stack = []
@@ -67,17 +288,125 @@ class ReentrantSession:
     def __enter__(self) -> AuthenticatedClient:
         if not self.client:
             self.client = Badger.current.client()
-            self.client.__enter__()
         self.stack.append(True)
         return self.client
 
     def __exit__(self, *args, **kwargs):
         self.stack.pop()
         if not self.stack:
-            self.client.__exit__(*args, **kwargs)
             self.client = None
 
 
+# values that can be shared between scope layers without copying
+_IMMUTABLE = (str, int, float, bool, bytes, type(None))
+
+
+class ScopeData(MutableMapping):
+    """The data or tags of a scope layer.
+
+    Entering a scope creates a layer on top of the current one (see ``child``): lookups fall through
+    to a flattened snapshot of the layer below, writes stay in the new layer and removed keys are
+    hidden. The layer below is not copied: the snapshot is built once, when it is first shared, and
+    cached until the layer is modified.
+
+    Layers are isolated as if they were deep copies of each other: mutable values (lists, dicts)
+    from the layer below are copied into a layer the first time they are read from it, and a layer
+    copies its own mutable values the first time they are read after being shared.
+    """
+
+    def __init__(self, data: Mapping = None, *, base: dict = None):
+        # flattened snapshot of the layer below (never modified)
+        self._base = base if base is not None else {}
+        self._local = dict(data) if data else {}
+        # keys of ``_base`` removed from this layer
+        self._hidden = set()
+        # keys of ``_local`` whose values are shared with the snapshot of this layer
+        self._shared = set()
+        self._flat = None
+        self._snapshot = None
+
+    def child(self) -> "ScopeData":
+        """A new layer on top of this one."""
+        flat = self.flatten()
+        # a snapshot that was shared before already has its values marked
+        if flat is not self._snapshot:
+            self._shared = {key for key, value in self._local.items() if not isinstance(value, _IMMUTABLE)}
+            self._snapshot = flat
+        return ScopeData(base=flat)
+
+    def flatten(self) -> dict:
+        """All keys and values of this layer as a dict. The dict is cached: it must not be modified."""
+        if self._flat is None:
+            if self._hidden:
+                flat = {key: value for key, value in self._base.items() if key not in self._hidden}
+            else:
+                flat = dict(self._base)
+            flat.update(self._local)
+            self._flat = flat
+        return self._flat
+
+    def __getitem__(self, key):
+        if key in self._local:
+            value = self._local[key]
+            if key in self._shared:
+                self._shared.discard(key)
+                value = self._local[key] = deepcopy(value)
+                self._flat = None
+            return value
+        if key in self._hidden:
+            raise KeyError(key)
+        value = self._base[key]
+        if not isinstance(value, _IMMUTABLE):
+            value = self._local[key] = deepcopy(value)
+            self._flat = None
+        return value
+
+    def __setitem__(self, key, value):
+        self._local[key] = value
+        self._shared.discard(key)
+        self._hidden.discard(key)
+        self._flat = None
+
+    def __delitem__(self, key):
+        if key in self._local:
+            del self._local[key]
+            self._shared.discard(key)
+        elif key not in self._base or key in self._hidden:
+            raise KeyError(key)
+        if key in self._base:
+            self._hidden.add(key)
+        self._flat = None
+
+    def __contains__(self, key):
+        return key in self._local or (key in self._base and key not in self._hidden)
+
+    def clear(self):
+        self._local = {}
+        self._shared = set()
+        self._hidden = set(self._base)
+        self._flat = None
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __len__(self):
+        return len(self.flatten())
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+
+def _child(data: Mapping) -> ScopeData:
+    if isinstance(data, ScopeData):
+        return data.child()
+    # assigned directly to the scope
+    return ScopeData(deepcopy(dict(data)))
+
+
+def _flatten(data: Mapping) -> Mapping:
+    return data.flatten() if isinstance(data, ScopeData) else data
+
+
 class Scope:
     """Scope holds global data which will be added to every task created within the current scope.
 
@@ -87,13 +416,13 @@ class Scope:
 
     def __init__(self):
         self.stack = []
-        self.context = {}
-        self.tags = {}
+        self.context = ScopeData()
+        self.tags = ScopeData()
 
     def __enter__(self):
         self.stack.append((self.context, self.tags))
-        self.context = deepcopy(self.context)
-        self.tags = deepcopy(self.tags)
+        self.context = _child(self.context)
+        self.tags = _child(self.tags)
         return self
 
     def __exit__(self, *args):
@@ -105,6 +434,14 @@ class Scope:
     def tag(self, tags: dict[str, str]):
         self.tags.update(tags)
 
+    def merge_data(self, data: dict = None) -> dict:
+        """A new dict with the scope's data overridden by ``data``."""
+        return {**_flatten(self.context), **(data or {})}
+
+    def merge_tags(self, tags: dict[str, str] = None) -> dict[str, str]:
+        """A new dict with the scope's tags overridden by ``tags``."""
+        return {**_flatten(self.tags), **(tags or {})}
+
 
 class MugMeta(type):
     @property
@@ -126,14 +463,14 @@ class Badger(metaclass=MugMeta):
 
         if isinstance(settings_or_mug, Badger):
             self.settings = settings_or_mug.settings
-            self._scope.context = deepcopy(settings_or_mug._scope.context)
-            self._scope.tags = deepcopy(settings_or_mug._scope.tags)
+            self._scope.context = _child(settings_or_mug._scope.context)
+            self._scope.tags = _child(settings_or_mug._scope.tags)
         else:
             self.settings = settings_or_mug
 
     def bind(self, settings, tags=None):
         self.settings = settings
-        self._scope.tags = tags or {}
+        self._scope.tags = ScopeData(tags)
 
     def session(self) -> ReentrantSession:
         return self._session
@@ -141,9 +478,17 @@ class Badger(metaclass=MugMeta):
     def client(self) -> AuthenticatedClient:
         return self.settings.get_client()
 
+    def async_client(self) -> AuthenticatedClient:
+        return self.settings.get_async_client()
+
     def scope(self) -> Scope:
         return self._scope
 
+    def _after_fork(self):
+        # Any client held by an open session points at the parent's (now discarded) pool
+        if self._session.client is not None:
+            self._session.client = self.client()
+
     def call_before_create(self, task: dict) -> dict | None:
         if self.settings and self.settings.before_create:
             return self.settings.before_create(task)
@@ -156,3 +501,14 @@ class Badger(metaclass=MugMeta):
 
 GLOBAL_MUG = Badger()
 _local.set(GLOBAL_MUG)
+
+
+def _after_fork_in_child():
+    # Only the forking thread survives in the child so only its context is reachable
+    for mug in {GLOBAL_MUG, _local.get(None)}:
+        if mug is not None:
+            mug._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
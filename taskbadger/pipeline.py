@@ -0,0 +1,160 @@
+import contextvars
+import os
+import threading
+from concurrent import futures
+from typing import ParamSpec
+
+from ._sequence import sending, sequencer
+from .mug import Badger, TransportConfig, _local
+from .sdk import Task, create_task, update_task
+
+P = ParamSpec("P")
+
+
+class _Executor:
+    """Thread pool shared by all futures in the process.
+
+    It has one thread per connection in the pool (``TransportConfig.max_connections``) and is
+    created on first use and discarded in forked children.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._pool: futures.ThreadPoolExecutor | None = None
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the thread pool, cancelling futures that haven't started.
+
+        A new pool is created if another future is submitted.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def submit(self, fn, *args, **kwargs) -> futures.Future:
+        context = contextvars.copy_context()
+        # Run using a copy of the caller's Badger so it sees the same settings and scope
+        # without sharing the caller's session state across threads.
+        context.run(_local.set, Badger(Badger.current))
+        return self._get_pool().submit(context.run, fn, *args, **kwargs)
+
+    def _get_pool(self) -> futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                settings = Badger.current.settings
+                transport = settings.transport if settings is not None else TransportConfig()
+                self._pool = futures.ThreadPoolExecutor(
+                    max_workers=transport.max_connections, thread_name_prefix="taskbadger-pipeline"
+                )
+            return self._pool
+
+
+executor = _Executor()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=executor.reset)
+
+
+def create_task_future(name: str, **kwargs: P.kwargs) -> "futures.Future[Task]":
+    """Create a task from a background thread.
+
+    Use this to create many tasks concurrently: requests share the pooled client so network latency
+    overlaps instead of adding up.
+
+    Arguments:
+        name: The name of the task.
+        **kwargs: See [taskbadger.create_task][]
+
+    Returns:
+        A future that resolves to the created Task (or raises the error from [taskbadger.create_task][]).
+    """
+    return executor.submit(create_task, name, **kwargs)
+
+
+def update_task_future(task_id: str, **kwargs: P.kwargs) -> "futures.Future[Task | None]":
+    """Update a task from a background thread.
+
+    Updates to the same task may be sent concurrently. An update is not sent if a later update to
+    the task has already been acknowledged by the API, and it never moves a task that was already
+    set to a terminal state back to a non-terminal one.
+
+    Arguments:
+        task_id: The ID of the task to update.
+        **kwargs: See [taskbadger.update_task][]
+
+    Returns:
+        A future that resolves to the updated Task, or to None if the update was not sent because
+        later ones already set all of its fields.
+    """
+    return executor.submit(_update_task, task_id, sequencer.next(task_id), kwargs)
+
+
+def _update_task(task_id: str, seq: int, fields: dict) -> Task | None:
+    fields = sequencer.check(task_id, seq, fields)
+    if fields is None:
+        return None
+    sending(seq)
+    return update_task(task_id, **fields)
+
+
+class Pipeline:
+    """Send creates and updates concurrently and wait for them together.
+
+    Usage:
+    ```
+    with taskbadger.pipeline() as pipe:
+        for item in items:
+            pipe.create_task(f"process {item}")
+    tasks = pipe.results()
+    ```
+    """
+
+    def __init__(self):
+        self.futures: list[futures.Future] = []
+
+    def create_task(self, name: str, **kwargs: P.kwargs) -> "futures.Future[Task]":
+        """See [taskbadger.create_task_future][]"""
+        future = create_task_future(name, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def update_task(self, task_id: str, **kwargs: P.kwargs) -> "futures.Future[Task | None]":
+        """See [taskbadger.update_task_future][]"""
+        future = update_task_future(task_id, **kwargs)
+        self.futures.append(future)
+        return future
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for all requests to complete.
+
+        Returns:
+            bool: True if all requests completed, False if the timeout expired first.
+        """
+        _, not_done = futures.wait(self.futures, timeout=timeout)
+        return not not_done
+
+    def results(self, timeout: float = None) -> list:
+        """Wait for all requests and return their results in the order they were made.
+
+        Raises the first error, if any.
+        """
+        self.wait(timeout)
+        return [future.result(timeout=0) for future in self.futures]
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *args):
+        self.wait()
+
+
+def pipeline() -> Pipeline:
+    """Start a [taskbadger.pipeline.Pipeline][] to send creates and updates concurrently.
+
+    Used as a context manager, all requests have completed when the block exits. Errors are not
+    raised on exit: check them with `Pipeline.results` or on the individual futures.
+    """
+    return Pipeline()
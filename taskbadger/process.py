@@ -34,6 +34,11 @@ class ProcessRunner:
                 else:
                     yield
 
+        if self.capture_output:
+            # the process has exited: wait for the readers to reach EOF so no output is missed
+            stdout.join(timeout=1)
+            stderr.join(timeout=1)
+
         if self.capture_output and (stdout or stderr):
             yield {"stdout": stdout.read(), "stderr": stderr.read()}
 
@@ -62,6 +67,10 @@ class Reader:
                 break
         return
 
+    def join(self, timeout=None):
+        """Wait for the reader to reach EOF."""
+        self._thread.join(timeout)
+
     def read(self):
         """Read data written by the process to its standard output."""
         self._lock.acquire()
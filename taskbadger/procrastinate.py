@@ -11,13 +11,17 @@ Public API:
 
 from __future__ import annotations
 
+import asyncio
 import functools
 import inspect
-import json
 import logging
 from contextvars import ContextVar
 
+from . import _json
+from ._deadline import hook_deadline
+from ._dispatch import dispatcher
 from ._integrations import TERMINAL_STATES, safe_get_task, task_cache
+from ._transport import client_pool
 from .internal.models import StatusEnum
 from .mug import Badger
 from .safe_sdk import create_task_safe, update_task_safe
@@ -72,13 +76,14 @@ def _instrument_task(task, system=None, manual=False, opts=None):
                 return await original_func(*args, **kwargs)
             token = _current_tb_task_id.set(tb_id)
             try:
-                _update_status(tb_id, StatusEnum.PROCESSING)
+                # status updates run in a thread so they don't block the worker's event loop
+                await asyncio.to_thread(_update_status, tb_id, StatusEnum.PROCESSING)
                 try:
                     result = await original_func(*args, **kwargs)
                 except Exception as exc:
-                    _update_status(tb_id, StatusEnum.ERROR, exception=exc)
+                    await asyncio.to_thread(_update_status, tb_id, StatusEnum.ERROR, exception=exc)
                     raise
-                _update_status(tb_id, StatusEnum.SUCCESS)
+                await asyncio.to_thread(_update_status, tb_id, StatusEnum.SUCCESS)
                 return result
             finally:
                 _current_tb_task_id.reset(token)
@@ -108,6 +113,7 @@ def _instrument_task(task, system=None, manual=False, opts=None):
     setattr(task, "_taskbadger_system", system)
 
 
+@hook_deadline()
 def _update_status(tb_id, status, exception=None):
     """Update the TaskBadger task to ``status``. Skips if already terminal."""
     if not Badger.is_configured():
@@ -116,7 +122,10 @@ def _update_status(tb_id, status, exception=None):
     if exception is not None or status in TERMINAL_STATES:
         # Bypass the cache for the terminal-state check: the user may have
         # updated the task to a terminal state via the regular SDK during
-        # the body, which wouldn't be reflected in our local cache.
+        # the body, which wouldn't be reflected in our local cache. The SDK's
+        # own registry does reflect it so this only makes a request if the
+        # task was updated without the response being parsed (or elsewhere),
+        # and then conditionally: unchanged tasks come back as 304.
         task_cache.unset(tb_id)
         current = safe_get_task(tb_id)
         if current is not None and current.status in TERMINAL_STATES:
@@ -155,15 +164,16 @@ def _wrap_defer(task):
 
     @functools.wraps(original_defer_async)
     async def defer_async(**kwargs):
-        kwargs = _maybe_create_pending(task, kwargs)
+        kwargs = await asyncio.to_thread(_maybe_create_pending, task, kwargs)
         job_id = await original_defer_async(**kwargs)
-        _record_external_id(kwargs, job_id)
+        await asyncio.to_thread(_record_external_id, kwargs, job_id)
         return job_id
 
     task.defer = defer
     task.defer_async = defer_async
 
 
+@hook_deadline()
 def _create_pending_task(task, task_kwargs, queue=None):
     """Create a PENDING TaskBadger task for ``task`` if it should be tracked.
 
@@ -206,6 +216,7 @@ def _create_pending_task(task, task_kwargs, queue=None):
     return create_task_safe(name, **create_kwargs)
 
 
+@hook_deadline()
 def _maybe_create_pending(task, kwargs):
     """Decide whether to track this defer, and if so create the TaskBadger
     task and inject its id into ``kwargs``. Always returns the kwargs dict."""
@@ -218,6 +229,7 @@ def _maybe_create_pending(task, kwargs):
     return new_kwargs
 
 
+@hook_deadline()
 def _record_external_id(kwargs, job_id):
     """Record the Procrastinate job id as the TaskBadger task's ``external_id``.
 
@@ -227,7 +239,7 @@ def _record_external_id(kwargs, job_id):
     tb_id = kwargs.get(TB_TASK_ID_KWARG)
     if tb_id is None or job_id is None:
         return
-    update_task_safe(tb_id, external_id=str(job_id))
+    update_task_safe(tb_id, external_id=str(job_id), return_task=False)
 
 
 def _serialize_kwargs(kwargs):
@@ -237,7 +249,7 @@ def _serialize_kwargs(kwargs):
     dumps/loads roundtrip is safe. Non-serializable values are dropped with
     a warning."""
     try:
-        return json.loads(json.dumps(kwargs))
+        return _json.loads(_json.dumps(kwargs))
     except (TypeError, ValueError) as e:
         log.warning("Error serializing task arguments: %s", e)
         return {}
@@ -314,7 +326,7 @@ def _patch_job_manager(app, system):
             task = app.tasks.get(job.task_name)
             tb_id = None
             if task is not None:
-                tb_task = _create_pending_task(task, job.task_kwargs, queue=job.queue)
+                tb_task = await asyncio.to_thread(_create_pending_task, task, job.task_kwargs, queue=job.queue)
                 if tb_task is not None:
                     new_kwargs = {**job.task_kwargs, TB_TASK_ID_KWARG: tb_task.id}
                     job = job.evolve(task_kwargs=new_kwargs)
@@ -323,7 +335,7 @@ def _patch_job_manager(app, system):
                 job=job, periodic_id=periodic_id, defer_timestamp=defer_timestamp
             )
             if tb_id is not None and job_id is not None:
-                update_task_safe(tb_id, external_id=str(job_id))
+                await asyncio.to_thread(update_task_safe, tb_id, external_id=str(job_id), return_task=False)
             return job_id
 
         jm.defer_periodic_job = patched
@@ -358,3 +370,29 @@ def _patch_app_task(app, system):
         return task
 
     app.task = patched
+
+
+def _patch_run_worker(app):
+    """Wrap ``app.run_worker_async`` so the worker connects to the TaskBadger API
+    before it starts fetching jobs and sends any updates queued for background
+    dispatch when it stops. ``run_worker`` delegates to ``run_worker_async`` so
+    both entry points are covered.
+
+    Idempotent: a second call doesn't re-wrap.
+    """
+    if getattr(app, "_taskbadger_original_run_worker_async", None):
+        return
+
+    original = app.run_worker_async
+    app._taskbadger_original_run_worker_async = original
+
+    @functools.wraps(original)
+    async def patched(**kwargs):
+        if Badger.is_configured():
+            await asyncio.to_thread(client_pool.warm_up, Badger.current.settings)
+        try:
+            return await original(**kwargs)
+        finally:
+            await asyncio.to_thread(dispatcher.flush)
+
+    app.run_worker_async = patched
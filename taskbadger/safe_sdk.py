@@ -1,47 +1,138 @@
 import logging
 from typing import ParamSpec
 
+import httpx
+
+from . import _deadline
+from ._breaker import circuit_breaker
+from ._dispatch import dispatcher
+from ._integrations import task_cache
+from ._spool import is_transient, spool
+from .exceptions import CircuitOpen
 from .mug import Badger
-from .sdk import Task, create_task, update_task
+from .sdk import PendingTask, Task, create_task, update_task
 
 P = ParamSpec("P")
 
 log = logging.getLogger("taskbadger")
 
 
-def create_task_safe(name: str, **kwargs: P.kwargs) -> Task | None:
+def create_task_safe(name: str, wait: bool = True, **kwargs: P.kwargs) -> Task | None:
     """Safely create a task. Any errors are handled and logged.
 
     Arguments:
         name: The name of the task.
+        wait: Wait for the task to be created. If False, a [taskbadger.sdk.PendingTask][] is
+            returned straight away and the task is created from a background thread. If the
+            create fails, updates made to the pending task are dropped.
         **kwargs: See [taskbadger.create_task][]
 
     Returns:
-        The created task or None
+        The created task or None. Creates are not spooled: without the task's ID, updates
+        made after a spooled create could not be sent and replaying it would leave a task
+        stuck in its initial state.
     """
     if not Badger.is_configured():
         return None
+    if not wait:
+        return PendingTask(_create_task_safe, name, kwargs, safe=True)
+    return _create_task_safe(name, **kwargs)
+
+
+def _create_task_safe(name: str, **kwargs) -> Task | None:
+    if circuit_breaker.is_open():
+        circuit_breaker.record_skipped()
+        _handle_create_error(name, CircuitOpen(circuit_breaker.retry_in()))
+        return None
 
     try:
-        return create_task(name, **kwargs)
+        task = create_task(name, **kwargs)
     except Exception as e:
-        log.warning("Error creating task '%s': %s", name, e)
+        _handle_create_error(name, e)
+        return None
+    spool.notify_success()
+    return task
 
 
-def update_task_safe(task_id: str, **kwargs: P.kwargs) -> Task | None:
+def update_task_safe(task_id: str, return_task: bool = True, **kwargs: P.kwargs) -> Task | bool | None:
     """Safely update a task. Any errors are handled and logged.
 
     Arguments:
         task_id: The ID of the task to update.
+        return_task: Parse the response into a Task. If False the response body is not decoded
+            and True is returned once the update has been sent.
         **kwargs: See [taskbadger.update_task][]
 
     Returns:
-        The updated task or None
+        The updated task or None. If background dispatch is enabled the update is
+        queued and None is returned. None is also returned while the circuit breaker
+        is open (the update is queued if the breaker is configured to spill), if
+        the hook deadline is exceeded (the update is queued) and if the API is
+        unavailable (the update is saved to the spool if one is configured).
     """
     if not Badger.is_configured():
         return
 
+    if dispatcher.submit_update(task_id, **kwargs):
+        return
+
+    if circuit_breaker.is_open():
+        circuit_breaker.record_skipped()
+        _handle_update_error(task_id, CircuitOpen(circuit_breaker.retry_in()), kwargs)
+        return
+
     try:
-        return update_task(task_id, **kwargs)
+        task = update_task(task_id, return_task=return_task, **kwargs)
     except Exception as e:
-        log.warning("Error updating task '%s': %s", task_id, e)
+        _handle_update_error(task_id, e, kwargs)
+        return
+    spool.notify_success()
+    return task
+
+
+def circuit_breaker_state() -> dict:
+    """Return the state of the process-wide circuit breaker for monitoring.
+
+    Returns:
+        A dict with the keys `state` (`closed`, `open` or `half_open`), `consecutive_failures`,
+        `short_circuited` (number of requests skipped since the process started) and `retry_in`
+        (seconds until the next probe request).
+    """
+    return circuit_breaker.stats()
+
+
+def task_cache_stats() -> dict:
+    """Return the usage of the task cache shared by the system integrations for monitoring.
+
+    Returns:
+        A dict with the keys `entries`, `bytes` (approximate size of the cached tasks), and the
+        counters `hits`, `misses`, `evictions` and `expirations` since the process started.
+    """
+    return task_cache.stats()
+
+
+def _handle_create_error(name: str, error: Exception):
+    if isinstance(error, CircuitOpen):
+        log.debug("Circuit breaker open, not creating task '%s'", name)
+    else:
+        log.warning("Error creating task '%s': %s", name, error)
+
+
+def _handle_update_error(task_id: str, error: Exception, kwargs: dict):
+    if isinstance(error, CircuitOpen):
+        policy = Badger.current.settings.transport.circuit_breaker
+        if policy and policy.spill and dispatcher.spill_update(task_id, **kwargs):
+            log.debug("Circuit breaker open, queued update to task '%s'", task_id)
+            return
+    elif isinstance(error, httpx.TimeoutException) and _deadline.expired():
+        # out of time in an integration hook: send the update in the background instead
+        if dispatcher.spill_update(task_id, **kwargs):
+            log.debug("Tracking deadline exceeded, queued update to task '%s'", task_id)
+            return
+
+    if is_transient(error) and spool.add_update(task_id, kwargs):
+        log.debug("Error updating task '%s', saved to spool: %s", task_id, error)
+    elif isinstance(error, CircuitOpen):
+        log.debug("Circuit breaker open, not updating task '%s'", task_id)
+    else:
+        log.warning("Error updating task '%s': %s", task_id, error)
@@ -1,13 +1,24 @@
 import base64
 import datetime
+import importlib.util
 import logging
 import os
+import threading
 import warnings
+from http import HTTPStatus
 from typing import Any
 
+import httpx
+
+from taskbadger import _deadline, _json, _lazy, _requests, _spool
+from taskbadger._dispatch import dispatcher
+from taskbadger._registry import registry
+from taskbadger._retry import idempotency_key, idempotent, parse_retry_after
+from taskbadger._sequence import sequencer
 from taskbadger.exceptions import (
     ConfigurationError,
     MissingConfiguration,
+    RateLimited,
     ServerError,
     TaskbadgerException,
     Unauthorized,
@@ -25,9 +36,21 @@ from taskbadger.internal.models import (
     PatchedTaskRequestTags,
     StatusEnum,
     TaskRequest,
+    TaskTags,
+)
+from taskbadger.internal.models import Task as TaskInternal
+from taskbadger.internal.types import UNSET, Response
+from taskbadger.mug import (
+    AsyncSession,
+    Badger,
+    Callback,
+    DispatchConfig,
+    Session,
+    Settings,
+    SpoolConfig,
+    TaskCacheConfig,
+    TransportConfig,
 )
-from taskbadger.internal.types import UNSET
-from taskbadger.mug import Badger, Callback, Session, Settings
 from taskbadger.systems import System
 from taskbadger.utils import import_string
 
@@ -63,6 +86,12 @@ def init(
     systems: list[System] = None,
     tags: dict[str, str] = None,
     before_create: Callback = None,
+    transport: TransportConfig = None,
+    dispatch: DispatchConfig = None,
+    hook_deadline: float = None,
+    spool: SpoolConfig = None,
+    task_cache: TaskCacheConfig = None,
+    json_codec: "str | _json.Codec" = None,
 ):
     """Initialize Task Badger client.
 
@@ -73,9 +102,48 @@ def init(
     For legacy API keys, *organization_slug* and *project_slug* are
     required and a deprecation warning is emitted.
 
+    *transport* configures timeouts, connection pool limits and HTTP/2 for
+    all API requests. See [taskbadger.TransportConfig][].
+
+    If *dispatch* is set, task updates made via [taskbadger.update_task_safe][],
+    [taskbadger.Task.update][] and the system integrations are sent from a
+    background thread instead of blocking the caller. See [taskbadger.DispatchConfig][].
+
+    *hook_deadline* limits the time (in seconds) the system integrations and
+    [taskbadger.track][] may spend on API requests per hook, including
+    retries. Updates that don't complete in time are sent from a background
+    thread instead; creates are abandoned. Without a *hook_deadline*, requests
+    made by the hooks are not retried.
+
+    If *spool* is set, updates that can't be sent because the API is
+    unreachable are saved to disk and sent once it is available again.
+    See [taskbadger.SpoolConfig][].
+
+    *task_cache* limits the tasks kept in memory by the system integrations.
+    See [taskbadger.TaskCacheConfig][].
+
+    *json_codec* chooses how request and response bodies are encoded: ``"orjson"``
+    (the default when it is installed: ``pip install 'taskbadger[json]'``), ``"json"``
+    (the standard library) or any object with ``dumps(obj) -> bytes`` and
+    ``loads(data) -> Any`` methods. The codec is shared by the whole process.
+
     Call this function once per thread.
     """
-    _init(_TB_HOST, organization_slug, project_slug, token, systems, tags, before_create)
+    _init(
+        _TB_HOST,
+        organization_slug,
+        project_slug,
+        token,
+        systems,
+        tags,
+        before_create,
+        transport,
+        dispatch,
+        hook_deadline,
+        spool,
+        task_cache,
+        json_codec,
+    )
 
 
 def _init(
@@ -86,6 +154,12 @@ def _init(
     systems: list[System] = None,
     tags: dict[str, str] = None,
     before_create: Callback = None,
+    transport: TransportConfig = None,
+    dispatch: DispatchConfig = None,
+    hook_deadline: float = None,
+    spool: SpoolConfig = None,
+    task_cache: TaskCacheConfig = None,
+    json_codec: "str | _json.Codec" = None,
 ):
     host = host or os.environ.get("TASKBADGER_HOST", "https://taskbadger.net")
     organization_slug = organization_slug or os.environ.get("TASKBADGER_ORG")
@@ -109,6 +183,16 @@ def _init(
         except ImportError as e:
             raise ConfigurationError(f"Could not import module: {before_create}") from e
 
+    transport = transport or TransportConfig()
+    if transport.http2 and importlib.util.find_spec("h2") is None:
+        raise ConfigurationError("HTTP/2 support requires the 'h2' package: pip install 'taskbadger[http2]'")
+
+    if isinstance(json_codec, str):
+        if json_codec not in _json.CODECS:
+            raise ConfigurationError(f"Unknown JSON codec: {json_codec!r}")
+        if json_codec != "json" and importlib.util.find_spec(json_codec) is None:
+            raise ConfigurationError(f"The {json_codec!r} JSON codec requires the {json_codec!r} package")
+
     if host and organization_slug and project_slug and token:
         systems = systems or []
         settings = Settings(
@@ -118,8 +202,18 @@ def _init(
             project_slug,
             systems={system.identifier: system for system in systems},
             before_create=before_create,
+            transport=transport,
+            dispatch=dispatch,
+            hook_deadline=hook_deadline,
+            spool=spool,
+            task_cache=task_cache,
         )
         Badger.current.bind(settings, tags)
+        if json_codec is not None:
+            _json.set_codec(json_codec)
+        if spool is not None:
+            # send anything left over from a previous run
+            _spool.spool.wake()
     else:
         raise MissingConfiguration(
             host=host,
@@ -129,15 +223,75 @@ def _init(
         )
 
 
-def get_task(task_id: str) -> "Task":
+def get_task(task_id: str, fresh: bool = False) -> "Task":
     """Fetch a Task from the API based on its ID.
 
+    Tasks returned by the API to this process (when they are created, updated or fetched) are
+    kept for a short time. If there is a copy of the task that no update has been made to since,
+    it is returned without making a request. Otherwise, if the API returned an ``ETag`` or
+    ``Last-Modified`` header with the copy, it is revalidated with a conditional request.
+
     Arguments:
         task_id: The ID of the task to fetch.
+        fresh: Always fetch the task from the API.
     """
+    if not fresh:
+        task = registry.get(task_id)
+        if task is not None:
+            return Task(task)
+    kwargs = _make_args(id=task_id)
+    conditions = registry.conditional_headers(task_id)
     with Session() as client:
-        task = task_get.sync(client=client, **_make_args(id=task_id))
-    return Task(task)
+        response = None
+        if conditions:
+            response = _get_task_if_modified(client, conditions, **kwargs)
+            if response is None:
+                task = registry.not_modified(task_id)
+                if task is not None:
+                    return Task(task)
+        if response is None:
+            response = _get(client=client, **kwargs)
+    registry.record(response.parsed, headers=response.headers)
+    return Task(response.parsed)
+
+
+async def get_task_async(task_id: str, fresh: bool = False) -> "AsyncTask":
+    """Async version of [taskbadger.get_task][]."""
+    if not fresh:
+        task = registry.get(task_id)
+        if task is not None:
+            return AsyncTask(task)
+    kwargs = _make_args(id=task_id)
+    conditions = registry.conditional_headers(task_id)
+    async with AsyncSession() as client:
+        response = None
+        if conditions:
+            response = await _get_task_if_modified_async(client, conditions, **kwargs)
+            if response is None:
+                task = registry.not_modified(task_id)
+                if task is not None:
+                    return AsyncTask(task)
+        if response is None:
+            response = await _get_async(client=client, **kwargs)
+    registry.record(response.parsed, headers=response.headers)
+    return AsyncTask(response.parsed)
+
+
+def _get_task_if_modified(client, conditions: dict[str, str], **kwargs) -> Response[TaskInternal] | None:
+    """Conditional ``_get``: returns None if the API responds ``304 Not Modified``."""
+    request = _requests.endpoint_request(task_get, **kwargs)
+    response = client.get_httpx_client().request(**request, headers=conditions)
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None
+    return _requests.task_response(client, response, HTTPStatus.OK)
+
+
+async def _get_task_if_modified_async(client, conditions: dict[str, str], **kwargs) -> Response[TaskInternal] | None:
+    request = _requests.endpoint_request(task_get, **kwargs)
+    response = await client.get_async_httpx_client().request(**request, headers=conditions)
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return None
+    return _requests.task_response(client, response, HTTPStatus.OK)
 
 
 def create_task(
@@ -153,6 +307,7 @@ def create_task(
     tags: dict[str, str] = None,
     queue: str = None,
     external_id: str = None,
+    wait: bool = True,
 ) -> "Task":
     """Create a Task.
 
@@ -169,10 +324,68 @@ def create_task(
         tags: Dictionary of namespace -> value tags.
         queue: Name of the queue the task is from.
         external_id: Identifier from the originating system (e.g. Celery task ID) for correlating with logs.
+            Also used to derive the idempotency key of the request so retries can't create duplicate tasks.
+        wait: Wait for the task to be created. If False, a [taskbadger.sdk.PendingTask][] is returned
+            straight away and the task is created from a background thread.
 
     Returns:
         Task: The created Task object.
     """
+    if not wait:
+        kwargs = dict(
+            status=status,
+            value=value,
+            value_max=value_max,
+            data=data,
+            max_runtime=max_runtime,
+            stale_timeout=stale_timeout,
+            actions=actions,
+            monitor_id=monitor_id,
+            tags=tags,
+            queue=queue,
+            external_id=external_id,
+        )
+        return PendingTask(create_task, name, kwargs)
+
+    kwargs = _create_task_args(
+        name, status, value, value_max, data, max_runtime, stale_timeout, actions, monitor_id, tags, queue, external_id
+    )
+    with Session() as client, idempotent(idempotency_key(Badger.current.settings, external_id)):
+        response = _create(client=client, **kwargs)
+    _check_response(response)
+    registry.record(response.parsed, headers=response.headers)
+    return Task(response.parsed)
+
+
+async def create_task_async(
+    name: str,
+    status: StatusEnum = StatusEnum.PENDING,
+    value: int = None,
+    value_max: int = None,
+    data: dict = None,
+    max_runtime: int = None,
+    stale_timeout: int = None,
+    actions: list[Action] = None,
+    monitor_id: str = None,
+    tags: dict[str, str] = None,
+    queue: str = None,
+    external_id: str = None,
+) -> "AsyncTask":
+    """Async version of [taskbadger.create_task][]."""
+    kwargs = _create_task_args(
+        name, status, value, value_max, data, max_runtime, stale_timeout, actions, monitor_id, tags, queue, external_id
+    )
+    async with AsyncSession() as client:
+        with idempotent(idempotency_key(Badger.current.settings, external_id)):
+            response = await _create_async(client=client, **kwargs)
+    _check_response(response)
+    registry.record(response.parsed, headers=response.headers)
+    return AsyncTask(response.parsed)
+
+
+def _create_task_args(
+    name, status, value, value_max, data, max_runtime, stale_timeout, actions, monitor_id, tags, queue, external_id
+):
     task_dict = {
         "name": name,
         "status": status,
@@ -191,14 +404,12 @@ def create_task(
         task_dict["stale_timeout"] = stale_timeout
     scope = Badger.current.scope()
     if scope.context or data:
-        data = data or {}
-        task_dict["data"] = {**scope.context, **data}
+        task_dict["data"] = scope.merge_data(data)
     if actions:
         _warn_actions_deprecated()
         task_dict["actions"] = [a.to_dict() for a in actions]
     if scope.tags or tags:
-        tags = tags or {}
-        task_dict["tags"] = {**scope.tags, **tags}
+        task_dict["tags"] = scope.merge_tags(tags)
 
     task_dict = Badger.current.call_before_create(task_dict)
     if not task_dict:
@@ -208,10 +419,7 @@ def create_task(
     kwargs = _make_args(body=task)
     if monitor_id:
         kwargs["x_taskbadger_monitor"] = monitor_id
-    with Session() as client:
-        response = task_create.sync_detailed(client=client, **kwargs)
-    _check_response(response)
-    return Task(response.parsed)
+    return kwargs
 
 
 def update_task(
@@ -227,7 +435,8 @@ def update_task(
     tags: dict[str, str] = None,
     queue: str = None,
     external_id: str = None,
-) -> "Task":
+    return_task: bool = True,
+) -> "Task | bool":
     """Update a task.
     Requires only the task ID and fields to update.
 
@@ -244,10 +453,146 @@ def update_task(
         tags: Dictionary of namespace -> value tags.
         queue: Name of the queue the task is from.
         external_id: Identifier from the originating system (e.g. Celery task ID) for correlating with logs.
+        return_task: Parse the response into a Task. If False the response body is not decoded
+            and True is returned, which is cheaper when the result isn't used.
 
     Returns:
-        Task: The updated Task object.
+        Task: The updated Task object (or True if `return_task` is False).
     """
+    args = (name, status, value, value_max, data, max_runtime, stale_timeout, actions, tags, queue, external_id)
+    if return_task:
+        kwargs = _update_task_args(task_id, *args)
+    else:
+        kwargs = _update_request_args(task_id, *args)
+    seq = sequencer.start(task_id, status)
+    with Session() as client:
+        if return_task:
+            response = _update(client=client, **kwargs)
+        else:
+            response = _patch_task(client=client, **kwargs)
+    _check_response(response)
+    sequencer.acknowledge(task_id, seq, dict(zip(_UPDATE_FIELDS, args)))
+    if not return_task:
+        return True
+    registry.record(response.parsed, seq, response.headers)
+    return Task(response.parsed)
+
+
+async def update_task_async(
+    task_id: str,
+    name: str = None,
+    status: StatusEnum = None,
+    value: int = None,
+    value_max: int = None,
+    data: dict = None,
+    max_runtime: int = None,
+    stale_timeout: int = None,
+    actions: list[Action] = None,
+    tags: dict[str, str] = None,
+    queue: str = None,
+    external_id: str = None,
+    return_task: bool = True,
+) -> "AsyncTask | bool":
+    """Async version of [taskbadger.update_task][]."""
+    args = (name, status, value, value_max, data, max_runtime, stale_timeout, actions, tags, queue, external_id)
+    if return_task:
+        kwargs = _update_task_args(task_id, *args)
+    else:
+        kwargs = _update_request_args(task_id, *args)
+    seq = sequencer.start(task_id, status)
+    async with AsyncSession() as client:
+        if return_task:
+            response = await _update_async(client=client, **kwargs)
+        else:
+            response = await _patch_task_async(client=client, **kwargs)
+    _check_response(response)
+    sequencer.acknowledge(task_id, seq, dict(zip(_UPDATE_FIELDS, args)))
+    if not return_task:
+        return True
+    registry.record(response.parsed, seq, response.headers)
+    return AsyncTask(response.parsed)
+
+
+def _create(client, **kwargs) -> Response[TaskInternal]:
+    """``task_create.sync_detailed`` with the JSON encoded and decoded by ``_json`` (see ``_requests``)."""
+    return _send(client, task_create, HTTPStatus.CREATED, kwargs)
+
+
+async def _create_async(client, **kwargs) -> Response[TaskInternal]:
+    return await _send_async(client, task_create, HTTPStatus.CREATED, kwargs)
+
+
+def _get(client, **kwargs) -> Response[TaskInternal]:
+    """``task_get.sync_detailed`` with the JSON decoded by ``_json``."""
+    return _send(client, task_get, HTTPStatus.OK, kwargs)
+
+
+async def _get_async(client, **kwargs) -> Response[TaskInternal]:
+    return await _send_async(client, task_get, HTTPStatus.OK, kwargs)
+
+
+def _update(client, **kwargs) -> Response[TaskInternal]:
+    """``task_partial_update.sync_detailed`` with the JSON encoded and decoded by ``_json``."""
+    return _send(client, task_partial_update, HTTPStatus.OK, kwargs)
+
+
+async def _update_async(client, **kwargs) -> Response[TaskInternal]:
+    return await _send_async(client, task_partial_update, HTTPStatus.OK, kwargs)
+
+
+def _send(client, endpoint, success: HTTPStatus, kwargs: dict) -> Response[TaskInternal]:
+    response = client.get_httpx_client().request(**_requests.endpoint_request(endpoint, **kwargs))
+    return _requests.task_response(client, response, success)
+
+
+async def _send_async(client, endpoint, success: HTTPStatus, kwargs: dict) -> Response[TaskInternal]:
+    response = await client.get_async_httpx_client().request(**_requests.endpoint_request(endpoint, **kwargs))
+    return _requests.task_response(client, response, success)
+
+
+def _patch_task(client, **kwargs) -> httpx.Response:
+    """Send a task update without decoding the response (``update_task(return_task=False)``).
+
+    Takes the same arguments as ``task_partial_update.sync_detailed`` but ``body`` is the JSON body
+    (see `_update_request_args`).
+    """
+    return client.get_httpx_client().request(**_requests.update_request(**kwargs))
+
+
+async def _patch_task_async(client, **kwargs) -> httpx.Response:
+    return await client.get_async_httpx_client().request(**_requests.update_request(**kwargs))
+
+
+# names of the update fields in the order ``update_task`` passes them to ``_update_request_args``
+_UPDATE_FIELDS = (
+    "name",
+    "status",
+    "value",
+    "value_max",
+    "data",
+    "max_runtime",
+    "stale_timeout",
+    "actions",
+    "tags",
+    "queue",
+    "external_id",
+)
+
+
+def _update_request_args(
+    task_id, name, status, value, value_max, data, max_runtime, stale_timeout, actions, tags, queue, external_id
+):
+    if actions:
+        _warn_actions_deprecated()
+    body = _requests.update_body(
+        name, status, value, value_max, data, max_runtime, stale_timeout, actions, tags, queue, external_id
+    )
+    return _make_args(id=task_id, body=body)
+
+
+def _update_task_args(
+    task_id, name, status, value, value_max, data, max_runtime, stale_timeout, actions, tags, queue, external_id
+):
     name = _none_to_unset(name)
     status = _none_to_unset(status)
     value = _none_to_unset(value)
@@ -275,20 +620,19 @@ def update_task(
         body.additional_properties = {"actions": [a.to_dict() for a in actions]}
     if tags:
         body.tags = PatchedTaskRequestTags.from_dict(tags)
-    kwargs = _make_args(id=task_id, body=body)
-    with Session() as client:
-        response = task_partial_update.sync_detailed(client=client, **kwargs)
-    _check_response(response)
-    return Task(response.parsed)
+    return _make_args(id=task_id, body=body)
 
 
 def list_tasks(page_size: int = None, cursor: str = None):
-    """List tasks."""
+    """List tasks.
+
+    The tasks in the page parse their fields when they are first read.
+    """
     kwargs = _make_args(page_size=page_size, cursor=cursor)
     with Session() as client:
-        response = task_list.sync_detailed(client=client, **kwargs)
+        response = client.get_httpx_client().request(**task_list._get_kwargs(**kwargs))
     _check_response(response)
-    return response.parsed
+    return _lazy.task_page(_json.loads(response.content))
 
 
 _ACTIONS_DEPRECATED_MESSAGE = (
@@ -298,7 +642,8 @@ _ACTIONS_DEPRECATED_MESSAGE = (
 
 
 def _warn_actions_deprecated():
-    warnings.warn(_ACTIONS_DEPRECATED_MESSAGE, DeprecationWarning, stacklevel=3)
+    # called via _create_task_args / _update_task_args so point at the SDK caller
+    warnings.warn(_ACTIONS_DEPRECATED_MESSAGE, DeprecationWarning, stacklevel=4)
 
 
 def _make_args(**kwargs):
@@ -315,19 +660,86 @@ def _check_response(response):
         raise Unauthorized("Authentication failed")
     elif response.status_code == 500:
         raise ServerError(response.status_code, response.content)
+    elif response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        raise RateLimited(response.status_code, response.content, retry_after=retry_after)
     else:
         raise UnexpectedStatus(response.status_code, response.content)
 
 
-class Task:
+class _BaseTask:
+    """Behaviour shared by [taskbadger.Task][] and [taskbadger.AsyncTask][] which doesn't
+    require calling the API."""
+
+    def __init__(self, task):
+        self._task = task
+
+    @property
+    def tags(self):
+        return self._task.tags.to_dict()
+
+    def __getattr__(self, item):
+        return getattr(self._task, item)
+
+    def _merge_data(self, data, data_merge_strategy):
+        if data and data_merge_strategy:
+            if hasattr(data_merge_strategy, "merge"):
+                return data_merge_strategy.merge(self.data, data)
+            elif data_merge_strategy == "default":
+                return DefaultMergeStrategy().merge(self.data, data)
+            else:
+                raise TaskbadgerException(f"Unknown data_merge_strategy: {data_merge_strategy!r}")
+        return data
+
+    def _check_update_time_interval(self, rate_limit: int = None):
+        if rate_limit and self._task.updated:
+            # tzinfo should always be set but for the sake of safety we check
+            if self._task.updated.tzinfo is None:
+                tz = None
+            else:
+                # Use timezone.utc for Python <3.11 compatibility
+                tz = datetime.timezone.utc
+            now = datetime.datetime.now(tz)
+            time_since = now - self._task.updated
+            return time_since.total_seconds() >= rate_limit
+        return True
+
+    def _check_update_value_interval(self, new_value, value_step: int = None):
+        if value_step and self._task.value:
+            return new_value - self._task.value >= value_step
+        return True
+
+    def _should_update_value(self, value: int, value_step: int = None, rate_limit: int = None) -> bool:
+        skip_check = not (value_step or rate_limit)
+        time_check = rate_limit and self._check_update_time_interval(rate_limit)
+        value_check = value_step and self._check_update_value_interval(value, value_step)
+        return bool(skip_check or time_check or value_check)
+
+    def _incremented_value(self, amount: int) -> int:
+        value = self._task.value
+        value_norm = value if value is not UNSET and value is not None else 0
+        return value_norm + amount
+
+    def _apply_update(self, actions=None, tags=None, **fields):
+        """Apply an update to the local copy of the task when the response isn't parsed."""
+        for name, value in fields.items():
+            if value is not None:
+                setattr(self._task, name, value)
+        if tags:
+            existing = self._task.tags.to_dict() if self._task.tags else {}
+            self._task.tags = TaskTags.from_dict({**existing, **tags})
+        self._task.updated = datetime.datetime.now(datetime.timezone.utc)
+
+
+class Task(_BaseTask):
     """The Task class provides a convenient Python API to interact
     with Task Badger tasks.
     """
 
     @classmethod
-    def get(cls, task_id: str) -> "Task":
-        """Get an existing task"""
-        return get_task(task_id)
+    def get(cls, task_id: str, fresh: bool = False) -> "Task":
+        """Get an existing task. See [taskbadger.get_task][]"""
+        return get_task(task_id, fresh=fresh)
 
     @classmethod
     def create(
@@ -344,6 +756,7 @@ class Task:
         tags: dict[str, str] = None,
         queue: str = None,
         external_id: str = None,
+        wait: bool = True,
     ) -> "Task":
         """Create a new task
 
@@ -362,11 +775,9 @@ class Task:
             tags=tags,
             queue=queue,
             external_id=external_id,
+            wait=wait,
         )
 
-    def __init__(self, task):
-        self._task = task
-
     def pre_processing(self):
         """Update the task status to `pre_processing`."""
         self.update_status(StatusEnum.PRE_PROCESSING)
@@ -403,10 +814,7 @@ class Task:
         """Increment the task progress by adding the specified amount to the current value.
         If the task value is not set it will be set to `amount`.
         """
-        value = self._task.value
-        value_norm = value if value is not UNSET and value is not None else 0
-        new_amount = value_norm + amount
-        self.update(value=new_amount)
+        self.update(value=self._incremented_value(amount))
 
     def update_value(self, value: int, value_step: int = None, rate_limit: int = None) -> bool:
         """Update task progress.
@@ -423,10 +831,7 @@ class Task:
         specified conditions are met. If both are set, the task will be updated if either
         condition is met.
         """
-        skip_check = not (value_step or rate_limit)
-        time_check = rate_limit and self._check_update_time_interval(rate_limit)
-        value_check = value_step and self._check_update_value_interval(value, value_step)
-        if skip_check or time_check or value_check:
+        if self._should_update_value(value, value_step, rate_limit):
             self.update(value=value)
             return True
         return False
@@ -456,16 +861,8 @@ class Task:
 
         See [taskbadger.update_task][] for more information.
         """
-        if data and data_merge_strategy:
-            if hasattr(data_merge_strategy, "merge"):
-                data = data_merge_strategy.merge(self.data, data)
-            elif data_merge_strategy == "default":
-                data = DefaultMergeStrategy().merge(self.data, data)
-            else:
-                raise TaskbadgerException(f"Unknown data_merge_strategy: {data_merge_strategy!r}")
-
-        task = update_task(
-            self._task.id,
+        data = self._merge_data(data, data_merge_strategy)
+        kwargs = dict(
             name=name,
             status=status,
             value=value,
@@ -478,7 +875,25 @@ class Task:
             queue=queue,
             external_id=external_id,
         )
-        self._task = task._task
+        self._send_update(kwargs)
+
+    def _send_update(self, kwargs: dict, return_task: bool = True):
+        if dispatcher.submit_update(self._task.id, **kwargs):
+            self._apply_update(**kwargs)
+            return
+
+        try:
+            task = update_task(self._task.id, return_task=return_task, **kwargs)
+        except httpx.TimeoutException:
+            # out of time in an integration hook: send the update in the background instead
+            if not (_deadline.expired() and dispatcher.spill_update(self._task.id, **kwargs)):
+                raise
+            self._apply_update(**kwargs)
+            return
+        if return_task:
+            self._task = task._task
+        else:
+            self._apply_update(**kwargs)
 
     def add_actions(self, actions: list[Action]):
         """Add actions to the task.
@@ -504,40 +919,304 @@ class Task:
             bool: True if the task was updated, False otherwise
         """
         if self._check_update_time_interval(rate_limit):
-            self.update()
+            # nothing changes on the server that's worth parsing the response for
+            self._send_update({}, return_task=False)
             return True
         return False
 
-    @property
-    def tags(self):
-        return self._task.tags.to_dict()
+    def safe_update(self, **kwargs):
+        try:
+            self.update(**kwargs)
+        except Exception as e:
+            log.warning("Error updating task '%s': %s", self._task.id, e)
+
+
+class PendingTask(Task):
+    """A task that is being created from a background thread, returned by
+    `create_task(..., wait=False)`.
+
+    The fields given to `create_task` can be read straight away. Reading a field assigned by the
+    server (such as `id` or `public_url`) waits until the task has been created. Updates made before
+    then are applied to the local copy of the task and sent once the task exists.
+    """
+
+    SERVER_FIELDS = frozenset(
+        {
+            "id",
+            "organization",
+            "project",
+            "url",
+            "public_url",
+            "value_percent",
+            "created",
+            "start_time",
+            "end_time",
+            "time_to_start",
+        }
+    )
+
+    def __init__(self, create, name: str, kwargs: dict, safe: bool = False):
+        super().__init__(_provisional_task(name, kwargs))
+        self._safe = safe
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._error: Exception | None = None
+        self._created = False
+        # updates made before the task was created: (fields, data, data_merge_strategy)
+        self._buffered: list[tuple[dict, Any, Any]] = []
+
+        # imported here to avoid a circular import: pipeline imports sdk
+        from taskbadger.pipeline import executor
+
+        executor.submit(self._create, create, name, kwargs)
 
     def __getattr__(self, item):
+        if item in self.SERVER_FIELDS:
+            self.wait()
         return getattr(self._task, item)
 
-    def safe_update(self, **kwargs):
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for the task to be created.
+
+        Returns:
+            bool: True if the task was created. False if the timeout expired or the task could not
+            be created by `create_task_safe`. Errors from `create_task` are raised.
+        """
+        if not self._done.wait(timeout):
+            return False
+        if self._error is not None:
+            raise self._error
+        return self._created
+
+    def update(self, data: dict = None, data_merge_strategy: Any = None, **kwargs):
+        """See [taskbadger.Task.update][]. Updates made before the task has been created are sent once it has."""
+        if self._buffer(kwargs, data, data_merge_strategy):
+            return
+        if not self.wait():
+            log.debug("Task '%s' was not created, not updating it", self._task.name)
+            return
+        super().update(data=data, data_merge_strategy=data_merge_strategy, **kwargs)
+
+    def _send_update(self, kwargs: dict, return_task: bool = True):
+        fields = {key: value for key, value in kwargs.items() if key != "data"}
+        if self._buffer(fields, kwargs.get("data"), None):
+            return
+        if self.wait():
+            super()._send_update(kwargs, return_task)
+
+    def _buffer(self, kwargs: dict, data, data_merge_strategy) -> bool:
+        """Keep an update to send once the task has been created.
+
+        ``data`` is merged into the data of the created task when the update is sent; until then it is
+        merged into the local copy.
+
+        Returns:
+            bool: False if the create has finished: the update must be sent (or dropped) by the caller.
+        """
+        with self._lock:
+            if self._done.is_set():
+                return False
+            self._buffered.append((kwargs, data, data_merge_strategy))
+            self._apply_update(data=self._merge_data(data, data_merge_strategy), **kwargs)
+            return True
+
+    def _create(self, create, name, kwargs):
         try:
-            self.update(**kwargs)
+            task = create(name, **kwargs)
         except Exception as e:
-            log.warning("Error updating task '%s': %s", self._task.id, e)
+            self._error = e
+            self._done.set()
+            return
+        if task is None:
+            self._done.set()
+            return
+
+        with self._lock:
+            self._task = task._task
+        self._created = True
+        # send the updates made in the meantime, including any made while sending them
+        while True:
+            with self._lock:
+                buffered, self._buffered = self._buffered, []
+                if not buffered:
+                    self._done.set()
+                    break
+                fields = {}
+                for update_kwargs, data, data_merge_strategy in buffered:
+                    update = {**update_kwargs, "data": self._merge_data(data, data_merge_strategy)}
+                    self._apply_update(**update)
+                    fields = _spool.merge_fields(fields, update)
+            # imported here to avoid a circular import: safe_sdk imports sdk
+            from taskbadger.safe_sdk import update_task_safe
+
+            update_task_safe(task.id, return_task=False, **fields)
+
+
+def _provisional_task(name: str, kwargs: dict) -> TaskInternal:
+    """Local copy of a task that is being created, with the scope applied as the server would."""
+    scope = Badger.current.scope()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    fields = {
+        key: kwargs[key]
+        for key in ("status", "value", "value_max", "max_runtime", "stale_timeout", "queue", "external_id")
+        if kwargs.get(key) is not None
+    }
+    return TaskInternal(
+        id=None,
+        organization=None,
+        project=None,
+        name=name,
+        value_percent=None,
+        created=None,
+        updated=now,
+        url=None,
+        public_url=None,
+        data=scope.merge_data(kwargs.get("data")),
+        tags=TaskTags.from_dict(scope.merge_tags(kwargs.get("tags"))),
+        **fields,
+    )
 
-    def _check_update_time_interval(self, rate_limit: int = None):
-        if rate_limit and self._task.updated:
-            # tzinfo should always be set but for the sake of safety we check
-            if self._task.updated.tzinfo is None:
-                tz = None
-            else:
-                # Use timezone.utc for Python <3.11 compatibility
-                tz = datetime.timezone.utc
-            now = datetime.datetime.now(tz)
-            time_since = now - self._task.updated
-            return time_since.total_seconds() >= rate_limit
-        return True
 
-    def _check_update_value_interval(self, new_value, value_step: int = None):
-        if value_step and self._task.value:
-            return new_value - self._task.value >= value_step
-        return True
+class AsyncTask(_BaseTask):
+    """Async version of [taskbadger.Task][]. All methods which call the API are coroutines."""
+
+    @classmethod
+    async def get(cls, task_id: str, fresh: bool = False) -> "AsyncTask":
+        """Get an existing task"""
+        return await get_task_async(task_id, fresh=fresh)
+
+    @classmethod
+    async def create(
+        cls,
+        name: str,
+        status: StatusEnum = StatusEnum.PENDING,
+        value: int = None,
+        value_max: int = None,
+        data: dict = None,
+        max_runtime: int = None,
+        stale_timeout: int = None,
+        monitor_id: str = None,
+        tags: dict[str, str] = None,
+        queue: str = None,
+        external_id: str = None,
+    ) -> "AsyncTask":
+        """Create a new task
+
+        See [taskbadger.create_task][] for more information.
+        """
+        return await create_task_async(
+            name,
+            status,
+            value,
+            value_max,
+            data,
+            max_runtime=max_runtime,
+            stale_timeout=stale_timeout,
+            monitor_id=monitor_id,
+            tags=tags,
+            queue=queue,
+            external_id=external_id,
+        )
+
+    async def pre_processing(self):
+        """Update the task status to `pre_processing`."""
+        await self.update_status(StatusEnum.PRE_PROCESSING)
+
+    async def starting(self):
+        """Update the task status to `processing` and set the value to `0`."""
+        await self.processing(value=0)
+
+    async def processing(self, value: int = None):
+        """Update the task status to `processing` and set the value."""
+        await self.update(status=StatusEnum.PROCESSING, value=value)
+
+    async def post_processing(self, value: int = None):
+        """Update the task status to `post_processing` and set the value."""
+        await self.update(status=StatusEnum.POST_PROCESSING, value=value)
+
+    async def success(self, value: int = None):
+        """Update the task status to `success` and set the value."""
+        await self.update(status=StatusEnum.SUCCESS, value=value)
+
+    async def error(self, value: int = None, data: dict = None):
+        """Update the task status to `error` and set the value and data."""
+        await self.update(status=StatusEnum.ERROR, value=value, data=data)
+
+    async def canceled(self):
+        """Update the task status to `cancelled`"""
+        await self.update_status(StatusEnum.CANCELLED)
+
+    async def update_status(self, status: StatusEnum):
+        """Update the task status"""
+        await self.update(status=status)
+
+    async def increment_value(self, amount: int):
+        """See [taskbadger.Task.increment_value][]."""
+        await self.update(value=self._incremented_value(amount))
+
+    async def update_value(self, value: int, value_step: int = None, rate_limit: int = None) -> bool:
+        """See [taskbadger.Task.update_value][]."""
+        if self._should_update_value(value, value_step, rate_limit):
+            await self.update(value=value)
+            return True
+        return False
+
+    async def set_value_max(self, value_max: int):
+        """Set the `value_max`."""
+        await self.update(value_max=value_max)
+
+    async def update(
+        self,
+        name: str = None,
+        status: StatusEnum = None,
+        value: int = None,
+        value_max: int = None,
+        data: dict = None,
+        max_runtime: int = None,
+        stale_timeout: int = None,
+        tags: dict[str, str] = None,
+        queue: str = None,
+        external_id: str = None,
+        data_merge_strategy: Any = None,
+    ):
+        """Generic update method used to update any of the task fields.
+
+        See [taskbadger.update_task][] for more information.
+        """
+        data = self._merge_data(data, data_merge_strategy)
+        task = await update_task_async(
+            self._task.id,
+            name=name,
+            status=status,
+            value=value,
+            value_max=value_max,
+            data=data,
+            max_runtime=max_runtime,
+            stale_timeout=stale_timeout,
+            tags=tags,
+            queue=queue,
+            external_id=external_id,
+        )
+        self._task = task._task
+
+    async def tag(self, tags: dict[str, str]):
+        """Add tags to the task."""
+        await self.update(tags=tags)
+
+    async def ping(self, rate_limit=None) -> bool:
+        """See [taskbadger.Task.ping][]."""
+        if self._check_update_time_interval(rate_limit):
+            # nothing changes on the server that's worth parsing the response for
+            await update_task_async(self._task.id, return_task=False)
+            self._apply_update()
+            return True
+        return False
+
+    async def safe_update(self, **kwargs):
+        try:
+            await self.update(**kwargs)
+        except Exception as e:
+            log.warning("Error updating task '%s': %s", self._task.id, e)
 
 
 def _none_to_unset(value):
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from taskbadger._integrations import BaseSystemIntegration
-from taskbadger.procrastinate import _instrument_task, _patch_app_task, _patch_job_manager
+from taskbadger.procrastinate import _instrument_task, _patch_app_task, _patch_job_manager, _patch_run_worker
 
 
 class ProcrastinateSystemIntegration(BaseSystemIntegration):
@@ -42,6 +42,7 @@ class ProcrastinateSystemIntegration(BaseSystemIntegration):
             _instrument_task(task, system=self)
         _patch_app_task(app, system=self)
         _patch_job_manager(app, system=self)
+        _patch_run_worker(app)
 
     def track_task(self, task_name):
         # Never auto-track Procrastinate's built-in housekeeping tasks
@@ -1,16 +1,62 @@
 import pytest
 
+from taskbadger._breaker import circuit_breaker
+from taskbadger._dispatch import dispatcher
 from taskbadger._integrations import task_cache
+from taskbadger._ratelimit import rate_limiter
+from taskbadger._registry import registry
+from taskbadger._retry import retry_budget
+from taskbadger._sequence import sequencer
+from taskbadger._spool import spool
 from taskbadger.mug import Badger, Settings
+from taskbadger.pipeline import executor
 
 
 @pytest.fixture(autouse=True)
 def _clear_task_cache():
     """Clear the shared integrations task cache around every test so cached
     entries from earlier tests can't leak into later ones."""
-    task_cache.cache.clear()
+    task_cache.reset()
     yield
-    task_cache.cache.clear()
+    task_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_sequencer():
+    """Forget update sequence numbers so task ids reused across tests don't interact."""
+    sequencer.reset()
+    yield
+    sequencer.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    """Forget tasks returned by the API in earlier tests."""
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_background():
+    """Stop the background dispatcher, spool replay and pipeline threads after every test so
+    requests queued in one test can't be sent while another is running."""
+    yield
+    dispatcher.shutdown(timeout=5)
+    spool.shutdown(timeout=5)
+    executor.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def _reset_breaker():
+    """Close the circuit and refill the rate limit and retry budgets between tests."""
+    circuit_breaker.reset()
+    rate_limiter.reset()
+    retry_budget.reset()
+    yield
+    circuit_breaker.reset()
+    rate_limiter.reset()
+    retry_budget.reset()
 
 
 @pytest.fixture
@@ -0,0 +1,134 @@
+import logging
+import warnings
+from http import HTTPStatus
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import CircuitBreakerPolicy, StatusEnum, TransportConfig, circuit_breaker_state, update_task_safe
+from taskbadger._breaker import BreakerTransport, CircuitBreaker, circuit_breaker
+from taskbadger._dispatch import dispatcher
+from taskbadger.exceptions import CircuitOpen
+from taskbadger.internal.types import Response
+from taskbadger.safe_sdk import create_task_safe
+from taskbadger.sdk import init
+from tests.utils import task_for_test, update_body
+
+URL = "https://taskbadger.net/api/org/project/tasks/"
+POLICY = CircuitBreakerPolicy(failure_threshold=2, reset_timeout=60)
+
+
+def _init(policy=POLICY):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", transport=TransportConfig(retry=None, circuit_breaker=policy))
+
+
+@pytest.fixture(autouse=True)
+def _breaker():
+    circuit_breaker.reset()
+    _init()
+    yield
+    circuit_breaker.reset()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token")
+
+
+def test_state_transitions():
+    breaker = CircuitBreaker()
+    policy = CircuitBreakerPolicy(failure_threshold=2, reset_timeout=0)
+    breaker.record_failure(policy)
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure(policy)
+    assert breaker.state == "open"
+
+    # reset_timeout has passed: one probe is let through
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.short_circuited == 1
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 0
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker()
+    policy = CircuitBreakerPolicy(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure(policy)
+    assert breaker.allow()
+    breaker.record_failure(policy)
+    assert breaker.state == "open"
+
+
+def test_transport_short_circuits(httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectTimeout("timeout"), url=URL)
+    httpx_mock.add_response(url=URL, status_code=503)
+    breaker = CircuitBreaker()
+    with httpx.Client(transport=BreakerTransport(httpx.HTTPTransport(), POLICY, breaker)) as client:
+        with pytest.raises(httpx.ConnectTimeout):
+            client.get(URL)
+        assert client.get(URL).status_code == 503
+        with pytest.raises(CircuitOpen):
+            client.get(URL)
+    assert breaker.stats()["state"] == "open"
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_success_resets_failures(httpx_mock):
+    httpx_mock.add_response(url=URL, status_code=500)
+    httpx_mock.add_response(url=URL, status_code=404)
+    breaker = CircuitBreaker()
+    with httpx.Client(transport=BreakerTransport(httpx.HTTPTransport(), POLICY, breaker)) as client:
+        client.get(URL)
+        client.get(URL)
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 0
+
+
+def test_safe_sdk_skips_while_open(httpx_mock, caplog):
+    httpx_mock.add_response(url=URL, method="POST", status_code=503)
+    httpx_mock.add_response(url=f"{URL}task_id/", method="PATCH", status_code=503)
+    with caplog.at_level(logging.WARNING, logger="taskbadger"):
+        assert create_task_safe("name") is None
+        assert update_task_safe("task_id", value=1) is None
+        caplog.clear()
+
+        # no further requests are sent and nothing is logged
+        assert create_task_safe("name") is None
+        assert update_task_safe("task_id", status=StatusEnum.SUCCESS) is None
+    assert "Circuit breaker opened" not in caplog.text
+    assert "Error" not in caplog.text
+    assert len(httpx_mock.get_requests()) == 2
+
+    state = circuit_breaker_state()
+    assert state["state"] == "open"
+    assert state["short_circuited"] == 2
+    assert 0 < state["retry_in"] <= 60
+
+
+def test_spill_to_queue():
+    _init(CircuitBreakerPolicy(failure_threshold=1, reset_timeout=60, spill=True))
+    circuit_breaker.record_failure(POLICY)
+    circuit_breaker.record_failure(POLICY)
+    with (
+        mock.patch("taskbadger.sdk._update") as update,
+        mock.patch("taskbadger.sdk._patch_task", new=update),
+    ):
+        update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test())
+        assert update_task_safe("task_id", status=StatusEnum.SUCCESS) is None
+        assert update_task_safe("task_id", value=100) is None
+        update.assert_not_called()
+
+        assert dispatcher.flush(timeout=5)
+    update.assert_called_once()
+    body = update_body(update.call_args)
+    assert body["status"] == StatusEnum.SUCCESS
+    assert body["value"] == 100
@@ -172,7 +172,7 @@ def test_celery_global_tags(celery_session_app, celery_session_worker):
     Badger.current.scope().tag({"tag1": "value1", "tag2": "value2"})
 
     with (
-        mock.patch("taskbadger.sdk.task_create.sync_detailed") as create,
+        mock.patch("taskbadger.sdk._create") as create,
         mock.patch("taskbadger.celery.update_task_safe"),
         mock.patch("taskbadger.sdk.get_task"),
     ):
@@ -220,6 +220,25 @@ def test_task_name_matching(include, exclude, expected: bool):
     assert integration.track_task("myapp.tasks.export_data") is expected
 
 
+@pytest.mark.usefixtures("_bind_settings_with_system")
+def test_celery_worker_process_init_warms_up_connection():
+    from taskbadger.celery import worker_process_init_handler
+
+    with mock.patch("taskbadger.celery.client_pool.warm_up") as warm_up:
+        worker_process_init_handler()
+
+    warm_up.assert_called_once_with(Badger.current.settings)
+
+
+def test_celery_worker_shutdown_flushes_dispatcher():
+    from taskbadger.celery import worker_shutdown_handler
+
+    with mock.patch("taskbadger.celery.dispatcher.flush") as flush:
+        worker_shutdown_handler()
+
+    flush.assert_called_once_with()
+
+
 def test_celery_system_integration_connects_signals():
     # clean the slate
     _disconnect_signals()
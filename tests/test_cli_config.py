@@ -8,6 +8,8 @@ from typer.testing import CliRunner
 
 from taskbadger.cli_main import app
 from taskbadger.config import Config, write_config
+from taskbadger.exceptions import ConfigurationError
+from taskbadger.mug import CircuitBreakerPolicy, RateLimitPolicy, RetryPolicy, TransportConfig
 
 runner = CliRunner()
 
@@ -127,6 +129,46 @@ def test_configure(mock_config_location):
     }
 
 
+def test_transport_config(mock_config_location):
+    config = Config(
+        organization_slug="test_org",
+        project_slug="test_project",
+        token="test_token",
+        transport={"read_timeout": 2.5, "max_connections": 4},
+    )
+    write_config(config)
+
+    result = runner.invoke(app, ["info"])
+    assert "read_timeout: 2.5" in result.stdout
+
+    with mock_config_location.open("rt", encoding="utf-8") as fp:
+        config_dict = tomlkit.load(fp).unwrap()
+    transport = Config.from_dict(config_dict).get_transport()
+    assert transport == TransportConfig(read_timeout=2.5, max_connections=4)
+
+
+def test_transport_retry_config():
+    config = Config(transport={"retry": {"max_retries": 5, "retry_statuses": [503]}})
+    assert config.get_transport().retry == RetryPolicy(max_retries=5, retry_statuses=frozenset({503}))
+    assert Config(transport={"retry": False}).get_transport().retry is None
+
+
+def test_transport_circuit_breaker_config():
+    config = Config(transport={"circuit_breaker": {"failure_threshold": 2, "spill": True}})
+    assert config.get_transport().circuit_breaker == CircuitBreakerPolicy(failure_threshold=2, spill=True)
+
+
+def test_transport_rate_limit_config():
+    config = Config(transport={"rate_limit": {"rate": 10, "burst": 20}})
+    assert config.get_transport().rate_limit == RateLimitPolicy(rate=10, burst=20)
+
+
+def test_transport_config_invalid():
+    config = Config(transport={"read_timeout": 2.5, "bad_option": 1})
+    with pytest.raises(ConfigurationError, match="Invalid transport configuration"):
+        config.get_transport()
+
+
 def _check_output(result, org, project, token, tags=None):
     assert result.exit_code == 0
     assert f"Organization slug: {org}" in result.stdout
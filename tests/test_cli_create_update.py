@@ -35,7 +35,7 @@ def _mock_env():
 
 def test_cli_create():
     with (
-        mock.patch("taskbadger.sdk.task_create.sync_detailed") as create,
+        mock.patch("taskbadger.sdk._create") as create,
     ):
         task = task_for_test()
         create.return_value = Response(HTTPStatus.OK, b"", {}, task)
@@ -73,7 +73,7 @@ def test_cli_create():
 
 
 def test_cli_update():
-    with mock.patch("taskbadger.sdk.task_partial_update.sync_detailed") as update:
+    with mock.patch("taskbadger.sdk._update") as update:
         task = task_for_test()
         update.return_value = Response(HTTPStatus.OK, b"", {}, task)
 
@@ -130,8 +130,9 @@ def _test_cli_run(command, return_code, args=None, action=None, tags=None, updat
         return Response(HTTPStatus.OK, b"", {}, task_return)
 
     with (
-        mock.patch("taskbadger.sdk.task_create.sync_detailed") as create,
-        mock.patch("taskbadger.sdk.task_partial_update.sync_detailed", new=_update),
+        mock.patch("taskbadger.sdk._create") as create,
+        mock.patch("taskbadger.sdk._update", new=_update),
+        mock.patch("taskbadger.sdk._patch_task", new=_update),
     ):
         task = task_for_test()
         create.return_value = Response(HTTPStatus.OK, b"", {}, task)
@@ -0,0 +1,156 @@
+import json
+import time
+import warnings
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import RetryPolicy, StatusEnum, TransportConfig, track, update_task_safe
+from taskbadger._deadline import DeadlineTransport, hook_deadline, remaining
+from taskbadger._dispatch import dispatcher
+from taskbadger._retry import RetryBudget, RetryTransport
+from taskbadger.exceptions import DeadlineExceeded
+from taskbadger.sdk import Task, init
+from tests.test_sdk_primatives import _json_task_response
+from tests.utils import task_for_test
+
+URL = "https://taskbadger.net/api/org/project/tasks/"
+
+
+def _init(hook_deadline=None, **kwargs):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", hook_deadline=hook_deadline, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    yield
+    _init()
+
+
+def test_no_deadline_configured():
+    _init()
+    with hook_deadline():
+        assert remaining() is None
+
+
+def test_nested_deadline_keeps_earliest():
+    _init(hook_deadline=1)
+    with hook_deadline():
+        outer = remaining()
+        assert 0 < outer <= 1
+        _init(hook_deadline=10)
+        with hook_deadline():
+            assert remaining() <= outer
+    assert remaining() is None
+
+
+def test_timeouts_capped(httpx_mock):
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    _init(hook_deadline=0.5)
+    with httpx.Client(transport=DeadlineTransport(httpx.HTTPTransport()), timeout=5) as client:
+        with hook_deadline():
+            client.get(URL)
+        client.get(URL)
+
+    capped, uncapped = httpx_mock.get_requests()
+    assert all(0 < value <= 0.5 for value in capped.extensions["timeout"].values())
+    assert uncapped.extensions["timeout"]["read"] == 5
+
+
+def test_expired_deadline_not_sent(httpx_mock):
+    _init(hook_deadline=0)
+    with httpx.Client(transport=DeadlineTransport(httpx.HTTPTransport())) as client:
+        with hook_deadline(), pytest.raises(DeadlineExceeded):
+            client.get(URL)
+    assert not httpx_mock.get_requests()
+
+
+def test_no_retry_in_hook_without_deadline(httpx_mock):
+    httpx_mock.add_response(url=URL, status_code=503)
+    _init()
+    transport = RetryTransport(DeadlineTransport(httpx.HTTPTransport()), RetryPolicy(), RetryBudget())
+    with httpx.Client(transport=transport) as client, mock.patch("time.sleep") as sleep:
+        with hook_deadline():
+            assert client.get(URL).status_code == 503
+        sleep.assert_not_called()
+
+        # outside of hooks the policy applies as usual
+        httpx_mock.add_response(url=URL, status_code=503)
+        httpx_mock.add_response(url=URL, json={})
+        assert client.get(URL).status_code == 200
+    assert sleep.call_count == 1
+
+
+def test_no_retry_past_deadline(httpx_mock):
+    httpx_mock.add_response(url=URL, status_code=503)
+    _init(hook_deadline=0.5)
+    policy = RetryPolicy(backoff_factor=1, jitter=False)
+    transport = RetryTransport(DeadlineTransport(httpx.HTTPTransport()), policy, RetryBudget())
+    with httpx.Client(transport=transport) as client, hook_deadline(), mock.patch("time.sleep") as sleep:
+        assert client.get(URL).status_code == 503
+    sleep.assert_not_called()
+
+
+def test_update_deferred_when_deadline_exceeded(httpx_mock):
+    httpx_mock.add_response(
+        url=f"{URL}test_id/",
+        method="PATCH",
+        match_json={"status": "success"},
+        json=_json_task_response(status="success"),
+    )
+    _init(hook_deadline=0)
+    with hook_deadline():
+        assert update_task_safe("test_id", status=StatusEnum.SUCCESS) is None
+    assert not httpx_mock.get_requests()
+
+    # sent from the background thread without a deadline
+    assert dispatcher.flush(timeout=5)
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_task_update_deferred_when_deadline_exceeded(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}test_id/", method="PATCH", json=_json_task_response(value=5))
+    _init(hook_deadline=0)
+    task = Task(task_for_test(id="test_id"))
+    with hook_deadline():
+        task.update(value=5)
+    assert task.value == 5
+    assert dispatcher.flush(timeout=5)
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_task_update_outside_hook_raises(httpx_mock):
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"), url=f"{URL}test_id/", method="PATCH")
+    _init(transport=TransportConfig(retry=None))
+    task = Task(task_for_test(id="test_id"))
+    with pytest.raises(httpx.ReadTimeout):
+        task.update(value=5)
+
+
+def test_track_create_not_waited_for(httpx_mock):
+    def _create(request):
+        time.sleep(0.5)
+        return httpx.Response(201, json=_json_task_response(id="test_id"))
+
+    httpx_mock.add_callback(_create, url=URL, method="POST")
+    httpx_mock.add_response(url=f"{URL}test_id/", method="PATCH", json=_json_task_response(id="test_id"))
+    _init(hook_deadline=0)
+
+    @track
+    def add(a, b):
+        return a + b
+
+    start = time.monotonic()
+    assert add(1, 2) == 3
+    assert time.monotonic() - start < 0.5
+
+    # the task is created in the background, without the deadline, then updated
+    deadline = time.monotonic() + 5
+    while not httpx_mock.get_requests(method="PATCH") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(httpx_mock.get_requests(method="POST")) == 1
+    (update,) = httpx_mock.get_requests(method="PATCH")
+    assert json.loads(update.content) == {"status": "success"}
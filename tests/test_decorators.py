@@ -28,6 +28,7 @@ def test_track_decorator_args(create):
     assert create.call_count == 1
     assert create.call_args.args[0] == "new name"
     assert create.call_args.kwargs == {
+        "wait": False,
         "status": "processing",
         "monitor_id": "test",
         "max_runtime": 1,
@@ -54,6 +55,8 @@ def test_track_decorator_error(update, create):
 
 @mock.patch("taskbadger.decorators._update_safe")
 def test_track_decorator_badger_not_configured(update):
+    Badger.current.bind(None)
+
     @track
     def test(arg):
         return arg
@@ -0,0 +1,232 @@
+import logging
+import threading
+import time
+import warnings
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from taskbadger import DispatchConfig, StatusEnum, update_task_safe
+from taskbadger._dispatch import Dispatcher, dispatcher
+from taskbadger.internal.types import Response
+from taskbadger.mug import Badger
+from taskbadger.sdk import Task, init
+from tests.utils import task_for_test, update_body
+
+
+def _init(dispatch=None):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", dispatch=dispatch)
+
+
+@pytest.fixture
+def _background():
+    _init(DispatchConfig())
+    yield
+    dispatcher.flush()
+    _init()
+
+
+@pytest.fixture
+def patched_update():
+    with (
+        mock.patch("taskbadger.sdk._update") as update,
+        mock.patch("taskbadger.sdk._patch_task", new=update),
+    ):
+        update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test())
+        yield update
+
+
+def test_update_inline_when_disabled(patched_update):
+    _init()
+    assert update_task_safe("task_id", status=StatusEnum.SUCCESS) is not None
+    patched_update.assert_called_once()
+
+
+@pytest.mark.usefixtures("_background")
+def test_update_task_safe_background(patched_update):
+    threads = []
+    patched_update.side_effect = lambda **kwargs: (
+        threads.append(threading.current_thread().name) or Response(HTTPStatus.OK, b"", {}, task_for_test())
+    )
+
+    assert update_task_safe("task1", status=StatusEnum.PROCESSING) is None
+    assert update_task_safe("task2", status=StatusEnum.SUCCESS) is None
+    assert dispatcher.flush(timeout=5)
+
+    # the terminal update is sent first
+    assert [c.kwargs["id"] for c in patched_update.call_args_list] == ["task2", "task1"]
+    assert threads == ["taskbadger-dispatch", "taskbadger-dispatch"]
+
+
+@pytest.mark.usefixtures("_background")
+def test_background_uses_caller_settings(patched_update):
+    settings = Badger.current.settings
+    update_task_safe("task_id", value=1)
+    dispatcher.flush(timeout=5)
+    assert patched_update.call_args.kwargs["organization_slug"] == settings.organization_slug
+
+
+@pytest.mark.usefixtures("_background")
+def test_task_update_background(patched_update):
+    task = Task(task_for_test(value=1))
+    updated = task.updated
+
+    task.update(value=5, tags={"a": "b"})
+    assert task.value == 5
+    assert task.tags == {"a": "b"}
+    assert task.updated > updated
+
+    task.increment_value(5)
+    assert task.value == 10
+
+    dispatcher.flush(timeout=5)
+    patched_update.assert_called_once()
+    body = update_body(patched_update.call_args)
+    assert body["value"] == 10
+    assert body["tags"] == {"a": "b"}
+
+
+@pytest.mark.usefixtures("_background")
+def test_updates_coalesced(patched_update):
+    task = Task(task_for_test())
+    for i in range(100):
+        task.update(value=i, data={"item": i}, data_merge_strategy="default")
+    task.tag({"x": "1"})
+    task.tag({"y": "2"})
+    task.success(value=100)
+    update_task_safe("other", value=1)
+
+    dispatcher.flush(timeout=5)
+    assert [c.kwargs["id"] for c in patched_update.call_args_list] == [task.id, "other"]
+    body = update_body(patched_update.call_args_list[0])
+    assert body["status"] == StatusEnum.SUCCESS
+    assert body["value"] == 100
+    assert body["data"] == {"item": 99}
+    assert body["tags"] == {"x": "1", "y": "2"}
+
+
+def test_coalesce_window(patched_update):
+    # the window is held open until the flush
+    _init(DispatchConfig(coalesce_window=60))
+    try:
+        update_task_safe("task_id", value=1)
+        update_task_safe("task_id", value=2)
+        assert not patched_update.called
+        assert dispatcher.flush(timeout=5)
+        assert patched_update.call_count == 1
+        assert update_body(patched_update.call_args)["value"] == 2
+    finally:
+        dispatcher.flush()
+        _init()
+
+
+@pytest.mark.usefixtures("_background")
+def test_background_errors_logged(patched_update, caplog):
+    patched_update.side_effect = Exception("boom")
+    task = Task(task_for_test(id="task_id"))
+    with caplog.at_level(logging.WARNING, logger="taskbadger"):
+        task.update(value=5)
+        dispatcher.flush(timeout=5)
+    assert "Error updating task 'task_id': boom" in caplog.text
+
+
+def test_queue_full_sends_inline(patched_update):
+    _init(DispatchConfig(max_queue_size=0))
+    try:
+        assert update_task_safe("task_id", value=1) is not None
+        patched_update.assert_called_once()
+    finally:
+        _init()
+
+
+@pytest.mark.usefixtures("_background")
+def test_flush_timeout(patched_update):
+    blocker = threading.Event()
+    patched_update.side_effect = lambda **kwargs: blocker.wait(5)
+    try:
+        update_task_safe("task_id", value=1)
+        assert not dispatcher.flush(timeout=0.05)
+        blocker.set()
+        assert dispatcher.flush(timeout=5)
+    finally:
+        blocker.set()
+
+
+def test_terminal_updates_sent_first(patched_update):
+    _init(DispatchConfig(coalesce_window=60))
+    try:
+        update_task_safe("progress1", value=1)
+        update_task_safe("done", status=StatusEnum.SUCCESS)
+        _wait_for(lambda: patched_update.called)
+        assert [c.kwargs["id"] for c in patched_update.call_args_list] == ["done"]
+        assert dispatcher.flush(timeout=5)
+        assert [c.kwargs["id"] for c in patched_update.call_args_list] == ["done", "progress1"]
+    finally:
+        _init()
+
+
+def test_terminal_update_promotes_queued_progress(patched_update):
+    _init(DispatchConfig(coalesce_window=60))
+    try:
+        update_task_safe("other", value=1)
+        update_task_safe("task_id", value=50)
+        update_task_safe("task_id", status=StatusEnum.ERROR)
+        _wait_for(lambda: patched_update.called)
+        assert patched_update.call_args.kwargs["id"] == "task_id"
+        body = update_body(patched_update.call_args)
+        assert body["value"] == 50
+        assert body["status"] == StatusEnum.ERROR
+    finally:
+        dispatcher.flush()
+        _init()
+
+
+def test_queue_full_drop_oldest(patched_update):
+    _init(DispatchConfig(max_queue_size=2, overflow="drop_oldest", coalesce_window=60))
+    local_dispatcher = Dispatcher()
+    try:
+        with mock.patch.object(local_dispatcher, "_ensure_started"):
+            for i in range(5):
+                assert local_dispatcher.submit_update(f"task{i}", value=i)
+            # terminal updates are never dropped
+            assert local_dispatcher.submit_update("task5", status=StatusEnum.SUCCESS)
+            assert local_dispatcher.submit_update("task6", status=StatusEnum.CANCELLED)
+        assert list(local_dispatcher._low) == ["task3", "task4"]
+        assert list(local_dispatcher._high) == ["task5", "task6"]
+        assert local_dispatcher.dropped == 3
+    finally:
+        _init()
+
+
+def test_queue_full_terminal_queued(patched_update):
+    _init(DispatchConfig(max_queue_size=0, coalesce_window=60))
+    try:
+        assert update_task_safe("task_id", value=1) is not None
+        assert update_task_safe("task_id", status=StatusEnum.SUCCESS) is None
+        assert dispatcher.flush(timeout=5)
+        assert patched_update.call_count == 2
+    finally:
+        _init()
+
+
+def test_reset_discards_queue():
+    local_dispatcher = Dispatcher()
+    _init(DispatchConfig(coalesce_window=60))
+    try:
+        with mock.patch.object(local_dispatcher, "_ensure_started"):
+            assert local_dispatcher.submit_update("task_id", value=1)
+        local_dispatcher.reset()
+        assert local_dispatcher.flush(timeout=0)
+        assert local_dispatcher.pending() == 0
+    finally:
+        _init()
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
@@ -1,8 +1,10 @@
+import json
 import warnings
+from unittest import mock
 
 import pytest
 
-from taskbadger import Badger, init
+from taskbadger import Badger, TransportConfig, _json, init
 from taskbadger.exceptions import ConfigurationError
 from taskbadger.mug import _local
 
@@ -34,5 +36,58 @@ def test_init_import_before_create_fail():
             init("org", "project", "token", before_create="missing")
 
 
+def test_init_transport():
+    transport = TransportConfig(read_timeout=1, max_connections=2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", transport=transport)
+    assert Badger.current.settings.transport == transport
+
+
+def test_init_transport_http2_missing_dependency():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        with (
+            mock.patch("taskbadger.sdk.importlib.util.find_spec", return_value=None),
+            pytest.raises(ConfigurationError, match="h2"),
+        ):
+            init("org", "project", "token", transport=TransportConfig(http2=True))
+
+
 def _before_create(_):
     pass
+
+
+@pytest.fixture
+def _restore_codec():
+    codec = _json.codec
+    yield
+    _json.codec = codec
+
+
+@pytest.mark.usefixtures("_restore_codec")
+def test_init_json_codec():
+    codec = _json.Codec("custom", json.dumps, json.loads)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", json_codec="json")
+        assert _json.codec.name == "json"
+        init("org", "project", "token", json_codec=codec)
+        assert _json.codec is codec
+        # not given: the codec is left as it is
+        init("org", "project", "token")
+        assert _json.codec is codec
+
+
+@pytest.mark.usefixtures("_restore_codec")
+@pytest.mark.parametrize(("name", "installed"), [("nope", True), ("orjson", False)])
+def test_init_json_codec_invalid(name, installed):
+    codec = _json.codec
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        with (
+            mock.patch("taskbadger.sdk.importlib.util.find_spec", return_value=object() if installed else None),
+            pytest.raises(ConfigurationError, match=name),
+        ):
+            init("org", "project", "token", json_codec=name)
+    assert _json.codec is codec
@@ -0,0 +1,146 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from taskbadger import TaskCacheConfig, task_cache_stats
+from taskbadger._integrations import ENTRY_OVERHEAD, TaskCache, approximate_size, task_cache
+from taskbadger.mug import Badger, Settings
+from taskbadger.sdk import Task
+from tests.utils import task_for_test
+
+
+def test_lru():
+    cache = TaskCache(TaskCacheConfig(max_entries=2))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # refreshes "a"
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+
+def test_max_bytes():
+    data = {"output": "x" * 5000}
+    size = approximate_size(Task(task_for_test(data=data)))
+    assert size > 5000 + ENTRY_OVERHEAD
+    cache = TaskCache(TaskCacheConfig(max_bytes=size * 2 + ENTRY_OVERHEAD))
+    cache.set("a", Task(task_for_test(data=data)))
+    cache.set("b", Task(task_for_test(data=data)))
+    cache.set("c", "small")
+    assert cache.bytes == size * 2 + ENTRY_OVERHEAD
+    cache.set("d", "small")
+    assert cache.get("a") is None
+    assert len(cache) == 3
+    assert cache.evictions == 1
+
+
+def test_larger_than_max_bytes():
+    cache = TaskCache(TaskCacheConfig(max_bytes=2000))
+    cache.set("a", "small")
+    cache.set("a", Task(task_for_test(data={"output": "x" * 5000})))
+    assert cache.get("a") is None
+    assert cache.bytes == 0
+
+
+def test_ttl():
+    cache = TaskCache(TaskCacheConfig(ttl=10))
+    with mock.patch("taskbadger._integrations.time.monotonic", return_value=100):
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=20)
+    with mock.patch("taskbadger._integrations.time.monotonic", return_value=110):
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": ENTRY_OVERHEAD,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "expirations": 1,
+    }
+
+
+def test_no_ttl():
+    cache = TaskCache(TaskCacheConfig(ttl=None))
+    cache.set("a", 1)
+    with mock.patch("taskbadger._integrations.time.monotonic", return_value=1e12):
+        assert cache.get("a") == 1
+
+
+def test_unset_and_clear():
+    cache = TaskCache(TaskCacheConfig())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.unset("a")
+    assert cache.bytes == ENTRY_OVERHEAD
+    cache.clear()
+    assert (len(cache), cache.bytes) == (0, 0)
+
+
+def test_config_from_settings():
+    config = TaskCacheConfig(max_entries=1)
+    Badger.current.bind(Settings("https://taskbadger.net", "token", "org", "proj", task_cache=config))
+    try:
+        task_cache.set("a", 1)
+        task_cache.set("b", 2)
+        assert task_cache.get("a") is None
+    finally:
+        Badger.current.bind(None)
+
+
+@pytest.mark.parametrize("data", [None, {}, {"a": object()}])
+def test_approximate_size_fallback(data):
+    assert approximate_size(Task(task_for_test(data=data))) >= ENTRY_OVERHEAD
+
+
+def test_approximate_size_not_encoded():
+    data = {"output": "x" * 5000, "nested": {"rows": list(range(100))}}
+    with mock.patch("taskbadger._json.dumps", side_effect=AssertionError("encoded")):
+        size = approximate_size(Task(task_for_test(data=data)))
+    assert 5000 + ENTRY_OVERHEAD < size < 12000 + ENTRY_OVERHEAD
+
+
+def test_approximate_size_nested():
+    data = {"procrastinate_task_kwargs": {"payload": "y" * 10_000_000}}
+    assert approximate_size(Task(task_for_test(data=data))) > 10_000_000
+
+
+def test_approximate_size_extrapolated():
+    data = {"celery_task_args": [["x" * 100] for _ in range(100_000)]}
+    size = approximate_size(Task(task_for_test(data=data)))
+    assert 100 * 100_000 < size < 1000 * 100_000
+
+
+def test_task_cache_stats():
+    task_cache.set("a", 1)
+    task_cache.get("a")
+    assert task_cache_stats() == {
+        "entries": 1,
+        "bytes": ENTRY_OVERHEAD,
+        "hits": 1,
+        "misses": 0,
+        "evictions": 0,
+        "expirations": 0,
+    }
+
+
+def test_threads():
+    cache = TaskCache(TaskCacheConfig(max_entries=50))
+
+    def work(n):
+        for i in range(2000):
+            key = (n, i % 100)
+            cache.set(key, i)
+            cache.get(key)
+            if i % 7 == 0:
+                cache.unset((n, (i - 1) % 100))
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 50
+    assert cache.bytes == 50 * ENTRY_OVERHEAD
@@ -0,0 +1,71 @@
+import dataclasses
+import datetime
+import importlib.util
+import json
+from unittest import mock
+
+import pytest
+
+from taskbadger import StatusEnum, _json
+
+CODECS = [
+    pytest.param(name, marks=pytest.mark.skipif(importlib.util.find_spec(name) is None, reason=f"{name} not installed"))
+    for name in _json.CODECS
+]
+
+
+@pytest.fixture(params=CODECS)
+def codec(request):
+    codec = _json.get_codec(request.param)
+    with mock.patch.object(_json, "codec", codec):
+        yield codec
+
+
+def test_roundtrip(codec):
+    data = {"status": StatusEnum.SUCCESS, "value": 1.5, "items": (1, "ü", None), "nested": {"a": [True]}}
+    encoded = _json.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {"status": "success", "value": 1.5, "items": [1, "ü", None], "nested": {"a": [True]}}
+    assert _json.loads(encoded) == json.loads(encoded)
+    assert _json.loads(encoded.decode()) == json.loads(encoded)
+
+
+def test_non_str_keys(codec):
+    assert _json.loads(_json.dumps({1: "a"})) == {"1": "a"}
+
+
+@pytest.mark.parametrize("value", [2**64, -(2**63) - 1, 10**30])
+def test_big_ints(codec, value):
+    encoded = _json.dumps({"id": value})
+    assert encoded == json.dumps({"id": value}, separators=(",", ":")).encode()
+    decoded = _json.loads(encoded)
+    assert decoded == {"id": value}
+    assert isinstance(decoded["id"], int)
+    assert _json.loads(encoded.decode()) == {"id": value}
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+
+
+@pytest.mark.parametrize("value", [datetime.datetime(2024, 5, 1), datetime.date(2024, 5, 1), _Point(1)])
+def test_rejected_like_stdlib(codec, value):
+    with pytest.raises(TypeError):
+        json.dumps({"a": value})
+    with pytest.raises(TypeError):
+        _json.dumps({"a": value})
+
+
+def test_errors(codec):
+    with pytest.raises(TypeError):
+        _json.dumps({"a": object()})
+    with pytest.raises(ValueError):  # noqa: PT011
+        _json.loads(b"{not json")
+
+
+def test_fastest_installed():
+    expected = "orjson" if importlib.util.find_spec("orjson") else "json"
+    assert _json.get_codec().name == expected
+    with mock.patch("importlib.util.find_spec", return_value=None):
+        assert _json.get_codec().name == "json"
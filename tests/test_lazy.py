@@ -0,0 +1,104 @@
+import datetime
+
+import pytest
+
+from taskbadger import StatusEnum
+from taskbadger._lazy import FIELDS, LazyTask, parse_datetime
+from taskbadger.internal.models import Task as TaskInternal
+from taskbadger.internal.models import TaskTags
+from taskbadger.internal.types import UNSET
+from taskbadger.sdk import Task, list_tasks
+
+RAW = {
+    "id": "test_id",
+    "organization": "org",
+    "project": "project",
+    "name": "demo task",
+    "status": "processing",
+    "value": 5,
+    "value_max": 100,
+    "value_percent": 5,
+    "data": {"custom": "value"},
+    "created": "2022-09-22T06:53:40.683555Z",
+    "updated": "2022-09-22T06:53:41+00:00",
+    "start_time": "2022-09-22T06:53:41.1Z",
+    "end_time": None,
+    "url": None,
+    "public_url": None,
+    "tags": {"tag": "value"},
+    "extra": 1,
+}
+
+
+def test_fields_match_model():
+    task = LazyTask(dict(RAW))
+    expected = TaskInternal.from_dict(RAW)
+    for name in FIELDS:
+        assert getattr(task, name) == getattr(expected, name), name
+    assert task.additional_properties == expected.additional_properties == {"extra": 1}
+    assert isinstance(task.status, StatusEnum)
+    assert isinstance(task.tags, TaskTags)
+    assert task.created.tzinfo is not None
+
+
+def test_parsed_once():
+    task = LazyTask(dict(RAW))
+    assert task.created is task.created
+    assert task.data is RAW["data"]
+
+
+def test_missing_fields_unset():
+    task = LazyTask(dict(RAW))
+    expected = TaskInternal.from_dict(RAW)
+    for name in ("queue", "external_id", "max_runtime", "time_to_start"):
+        assert getattr(task, name) is getattr(expected, name) is UNSET
+
+
+def test_unknown_attribute():
+    task = LazyTask(dict(RAW))
+    with pytest.raises(AttributeError):
+        _ = task.other
+    with pytest.raises(AttributeError):
+        task.other = 1
+
+
+def test_to_dict():
+    task = LazyTask(dict(RAW))
+    assert task.to_dict() == RAW
+
+    now = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    task.status = StatusEnum.SUCCESS
+    task.updated = now
+    task.tags = TaskTags.from_dict({"a": "b"})
+    assert task.to_dict() == {**RAW, "status": "success", "updated": now.isoformat(), "tags": {"a": "b"}}
+    assert RAW["status"] == "processing"
+
+
+def test_task_wrapper():
+    task = Task(LazyTask(dict(RAW)))
+    assert task.tags == {"tag": "value"}
+    task._apply_update(value=10, tags={"x": "y"})
+    assert task.value == 10
+    assert task.tags == {"tag": "value", "x": "y"}
+    assert task.updated > parse_datetime(RAW["updated"])
+
+
+def test_parse_datetime():
+    expected = datetime.datetime(2022, 9, 22, 6, 53, 40, tzinfo=datetime.timezone.utc)
+    assert parse_datetime("2022-09-22T06:53:40Z") == expected
+    assert parse_datetime("20220922T065340+0000") == expected
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_list_tasks(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/proj/tasks/?page_size=10",
+        method="GET",
+        json={"results": [RAW, {**RAW, "id": "task2"}], "next": "https://next", "previous": None},
+    )
+    page = list_tasks(page_size=10)
+    assert [task.id for task in page.results] == ["test_id", "task2"]
+    assert all(isinstance(task, LazyTask) for task in page.results)
+    assert page.next_ == "https://next"
+    assert page.previous is None
+    assert page.to_dict()["results"][1] == {**RAW, "id": "task2"}
@@ -0,0 +1,92 @@
+import contextvars
+import threading
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from taskbadger import Badger, create_task_future, pipeline, update_task_future
+from taskbadger._sequence import sequencer
+from taskbadger.exceptions import UnexpectedStatus
+from taskbadger.internal.types import Response
+from taskbadger.pipeline import _update_task
+from tests.utils import task_for_test
+
+pytestmark = pytest.mark.usefixtures("_bind_settings")
+
+
+@pytest.fixture
+def patched_create():
+    with mock.patch("taskbadger.sdk._create") as create:
+        create.return_value = Response(HTTPStatus.CREATED, b"", {}, task_for_test())
+        yield create
+
+
+@pytest.fixture
+def patched_update():
+    with mock.patch("taskbadger.sdk._update") as update:
+        update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test())
+        yield update
+
+
+def test_requests_overlap(patched_create):
+    # each request only completes once all three are in flight at the same time
+    barrier = threading.Barrier(3, timeout=5)
+    threads = set()
+
+    def _create(**kwargs):
+        barrier.wait()
+        threads.add(threading.current_thread().name)
+        return Response(HTTPStatus.CREATED, b"", {}, task_for_test(id=kwargs["body"].name))
+
+    patched_create.side_effect = _create
+    with pipeline() as pipe:
+        for i in range(3):
+            pipe.create_task(f"task{i}")
+    assert [task.id for task in pipe.results()] == ["task0", "task1", "task2"]
+    assert len(threads) == 3
+    assert all(name.startswith("taskbadger-pipeline") for name in threads)
+
+
+def test_uses_caller_scope(patched_create):
+    with Badger.current.scope() as scope:
+        scope["context"] = "value"
+        future = create_task_future("name", data={"a": 1})
+    future.result(timeout=5)
+    assert patched_create.call_args.kwargs["body"].data == {"context": "value", "a": 1}
+    assert patched_create.call_args.kwargs["organization_slug"] == "org"
+
+
+def test_update_future(patched_update):
+    patched_update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test(id="task_id"))
+    task = update_task_future("task_id", value=5).result(timeout=5)
+    assert task.id == "task_id"
+    assert patched_update.call_args.kwargs["body"].value == 5
+    assert sequencer._tasks["task_id"].acknowledged == 1
+
+
+def test_stale_update_not_sent(patched_update):
+    stale = sequencer.next("task_id")
+    update_task_future("task_id", value=90).result(timeout=5)
+    assert _update_task("task_id", stale, {"value": 40}) is None
+    patched_update.assert_called_once()
+
+
+def test_stale_update_other_fields_sent(patched_update):
+    stale = sequencer.next("task_id")
+    update_task_future("task_id", value=90).result(timeout=5)
+    # run in its own context like the executor does: sending the update sets a context variable
+    context = contextvars.copy_context()
+    assert context.run(_update_task, "task_id", stale, {"value": 40, "data": {"rows": 10}}) is not None
+    body = patched_update.call_args.kwargs["body"]
+    assert body.to_dict() == {"data": {"rows": 10}}
+
+
+def test_errors(patched_update):
+    patched_update.return_value = Response(HTTPStatus.BAD_REQUEST, b"", {}, None)
+    with pipeline() as pipe:
+        future = pipe.update_task("task_id", value=1)
+    with pytest.raises(UnexpectedStatus):
+        future.result(timeout=0)
+    with pytest.raises(UnexpectedStatus):
+        pipe.results()
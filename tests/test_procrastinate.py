@@ -7,7 +7,7 @@ import pytest
 from procrastinate import testing
 
 from taskbadger import StatusEnum
-from taskbadger.procrastinate import TB_TASK_ID_KWARG, _instrument_task, current_task, track
+from taskbadger.procrastinate import TB_TASK_ID_KWARG, _instrument_task, _serialize_kwargs, current_task, track
 from tests.utils import task_for_test
 
 
@@ -199,7 +199,7 @@ def test_defer_records_job_id_as_external_id(app):
     ):
         job_id = add_ext.defer(a=1, b=2)
 
-    update.assert_called_once_with(tb.id, external_id=str(job_id))
+    update.assert_called_once_with(tb.id, external_id=str(job_id), return_task=False)
 
 
 @pytest.mark.usefixtures("_bind_settings")
@@ -217,7 +217,7 @@ def test_defer_async_records_job_id_as_external_id(app):
     ):
         job_id = asyncio.run(add_ext_async.defer_async(a=1, b=2))
 
-    update.assert_called_once_with(tb.id, external_id=str(job_id))
+    update.assert_called_once_with(tb.id, external_id=str(job_id), return_task=False)
 
 
 def test_defer_no_external_id_when_untracked(app):
@@ -409,6 +409,10 @@ def test_record_task_args_stores_kwargs(app):
     }
 
 
+def test_serialize_kwargs_big_ints():
+    assert _serialize_kwargs({"id": 2**64, "ids": [10**30]}) == {"id": 2**64, "ids": [10**30]}
+
+
 @pytest.mark.usefixtures("_bind_settings")
 def test_pass_context_forwards_context(app):
     seen = {}
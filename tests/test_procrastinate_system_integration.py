@@ -161,3 +161,14 @@ def test_track_plus_auto_track_no_double_wrap(app):
     jobs = list(app.connector.jobs.values())
     args = jobs[0]["args"]
     assert list(args).count(TB_TASK_ID_KWARG) == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_run_worker_warms_up_connection(app):
+    ProcrastinateSystemIntegration(app=app)
+    ProcrastinateSystemIntegration(app=app)
+
+    with mock.patch("taskbadger.procrastinate.client_pool.warm_up") as warm_up:
+        asyncio.run(app.run_worker_async(wait=False, install_signal_handlers=False))
+
+    warm_up.assert_called_once()
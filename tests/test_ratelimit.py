@@ -0,0 +1,154 @@
+import asyncio
+import warnings
+from http import HTTPStatus
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import RateLimitPolicy, TransportConfig, update_task
+from taskbadger._deadline import hook_deadline
+from taskbadger._ratelimit import AsyncRateLimitTransport, RateLimiter, RateLimitTransport
+from taskbadger._transport import ClientPool
+from taskbadger.exceptions import DeadlineExceeded, RateLimited
+from taskbadger.internal.types import Response
+from taskbadger.mug import Settings
+from taskbadger.sdk import init
+
+URL = "https://taskbadger.net/api/org/proj/tasks/"
+POLICY = RateLimitPolicy(rate=10, burst=2, max_wait=1)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(round(delay, 3))
+        self.now += delay
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with mock.patch("taskbadger._ratelimit.time", clock), mock.patch("taskbadger._deadline.time", clock):
+        yield clock
+
+
+def _client(policy=POLICY, limiter=None):
+    return httpx.Client(transport=RateLimitTransport(httpx.HTTPTransport(), policy, limiter or RateLimiter()))
+
+
+def test_burst_then_paced(httpx_mock, clock):
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    with _client() as client:
+        for _ in range(4):
+            client.get(URL)
+    assert clock.sleeps == [0.1, 0.1]
+
+
+def test_refill(httpx_mock, clock):
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    with _client() as client:
+        client.get(URL)
+        client.get(URL)
+        clock.now += 0.2
+        client.get(URL)
+        client.get(URL)
+    assert clock.sleeps == []
+
+
+def test_max_wait_exceeded(httpx_mock, clock):
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    with _client(RateLimitPolicy(rate=1, burst=1, max_wait=0.5)) as client:
+        client.get(URL)
+        with pytest.raises(RateLimited) as e:
+            client.get(URL)
+        assert e.value.retry_after == pytest.approx(1)
+        # the token is given back
+        clock.now += 1
+        client.get(URL)
+    assert len(httpx_mock.get_requests()) == 2
+    assert clock.sleeps == []
+
+
+def test_buckets_per_project(httpx_mock, clock):
+    other = "https://taskbadger.net/api/org/other/tasks/"
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    httpx_mock.add_response(url=other, json={}, is_reusable=True)
+    with _client() as client:
+        client.get(URL)
+        client.get(URL)
+        client.get(other)
+        client.get(other)
+    assert clock.sleeps == []
+
+
+def test_adapts_to_429(httpx_mock, clock):
+    httpx_mock.add_response(url=URL, status_code=429, headers={"Retry-After": "2"})
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+    limiter = RateLimiter()
+    policy = RateLimitPolicy(rate=10, burst=10, max_wait=5)
+    with _client(policy, limiter) as client:
+        assert client.get(URL).status_code == 429
+        bucket = next(iter(limiter._buckets.values()))
+        assert bucket.rate == 5
+        # paused for the Retry-After period
+        client.get(URL)
+        assert clock.sleeps == [2]
+        # the rate recovers as requests succeed
+        for _ in range(10):
+            client.get(URL)
+    assert bucket.rate == 10
+
+
+def test_deadline(httpx_mock, clock):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "proj", "token", hook_deadline=0.05)
+    try:
+        httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+        with _client(RateLimitPolicy(rate=10, burst=1)) as client, hook_deadline():
+            client.get(URL)
+            with pytest.raises(DeadlineExceeded):
+                client.get(URL)
+    finally:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            init("org", "proj", "token")
+
+
+def test_async(httpx_mock, clock):
+    httpx_mock.add_response(url=URL, json={}, is_reusable=True)
+
+    async def _run():
+        transport = AsyncRateLimitTransport(httpx.AsyncHTTPTransport(), POLICY, RateLimiter())
+        with mock.patch("taskbadger._ratelimit.asyncio.sleep") as sleep:
+            async with httpx.AsyncClient(transport=transport) as client:
+                for _ in range(3):
+                    await client.get(URL)
+        return sleep
+
+    sleep = asyncio.run(_run())
+    sleep.assert_awaited_once_with(pytest.approx(0.1))
+
+
+def test_configured_in_pool():
+    settings = Settings("https://taskbadger.net", "token", "org", "proj", transport=TransportConfig(retry=None))
+    assert not isinstance(ClientPool()._client_kwargs(settings, is_async=False)["transport"], RateLimitTransport)
+    settings.transport = TransportConfig(retry=None, rate_limit=RateLimitPolicy())
+    assert isinstance(ClientPool()._client_kwargs(settings, is_async=False)["transport"], RateLimitTransport)
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_429_raises_rate_limited():
+    with mock.patch("taskbadger.sdk._update") as update:
+        update.return_value = Response(HTTPStatus.TOO_MANY_REQUESTS, b"", {"Retry-After": "5"}, None)
+        with pytest.raises(RateLimited) as e:
+            update_task("task_id", value=1)
+    assert e.value.status_code == 429
+    assert e.value.retry_after == 5
@@ -0,0 +1,213 @@
+import asyncio
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import StatusEnum, update_task
+from taskbadger._registry import TaskRegistry, registry
+from taskbadger._sequence import sequencer
+from taskbadger.procrastinate import _update_status
+from taskbadger.sdk import create_task, get_task, get_task_async
+from tests.test_sdk_primatives import _json_task_response
+from tests.utils import task_for_test
+
+URL = "https://taskbadger.net/api/org/proj/tasks/"
+
+
+def _json_task(**kwargs):
+    return _json_task_response(id="task_id", **kwargs)
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_create_then_get(httpx_mock):
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json=_json_task())
+    created = create_task("task")
+    task = get_task("task_id")
+    assert task.id == "task_id"
+    assert task._task is not created._task
+    assert len(httpx_mock.get_requests()) == 1
+    assert registry.hits == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_update_then_get(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}task_id/", method="PATCH", json=_json_task(status="success"))
+    update_task("task_id", status=StatusEnum.SUCCESS)
+    assert get_task("task_id").status == StatusEnum.SUCCESS
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_stale_after_unparsed_update(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}task_id/", method="PATCH", json=_json_task(value=1), is_reusable=True)
+    httpx_mock.add_response(url=f"{URL}task_id/", method="GET", json=_json_task(value=2))
+    update_task("task_id", value=1)
+    update_task("task_id", value=2, return_task=False)
+    assert get_task("task_id").value == 2
+    assert [r.method for r in httpx_mock.get_requests()] == ["PATCH", "PATCH", "GET"]
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_stale_after_queued_update():
+    registry.record(task_for_test(id="task_id"))
+    sequencer.next("task_id")  # update queued for background dispatch
+    assert registry.get("task_id") is None
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_fresh(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}task_id/", method="GET", json=_json_task(value=5))
+    registry.record(task_for_test(id="task_id", value=1))
+    assert get_task("task_id", fresh=True).value == 5
+    # the fetched task replaces the recorded one
+    assert get_task("task_id").value == 5
+
+
+def test_ttl():
+    local_registry = TaskRegistry(ttl=10)
+    with mock.patch("taskbadger._registry.time.monotonic", return_value=100):
+        local_registry.record(task_for_test(id="task_id"))
+    with mock.patch("taskbadger._registry.time.monotonic", return_value=109):
+        assert local_registry.get("task_id") is not None
+    with mock.patch("taskbadger._registry.time.monotonic", return_value=110):
+        assert local_registry.get("task_id") is None
+    assert (local_registry.hits, local_registry.misses) == (1, 1)
+
+
+def test_out_of_order_responses():
+    sequencer.next("task_id")
+    sequencer.next("task_id")
+    registry.record(task_for_test(id="task_id", value=2), seq=2)
+    registry.record(task_for_test(id="task_id", value=1), seq=1)
+    assert registry.get("task_id").value == 2
+
+
+def test_copies():
+    task = task_for_test(id="task_id", value=1)
+    registry.record(task)
+    task.value = 2
+    registry.get("task_id").value = 3
+    assert registry.get("task_id").value == 1
+
+
+def test_maxsize():
+    local_registry = TaskRegistry(maxsize=2)
+    for task_id in ("a", "b", "c"):
+        local_registry.record(task_for_test(id=task_id))
+    assert local_registry.get("a") is None
+    assert local_registry.get("c") is not None
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_integration_no_read_before_write(httpx_mock):
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json=_json_task())
+    httpx_mock.add_response(url=f"{URL}task_id/", method="PATCH", json=_json_task(status="success"))
+    create_task("task")
+    _update_status("task_id", StatusEnum.SUCCESS)
+    assert [r.method for r in httpx_mock.get_requests()] == ["POST", "PATCH"]
+
+
+def _etag_responses(httpx_mock, etag='"v1"', **kwargs):
+    """Serve the task with an ETag, or 304 if the request has a matching If-None-Match."""
+
+    def respond(request):
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=_json_task(**kwargs), headers={"ETag": etag})
+
+    httpx_mock.add_callback(respond, url=f"{URL}task_id/", method="GET", is_reusable=True)
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_revalidate_not_modified(httpx_mock):
+    _etag_responses(httpx_mock, data={"rows": 500})
+    assert get_task("task_id").data == {"rows": 500}
+    task = get_task("task_id", fresh=True)
+    assert task.data == {"rows": 500}
+    requests = httpx_mock.get_requests()
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert registry.revalidated == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_revalidate_modified(httpx_mock):
+    registry.record(task_for_test(id="task_id", value=1), headers={"ETag": '"v0"'})
+    _etag_responses(httpx_mock, etag='"v1"', value=2)
+    assert get_task("task_id", fresh=True).value == 2
+    assert httpx_mock.get_requests()[0].headers["If-None-Match"] == '"v0"'
+    assert registry.conditional_headers("task_id") == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_revalidate_after_unparsed_update(httpx_mock):
+    httpx_mock.add_response(
+        url=f"{URL}task_id/", method="PATCH", json=_json_task(value=1), headers={"ETag": '"v1"'}, is_reusable=True
+    )
+    _etag_responses(httpx_mock, etag='"v2"', value=2)
+    update_task("task_id", value=1)
+    update_task("task_id", value=2, return_task=False)
+    assert get_task("task_id").value == 2
+    assert httpx_mock.get_requests(method="GET")[0].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_revalidate_evicted(httpx_mock):
+    registry.record(task_for_test(id="task_id", value=1), headers={"ETag": '"v1"'})
+
+    def respond(request):
+        registry.discard("task_id")
+        if request.headers.get("If-None-Match"):
+            return httpx.Response(304)
+        return httpx.Response(200, json=_json_task(value=1))
+
+    httpx_mock.add_callback(respond, url=f"{URL}task_id/", method="GET", is_reusable=True)
+    assert get_task("task_id", fresh=True).value == 1
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_last_modified(httpx_mock):
+    last_modified = "Wed, 01 May 2024 10:00:00 GMT"
+    registry.record(task_for_test(id="task_id"), headers={"Last-Modified": last_modified})
+    httpx_mock.add_response(url=f"{URL}task_id/", method="GET", status_code=304)
+    get_task("task_id", fresh=True)
+    assert httpx_mock.get_requests()[0].headers["If-Modified-Since"] == last_modified
+
+
+def test_not_recorded_while_update_in_flight():
+    seq = sequencer.next("task_id")
+    registry.record(task_for_test(id="task_id", value=1))
+    assert registry.conditional_headers("task_id") == {}
+    sequencer.acknowledge("task_id", seq)
+    registry.record(task_for_test(id="task_id", value=2), headers={"ETag": '"v2"'})
+    assert registry.get("task_id").value == 2
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_revalidate_async(httpx_mock):
+    _etag_responses(httpx_mock, value=3)
+    registry.record(task_for_test(id="task_id", value=3), headers={"ETag": '"v1"'})
+    task = asyncio.run(get_task_async("task_id", fresh=True))
+    assert task.value == 3
+    assert registry.revalidated == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_returned_task_changes_not_recorded(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}task_id/", method="GET", json=_json_task(data={"a": 1}))
+    task = get_task("task_id")
+    task.data["local"] = "oops"
+    task.tags["tag"] = "changed"
+    task = get_task("task_id")
+    assert task.data == {"a": 1}
+    assert task.tags == {"tag": "value"}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+def test_recorded_task_changes_not_recorded():
+    task = task_for_test(id="task_id", data={"a": 1})
+    registry.record(task)
+    task.data["local"] = "oops"
+    assert registry.get("task_id").data == {"a": 1}
@@ -0,0 +1,79 @@
+import json
+from unittest import mock
+
+import pytest
+
+from taskbadger import Action, EmailIntegration, StatusEnum, _json, create_task, get_task, update_task
+from taskbadger._requests import tasks_path, update_body, update_request
+from taskbadger.internal.api.task_endpoints import task_partial_update
+from taskbadger.sdk import _update_request_args, _update_task_args
+from tests.test_sdk_primatives import _json_task_response
+
+FIELDS = ("name", "status", "value", "value_max", "data", "max_runtime", "stale_timeout", "actions", "tags")
+
+
+@pytest.mark.usefixtures("_bind_settings")
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {},
+        {"status": StatusEnum.SUCCESS, "value": 100},
+        {"status": StatusEnum.PROCESSING, "value": 0, "data": {}},
+        {"name": "new", "value_max": 10, "data": {"a": [1, 2]}, "max_runtime": 5, "stale_timeout": 10},
+        {"tags": {"a": "b"}, "queue": "q", "external_id": "1"},
+        {"data": {"id": 2**64}},
+    ],
+)
+def test_update_body_matches_generated(fields):
+    args = [fields.get(name) for name in FIELDS + ("queue", "external_id")]
+    generated = task_partial_update._get_kwargs(**_update_task_args("task_id", *args))
+    request = update_request(**_update_request_args("task_id", *args))
+    assert json.loads(request["content"]) == generated["json"]
+    assert request["url"] == generated["url"]
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_update_body_actions():
+    body = update_body(status=StatusEnum.ERROR, actions=[Action("error", EmailIntegration("me@example.com"))])
+    assert body == {
+        "actions": [{"trigger": "error", "integration": "email", "config": {"to": "me@example.com"}}],
+        "status": "error",
+    }
+
+
+def test_update_body_status():
+    assert update_body(status="processing") == {"status": "processing"}
+    with pytest.raises(ValueError, match="not a valid StatusEnum"):
+        update_body(status="running")
+
+
+def test_tasks_path_quoted():
+    assert tasks_path("my org", "a/b") == "/api/my%20org/a%2Fb/tasks/"
+    assert update_request("org", "project", "id/1", {})["url"] == "/api/org/project/tasks/id%2F1/"
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_requests_use_codec(httpx_mock):
+    url = "https://taskbadger.net/api/org/proj/tasks/"
+    httpx_mock.add_response(url=url, method="POST", status_code=201, json=_json_task_response(id="task_id"))
+    httpx_mock.add_response(url=f"{url}task_id/", method="PATCH", json=_json_task_response(id="task_id", value=1))
+    httpx_mock.add_response(url=f"{url}task_id/", method="GET", json=_json_task_response(id="task_id", value=1))
+    calls = []
+
+    def dumps(obj):
+        calls.append("dumps")
+        return json.dumps(obj).encode()
+
+    def loads(data):
+        calls.append("loads")
+        return json.loads(data)
+
+    with mock.patch.object(_json, "codec", _json.Codec("recording", dumps, loads)):
+        create_task("name", data={"stdout": "output"})
+        assert update_task("task_id", value=1).value == 1
+        assert get_task("task_id", fresh=True).value == 1
+    assert calls == ["dumps", "loads", "dumps", "loads", "loads"]
+    create, update, _ = httpx_mock.get_requests()
+    assert json.loads(create.content)["data"] == {"stdout": "output"}
+    assert create.headers["Content-Type"] == "application/json"
+    assert json.loads(update.content) == {"value": 1}
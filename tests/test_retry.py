@@ -0,0 +1,244 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import create_task
+from taskbadger._retry import (
+    AsyncRetryTransport,
+    RetryBudget,
+    RetryTransport,
+    idempotency_key,
+    idempotent,
+    parse_retry_after,
+    retry_budget,
+)
+from taskbadger._transport import ClientPool
+from taskbadger.mug import Badger, RetryPolicy, Settings, TransportConfig
+from tests.test_sdk_primatives import _json_task_response
+
+URL = "https://taskbadger.net/api/org/proj/tasks/"
+POLICY = RetryPolicy(backoff_factor=0.1, jitter=False)
+CREATES_POLICY = RetryPolicy(backoff_factor=0.1, jitter=False, retry_creates=True)
+
+
+@pytest.fixture(autouse=True)
+def _reset_budget():
+    retry_budget.reset()
+    yield
+    retry_budget.reset()
+
+
+@pytest.fixture
+def sleep():
+    with mock.patch("taskbadger._retry.time.sleep") as sleep:
+        yield sleep
+
+
+def _client(policy=POLICY, budget=None):
+    return httpx.Client(transport=RetryTransport(httpx.HTTPTransport(), policy, budget))
+
+
+def test_get_retried_on_server_error(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503)
+    httpx_mock.add_response(url=URL, method="GET", status_code=502)
+    httpx_mock.add_response(url=URL, method="GET", json={})
+    with _client() as client:
+        assert client.get(URL).status_code == 200
+    assert sleep.call_args_list == [mock.call(0.1), mock.call(0.2)]
+
+
+def test_patch_retried_on_read_error(httpx_mock, sleep):
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"), url=URL, method="PATCH")
+    httpx_mock.add_response(url=URL, method="PATCH", json={})
+    with _client() as client:
+        assert client.patch(URL, json={"value": 1}).status_code == 200
+    assert sleep.call_count == 1
+
+
+def test_max_retries(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=500, is_reusable=True)
+    with _client(RetryPolicy(max_retries=2, jitter=False)) as client:
+        assert client.get(URL).status_code == 500
+    assert sleep.call_count == 2
+    assert len(httpx_mock.get_requests()) == 3
+
+
+def test_client_error_not_retried(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=404)
+    with _client() as client:
+        assert client.get(URL).status_code == 404
+    sleep.assert_not_called()
+
+
+def test_post_not_retried(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="POST", status_code=503)
+    with _client() as client:
+        assert client.post(URL, json={}).status_code == 503
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"), url=URL, method="POST")
+    with _client() as client, pytest.raises(httpx.ReadTimeout):
+        client.post(URL, json={})
+    sleep.assert_not_called()
+
+
+def test_post_with_idempotency_key_not_retried_by_default(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="POST", status_code=503)
+    with _client() as client:
+        assert client.post(URL, json={}, headers={"Idempotency-Key": "abc"}).status_code == 503
+    sleep.assert_not_called()
+
+
+def test_post_retried_with_idempotency_key(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="POST", status_code=503)
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json={})
+    with _client(CREATES_POLICY) as client:
+        assert client.post(URL, json={}, headers={"Idempotency-Key": "abc"}).status_code == 201
+
+
+def test_idempotency_key_reused_by_retries(httpx_mock, sleep):
+    httpx_mock.add_exception(httpx.ReadTimeout("timeout"), url=URL, method="POST")
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json={})
+    with _client(CREATES_POLICY) as client, idempotent("abc"):
+        assert client.post(URL, json={}).status_code == 201
+        # only POST requests get the key
+        httpx_mock.add_response(url=URL, method="GET", json={})
+        client.get(URL)
+    first, second, get = httpx_mock.get_requests()
+    assert first.headers["Idempotency-Key"] == second.headers["Idempotency-Key"] == "abc"
+    assert "Idempotency-Key" not in get.headers
+
+
+def test_idempotency_key():
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    other = Settings("https://taskbadger.net", "token", "org", "other")
+    assert idempotency_key(settings, "job1") == idempotency_key(settings, "job1")
+    assert idempotency_key(settings, "job1") != idempotency_key(settings, "job2")
+    assert idempotency_key(settings, "job1") != idempotency_key(other, "job1")
+    assert idempotency_key(settings) != idempotency_key(settings)
+
+
+@pytest.fixture
+def _bind_retry_creates():
+    transport = TransportConfig(retry=CREATES_POLICY)
+    Badger.current.bind(Settings("https://taskbadger.net", "token", "org", "proj", transport=transport))
+    yield
+    Badger.current.bind(None)
+
+
+@pytest.mark.usefixtures("_bind_retry_creates")
+def test_create_task_idempotent(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="POST", status_code=503)
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json=_json_task_response(), is_reusable=True)
+    create_task("name", external_id="job1")
+    create_task("name")
+    first, retried, other = httpx_mock.get_requests()
+    assert first.headers["Idempotency-Key"] == retried.headers["Idempotency-Key"]
+    assert first.headers["Idempotency-Key"] == idempotency_key(Badger.current.settings, "job1")
+    assert other.headers["Idempotency-Key"] != first.headers["Idempotency-Key"]
+
+
+def test_post_retried_on_connect_error(httpx_mock, sleep):
+    httpx_mock.add_exception(httpx.ConnectError("refused"), url=URL, method="POST")
+    httpx_mock.add_response(url=URL, method="POST", status_code=201, json={})
+    with _client() as client:
+        assert client.post(URL, json={}).status_code == 201
+
+
+def test_retry_after(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=429, headers={"Retry-After": "3"})
+    httpx_mock.add_response(url=URL, method="GET", json={})
+    with _client() as client:
+        assert client.get(URL).status_code == 200
+    sleep.assert_called_once_with(3.0)
+
+
+def test_retry_after_too_long(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503, headers={"Retry-After": "120"})
+    with _client() as client:
+        assert client.get(URL).status_code == 503
+    sleep.assert_not_called()
+
+
+def test_jitter(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503)
+    httpx_mock.add_response(url=URL, method="GET", json={})
+    with mock.patch("taskbadger._retry.random.uniform", return_value=0.05) as uniform:
+        with _client(RetryPolicy(backoff_factor=0.1)) as client:
+            client.get(URL)
+    uniform.assert_called_once_with(0, 0.1)
+    sleep.assert_called_once_with(0.05)
+
+
+def test_budget_exhausted(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503, is_reusable=True)
+    policy = RetryPolicy(max_retries=5, jitter=False, backoff_factor=0, budget_burst=2, budget_ratio=0)
+    with _client(policy, RetryBudget()) as client:
+        assert client.get(URL).status_code == 503
+        assert client.get(URL).status_code == 503
+    assert sleep.call_count == 2
+    assert len(httpx_mock.get_requests()) == 4
+
+
+def test_budget_refills():
+    budget = RetryBudget()
+    policy = RetryPolicy(budget_burst=1, budget_ratio=0.5)
+    assert budget.withdraw(policy)
+    assert not budget.withdraw(policy)
+    budget.deposit(policy)
+    budget.deposit(policy)
+    assert budget.withdraw(policy)
+
+
+def test_async_retry(httpx_mock):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503)
+    httpx_mock.add_response(url=URL, method="GET", json={})
+
+    async def _run():
+        transport = AsyncRetryTransport(httpx.AsyncHTTPTransport(), RetryPolicy(backoff_factor=0))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get(URL)
+
+    assert asyncio.run(_run()).status_code == 200
+
+
+def test_pooled_client_retries(httpx_mock, sleep):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503)
+    httpx_mock.add_response(url=URL, method="GET", json={})
+    pool = ClientPool()
+    try:
+        client = pool.get_httpx_client(Settings("https://taskbadger.net", "token", "org", "proj"))
+        assert client.get("/api/org/proj/tasks/").status_code == 200
+    finally:
+        pool.close()
+
+
+def test_pooled_client_retries_disabled(httpx_mock):
+    httpx_mock.add_response(url=URL, method="GET", status_code=503)
+    pool = ClientPool()
+    try:
+        settings = Settings("https://taskbadger.net", "token", "org", "proj", transport=TransportConfig(retry=None))
+        assert pool.get_httpx_client(settings).get("/api/org/proj/tasks/").status_code == 503
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("5", 5.0),
+        ("-1", 0.0),
+        ("soon", None),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 < parse_retry_after(format_datetime(when, usegmt=True)) <= 30
@@ -3,7 +3,7 @@ import warnings
 import pytest
 
 from taskbadger import create_task, init
-from taskbadger.mug import GLOBAL_MUG, Badger
+from taskbadger.mug import GLOBAL_MUG, Badger, Scope
 from tests.test_sdk_primatives import _json_task_response, _verify_task
 
 
@@ -73,3 +73,55 @@ def test_create_task_with_scope(httpx_mock):
         )
         task = create_task("name", data={"bar": "buzzer"}, tags={"name1": "value1"})
         _verify_task(task)
+
+
+def test_scope_layers_share_data():
+    scope = Scope()
+    scope["big"] = "x" * 1000
+    scope["rows"] = [1]
+    with scope:
+        # the layer below is not copied until a mutable value is read
+        assert scope.context._base["big"] is scope.stack[0][0]["big"]
+        assert scope.context.flatten() == {"big": "x" * 1000, "rows": [1]}
+        assert scope.context._base["rows"] is not scope.context["rows"]
+
+
+def test_scope_layers_isolated():
+    scope = Scope()
+    scope["rows"] = [1]
+    scope["name"] = "outer"
+    outer = scope.context
+    with scope:
+        # changes to the layer below made after entering are not visible
+        outer["rows"].append(2)
+        outer["extra"] = 1
+        assert scope.context == {"rows": [1], "name": "outer"}
+        del scope.context["name"]
+        assert "name" not in scope.context
+        with pytest.raises(KeyError):
+            del scope.context["name"]
+        scope.context["name"] = "inner"
+        assert scope.merge_data({"other": 1}) == {"rows": [1], "name": "inner", "other": 1}
+    assert scope.context == {"rows": [1, 2], "name": "outer", "extra": 1}
+
+
+def test_scope_assigned_dict():
+    scope = Scope()
+    scope.context = {"rows": [1]}
+    with scope:
+        scope.context["rows"].append(2)
+        scope.tag({"name": "value"})
+        assert scope.merge_tags(None) == {"name": "value"}
+    assert scope.context == {"rows": [1]}
+
+
+def test_badger_copy_scope():
+    parent = Badger()
+    parent.scope()["rows"] = [1]
+    parent.scope().tag({"name": "value"})
+    child = Badger(parent)
+    child.scope().context["rows"].append(2)
+    child.scope().tags.clear()
+    assert parent.scope().context == {"rows": [1]}
+    assert parent.scope().tags == {"name": "value"}
+    assert child.scope().merge_tags({"a": "b"}) == {"a": "b"}
@@ -1,12 +1,14 @@
 import datetime
+import threading
 import warnings
 from http import HTTPStatus
 from unittest import mock
 
 import pytest
 
-from taskbadger import Action, EmailIntegration, StatusEnum, WebhookIntegration, create_task
-from taskbadger.exceptions import TaskbadgerException
+from taskbadger import Action, EmailIntegration, StatusEnum, WebhookIntegration, create_task, create_task_safe
+from taskbadger.decorators import _update_safe
+from taskbadger.exceptions import TaskbadgerException, UnexpectedStatus
 from taskbadger.internal.models import (
     PatchedTaskRequest,
     TaskRequest,
@@ -14,7 +16,7 @@ from taskbadger.internal.models import (
 from taskbadger.internal.types import UNSET, Response
 from taskbadger.mug import Badger
 from taskbadger.sdk import Task, init
-from tests.utils import task_for_test
+from tests.utils import task_for_test, update_body
 
 
 @pytest.fixture(autouse=True)
@@ -31,26 +33,29 @@ def settings():
 
 @pytest.fixture
 def patched_get():
-    with mock.patch("taskbadger.sdk.task_get.sync") as get:
+    with mock.patch("taskbadger.sdk._get") as get:
         yield get
 
 
 @pytest.fixture
 def patched_create():
-    with mock.patch("taskbadger.sdk.task_create.sync_detailed") as create:
+    with mock.patch("taskbadger.sdk._create") as create:
         yield create
 
 
 @pytest.fixture
 def patched_update():
-    with mock.patch("taskbadger.sdk.task_partial_update.sync_detailed") as update:
+    with (
+        mock.patch("taskbadger.sdk._update") as update,
+        mock.patch("taskbadger.sdk._patch_task", new=update),
+    ):
         yield update
 
 
 def test_get(patched_get):
     data = {"a": 1}
     api_task = task_for_test(data=data)
-    patched_get.return_value = api_task
+    patched_get.return_value = Response(HTTPStatus.OK, b"", {}, api_task)
     fetched_task = Task.get("test_id")
     assert fetched_task.id == api_task.id
     assert fetched_task.data == data
@@ -229,7 +234,9 @@ def test_ping(settings, patched_update):
     assert len(patched_update.call_args_list) == 0
 
     assert task.ping()
-    _verify_update(settings, patched_update)
+    patched_update.assert_called_with(
+        client=mock.ANY, organization_slug="org", project_slug="project", id=task.id, body={}
+    )
     assert task.updated > updated_at
 
     assert not task.ping(rate_limit=1)
@@ -383,3 +390,102 @@ def _verify_update(settings, patched_update, **kwargs):
         id=mock.ANY,
         body=request,
     )
+
+
+def test_create_no_wait(patched_create, patched_update):
+    created = threading.Event()
+
+    def _create(**kwargs):
+        created.wait(5)
+        return Response(HTTPStatus.CREATED, b"", {}, task_for_test(id="task_id", data={"server": 1}))
+
+    patched_create.side_effect = _create
+    patched_update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test(id="task_id"))
+
+    with Badger.current.scope() as scope:
+        scope["context"] = "value"
+        task = create_task("task name", value=1, data={"a": 1}, wait=False)
+    assert task.name == "task name"
+    assert task.value == 1
+    assert task.data == {"context": "value", "a": 1}
+    assert not task.wait(timeout=0)
+
+    # buffered until the task exists
+    task.update(value=5, data={"b": 2}, data_merge_strategy="default")
+    task.tag({"x": "1"})
+    assert task.value == 5
+    assert task.tags == {"x": "1"}
+    patched_update.assert_not_called()
+
+    created.set()
+    assert task.id == "task_id"
+    assert task.wait(timeout=5)
+    patched_update.assert_called_once()
+    body = update_body(patched_update.call_args)
+    assert body["value"] == 5
+    # merged with the data returned by the server
+    assert body["data"] == {"server": 1, "b": 2}
+    assert body["tags"] == {"x": "1"}
+
+    task.success()
+    assert patched_update.call_count == 2
+    assert patched_update.call_args.kwargs["body"].status == StatusEnum.SUCCESS
+
+
+def test_create_no_wait_data_merged_with_created_task(patched_create, patched_update):
+    created = threading.Event()
+
+    def _create(**kwargs):
+        created.wait(5)
+        return Response(HTTPStatus.CREATED, b"", {}, task_for_test(id="task_id", data={"server": 1}))
+
+    patched_create.side_effect = _create
+    patched_update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test(id="task_id"))
+
+    task = create_task("task name", data={"a": 1}, wait=False)
+    task._send_update({"value": 3})
+    _update_safe(task, status=StatusEnum.ERROR, data={"exception": "boom"}, data_merge_strategy="default")
+    assert task.data == {"a": 1, "exception": "boom"}
+
+    created.set()
+    assert task.wait(timeout=5)
+    body = update_body(patched_update.call_args)
+    assert body["value"] == 3
+    assert body["status"] == "error"
+    # merged with the data returned by the server, not the local copy
+    assert body["data"] == {"server": 1, "exception": "boom"}
+
+
+def test_create_no_wait_buffered_data(patched_create, patched_update):
+    created = threading.Event()
+
+    def _create(**kwargs):
+        created.wait(5)
+        return Response(HTTPStatus.CREATED, b"", {}, task_for_test(id="task_id", data={"server": 1}))
+
+    patched_create.side_effect = _create
+    patched_update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test(id="task_id"))
+
+    task = create_task("task name", wait=False)
+    task._send_update({"value": 3, "data": {"b": 2}})
+    created.set()
+    assert task.wait(timeout=5)
+    assert update_body(patched_update.call_args) == {"value": 3, "data": {"b": 2}}
+
+
+def test_create_no_wait_error(patched_create):
+    patched_create.return_value = Response(HTTPStatus.BAD_REQUEST, b"", {}, None)
+    task = create_task("task name", wait=False)
+    with pytest.raises(UnexpectedStatus):
+        task.wait(timeout=5)
+    with pytest.raises(UnexpectedStatus):
+        task.update(value=1)
+
+
+def test_create_safe_no_wait_error(patched_create, patched_update):
+    patched_create.return_value = Response(HTTPStatus.BAD_REQUEST, b"", {}, None)
+    task = create_task_safe("task name", wait=False)
+    assert not task.wait(timeout=5)
+    assert task.id is None
+    task.update(value=1)
+    patched_update.assert_not_called()
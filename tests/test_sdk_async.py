@@ -0,0 +1,158 @@
+import asyncio
+import warnings
+from unittest import mock
+
+import pytest
+
+from taskbadger import AsyncSession, AsyncTask, StatusEnum, create_task_async, get_task_async, update_task_async
+from taskbadger._transport import client_pool
+from taskbadger.exceptions import ServerError
+from taskbadger.mug import Badger
+from taskbadger.sdk import init
+from tests.test_sdk_primatives import _json_task_response, _verify_task
+from tests.utils import task_for_test
+
+
+@pytest.fixture(autouse=True)
+def _init_skd():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token")
+
+
+def test_get_task_async(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="GET",
+        match_headers={"Authorization": "Bearer token"},
+        json=_json_task_response(),
+        status_code=200,
+    )
+
+    task = asyncio.run(get_task_async("test_id"))
+    assert isinstance(task, AsyncTask)
+    _verify_task(task)
+
+
+def test_create_task_async(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/",
+        method="POST",
+        match_headers={"Authorization": "Bearer token"},
+        match_json={"name": "name", "status": "pending", "tags": {"env": "test"}},
+        json=_json_task_response(),
+        status_code=201,
+    )
+    task = asyncio.run(create_task_async("name", tags={"env": "test"}))
+    _verify_task(task)
+
+
+def test_create_task_async_error(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/",
+        method="POST",
+        status_code=500,
+        is_reusable=True,
+    )
+    with mock.patch("taskbadger._retry.asyncio.sleep"), pytest.raises(ServerError):
+        asyncio.run(create_task_async("name"))
+
+
+def test_update_task_async(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={"status": "success", "value": 100},
+        json=_json_task_response(status="success", value=100),
+        status_code=200,
+    )
+    task = asyncio.run(update_task_async("test_id", status=StatusEnum.SUCCESS, value=100))
+    _verify_task(task, status="success", value=100)
+
+
+def test_update_task_async_no_return(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={"value": 10},
+        content=b"not json",
+        status_code=200,
+    )
+    assert asyncio.run(update_task_async("test_id", value=10, return_task=False)) is True
+
+
+def test_async_task_methods(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="GET",
+        json=_json_task_response(value=10),
+    )
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={"value": 15},
+        json=_json_task_response(value=15),
+    )
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={"status": "success", "data": {"custom": "value", "new": 1}},
+        json=_json_task_response(status="success", value=15, data={"custom": "value", "new": 1}),
+    )
+
+    async def _run():
+        task = await AsyncTask.get("test_id")
+        await task.increment_value(5)
+        assert task.value == 15
+        await task.update(status=StatusEnum.SUCCESS, data={"new": 1}, data_merge_strategy="default")
+        return task
+
+    task = asyncio.run(_run())
+    assert task.status == "success"
+    assert task.data == {"custom": "value", "new": 1}
+
+
+def test_async_session_shares_client_per_loop():
+    async def _get_clients():
+        async with AsyncSession() as client1, AsyncSession() as client2:
+            return client1.get_async_httpx_client(), client2.get_async_httpx_client()
+
+    async def _run():
+        clients = await _get_clients()
+        await client_pool.aclose()
+        return clients
+
+    first = asyncio.run(_run())
+    second = asyncio.run(_run())
+    assert first[0] is first[1]
+    assert first[0] is not second[0]
+    assert first[0].is_closed
+
+
+def test_async_session_not_configured():
+    settings = Badger.current.settings
+    Badger.current.bind(None)
+    try:
+
+        async def _run():
+            async with AsyncSession() as client:
+                return client
+
+        assert asyncio.run(_run()) is None
+    finally:
+        Badger.current.bind(settings)
+
+
+def test_ping_async(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={},
+        content=b"not json",
+        status_code=200,
+    )
+    task = AsyncTask(task_for_test(id="test_id"))
+    updated_at = task.updated
+    assert asyncio.run(task.ping())
+    assert task.updated > updated_at
+    assert not asyncio.run(task.ping(rate_limit=1))
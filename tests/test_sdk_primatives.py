@@ -51,6 +51,7 @@ def test_create_task_error_unauthed(httpx_mock):
 
 
 def test_create_task_error_server_error(httpx_mock):
+    # creates aren't retried unless ``RetryPolicy.retry_creates`` is set
     httpx_mock.add_response(
         url="https://taskbadger.net/api/org/project/tasks/",
         method="POST",
@@ -91,6 +92,28 @@ def test_update_task(httpx_mock):
     _verify_task(task)
 
 
+def test_update_task_no_return(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        match_json={"value": 10},
+        content=b"not json",
+        status_code=200,
+    )
+    # the response isn't decoded
+    assert update_task(task_id="test_id", value=10, return_task=False) is True
+
+
+def test_update_task_no_return_error(httpx_mock):
+    httpx_mock.add_response(
+        url="https://taskbadger.net/api/org/project/tasks/test_id/",
+        method="PATCH",
+        status_code=401,
+    )
+    with pytest.raises(Unauthorized):
+        update_task(task_id="test_id", value=10, return_task=False)
+
+
 def test_update_task_actions(httpx_mock):
     expected_body = {
         "actions": [
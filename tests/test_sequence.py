@@ -0,0 +1,150 @@
+import warnings
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+from taskbadger import DispatchConfig, StatusEnum, update_task, update_task_safe
+from taskbadger._dispatch import dispatcher
+from taskbadger._sequence import Sequencer, sequencer
+from taskbadger._spool import _send
+from taskbadger.exceptions import UnexpectedStatus
+from taskbadger.internal.types import Response
+from taskbadger.sdk import init
+from tests.utils import task_for_test, update_body
+
+
+def _init(dispatch=None):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        init("org", "project", "token", dispatch=dispatch)
+
+
+@pytest.fixture
+def patched_update():
+    with (
+        mock.patch("taskbadger.sdk._update") as update,
+        mock.patch("taskbadger.sdk._patch_task", new=update),
+    ):
+        update.return_value = Response(HTTPStatus.OK, b"", {}, task_for_test())
+        yield update
+
+
+@pytest.fixture
+def _background():
+    # hold queued updates until they are flushed
+    _init(DispatchConfig(coalesce_window=60))
+    yield
+    dispatcher.flush()
+    _init()
+
+
+def test_stale_update_discarded():
+    local_sequencer = Sequencer()
+    first = local_sequencer.next("task_id")
+    second = local_sequencer.next("task_id")
+    local_sequencer.acknowledge("task_id", second, {"value": 90})
+    assert local_sequencer.check("task_id", first, {"value": 40}) is None
+    assert local_sequencer.check("task_id", second, {"value": 90}) == {"value": 90}
+    assert local_sequencer.check("other", first, {"value": 1}) == {"value": 1}
+    assert local_sequencer.discarded == 1
+
+
+def test_stale_update_fields_not_overwritten_sent():
+    local_sequencer = Sequencer()
+    first = local_sequencer.next("task_id")
+    second = local_sequencer.next("task_id")
+    local_sequencer.acknowledge("task_id", second, {"value": 90, "data": None, "tags": {"env": "prod"}})
+    fields = {"value": 40, "data": {"rows": 10}, "tags": {"env": "dev", "region": "eu"}}
+    assert local_sequencer.check("task_id", first, fields) == {"data": {"rows": 10}, "tags": {"region": "eu"}}
+    assert local_sequencer.discarded == 0
+
+
+def test_terminal_status_not_overwritten():
+    local_sequencer = Sequencer()
+    local_sequencer.start("task_id", StatusEnum.SUCCESS)
+    seq = local_sequencer.next("task_id")
+    assert local_sequencer.check("task_id", seq, {"status": StatusEnum.PROCESSING, "value": 5}) == {"value": 5}
+    assert local_sequencer.check("task_id", seq, {"status": StatusEnum.PROCESSING}) is None
+    assert local_sequencer.check("task_id", seq, {"status": StatusEnum.ERROR}) == {"status": StatusEnum.ERROR}
+
+
+def test_bounded():
+    local_sequencer = Sequencer(maxsize=2)
+    for task_id in ["a", "b", "c"]:
+        local_sequencer.acknowledge(task_id, local_sequencer.next(task_id))
+    assert list(local_sequencer._tasks) == ["b", "c"]
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_acknowledged_on_success(patched_update):
+    update_task("task_id", value=1)
+    patched_update.return_value = Response(HTTPStatus.BAD_REQUEST, b"", {}, None)
+    with pytest.raises(UnexpectedStatus):
+        update_task("task_id", value=2)
+    assert sequencer._tasks["task_id"].acknowledged == 1
+    assert sequencer._tasks["task_id"].issued == 2
+
+
+@pytest.mark.usefixtures("_background")
+def test_queued_update_older_than_inline_not_sent(patched_update):
+    assert update_task_safe("task_id", value=40) is None
+    update_task("task_id", value=90)
+    assert dispatcher.flush(timeout=5)
+    patched_update.assert_called_once()
+    assert patched_update.call_args.kwargs["body"].value == 90
+
+
+@pytest.mark.usefixtures("_background")
+def test_queued_update_fields_not_set_inline_sent(patched_update):
+    assert update_task_safe("task_id", tags={"env": "prod"}, data={"rows": 10}) is None
+    update_task("task_id", value=5)
+    assert dispatcher.flush(timeout=5)
+    assert [update_body(c) for c in patched_update.call_args_list] == [
+        {"value": 5},
+        {"tags": {"env": "prod"}, "data": {"rows": 10}},
+    ]
+
+
+@pytest.mark.usefixtures("_background")
+def test_queued_update_after_inline_sent(patched_update):
+    update_task("task_id", value=40)
+    assert update_task_safe("task_id", value=90) is None
+    assert dispatcher.flush(timeout=5)
+    assert [update_body(c)["value"] for c in patched_update.call_args_list] == [40, 90]
+
+
+@pytest.mark.usefixtures("_background")
+def test_queued_status_does_not_overwrite_terminal(patched_update):
+    assert update_task_safe("task_id", status=StatusEnum.PROCESSING, value=50) is None
+    update_task("task_id", status=StatusEnum.SUCCESS)
+    assert update_task_safe("task_id", value=100) is None
+    assert dispatcher.flush(timeout=5)
+    assert patched_update.call_count == 2
+    body = update_body(patched_update.call_args)
+    assert "status" not in body
+    assert body["value"] == 100
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_spooled_status_does_not_overwrite_terminal():
+    sequencer.start("task_id", StatusEnum.SUCCESS)
+    with mock.patch("taskbadger.sdk.update_task") as update:
+        _send("update", "task_id", {"status": "processing"})
+        update.assert_not_called()
+        _send("update", "task_id", {"status": "processing", "value": 5})
+        update.assert_called_once_with("task_id", return_task=False, value=5)
+
+
+def test_sequence_assigned_when_queued(patched_update):
+    _init(DispatchConfig(coalesce_window=60))
+    try:
+        update_task_safe("task_id", value=1)
+        first = dispatcher._low["task_id"].seq
+        update_task_safe("task_id", value=2)
+        merged = dispatcher._low["task_id"].seq
+        assert merged > first
+        assert dispatcher.flush(timeout=5)
+        assert sequencer._tasks["task_id"].acknowledged == merged
+    finally:
+        _init()
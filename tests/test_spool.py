@@ -0,0 +1,217 @@
+import logging
+import time
+from http import HTTPStatus
+from unittest import mock
+
+import httpx
+import pytest
+
+from taskbadger import SpoolConfig, StatusEnum, TransportConfig, create_task_safe, update_task_safe
+from taskbadger._spool import Spool, spool
+from taskbadger.exceptions import ServerError, UnexpectedStatus
+from taskbadger.mug import Badger, Settings
+from tests.test_sdk_primatives import _json_task_response
+
+URL = "https://taskbadger.net/api/org/proj/tasks/"
+
+
+@pytest.fixture
+def config(tmp_path):
+    return SpoolConfig(tmp_path / "spool.db", replay_interval=60)
+
+
+@pytest.fixture(autouse=True)
+def _bind(config):
+    Badger.current.bind(
+        Settings("https://taskbadger.net", "token", "org", "proj", transport=TransportConfig(retry=None), spool=config)
+    )
+    spool.reset()
+    yield
+    spool.close()
+    spool.reset()
+    Badger.current.bind(None)
+
+
+def _rows(local_spool):
+    settings = Badger.current.settings
+    local_spool._mug = Badger(settings)
+    rows = []
+    while (row := local_spool._claim(settings)) is not None:
+        rows.append(row[1:])
+    return rows
+
+
+def test_updates_compacted():
+    local_spool = Spool()
+    local_spool.add_update("task1", {"status": StatusEnum.PROCESSING, "value": 1, "tags": {"a": "1"}})
+    local_spool.add_update("task2", {"value": 5})
+    local_spool.add_update("task1", {"value": 50, "tags": {"b": "2"}, "data": None})
+    local_spool.add_update("task1", {"status": StatusEnum.SUCCESS, "value": 100})
+    assert local_spool.pending() == 2
+
+    assert _rows(local_spool) == [
+        ("update", "task1", {"status": "success", "value": 100, "tags": {"a": "1", "b": "2"}}),
+        ("update", "task2", {"value": 5}),
+    ]
+
+
+def test_not_configured():
+    Badger.current.bind(Settings("https://taskbadger.net", "token", "org", "proj"))
+    assert not Spool().add_update("task1", {"value": 1})
+
+
+def test_spool_full(config, tmp_path):
+    Badger.current.settings.spool = SpoolConfig(tmp_path / "full.db", max_entries=1)
+    local_spool = Spool()
+    assert local_spool.add_update("task1", {"value": 1})
+    assert local_spool.add_update("task1", {"value": 2})
+    assert not local_spool.add_update("task2", {"value": 1})
+
+
+def test_unserializable_not_spooled(caplog):
+    with caplog.at_level(logging.WARNING, logger="taskbadger"):
+        assert not Spool().add_update("task1", {"data": {"obj": object()}})
+    assert "Error spooling update" in caplog.text
+
+
+def test_replay_in_order():
+    local_spool = Spool()
+    local_spool.add_update("task2", {"status": StatusEnum.PROCESSING, "value": 1})
+    local_spool.add_update("task1", {"status": StatusEnum.SUCCESS})
+    calls = []
+    with mock.patch("taskbadger.sdk.update_task", side_effect=lambda task_id, **kw: calls.append((task_id, kw))):
+        assert local_spool.replay() == 2
+    assert calls == [
+        ("task2", {"return_task": False, "status": StatusEnum.PROCESSING, "value": 1}),
+        ("task1", {"return_task": False, "status": StatusEnum.SUCCESS}),
+    ]
+    assert local_spool.pending() == 0
+
+
+def test_replay_stops_on_transient_error():
+    local_spool = Spool()
+    local_spool.add_update("task1", {"status": StatusEnum.PROCESSING, "value": 1})
+    local_spool.add_update("task2", {"value": 1})
+
+    def _update(task_id, **kwargs):
+        # an update queued while the first one is being sent
+        local_spool.add_update("task1", {"value": 2})
+        raise ServerError(503, b"")
+
+    with mock.patch("taskbadger.sdk.update_task", side_effect=_update) as update:
+        assert local_spool.replay() == 0
+    update.assert_called_once()
+    assert _rows(local_spool) == [
+        ("update", "task1", {"status": "processing", "value": 2}),
+        ("update", "task2", {"value": 1}),
+    ]
+
+
+def test_replay_keeps_updates_merged_while_sending():
+    local_spool = Spool()
+    local_spool.add_update("task1", {"value": 1})
+    calls = []
+
+    def _update(task_id, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            # an update spooled while the first one is being sent
+            local_spool.add_update("task1", {"value": 2})
+
+    with mock.patch("taskbadger.sdk.update_task", side_effect=_update):
+        assert local_spool.replay() == 2
+    assert [call["value"] for call in calls] == [1, 2]
+    assert local_spool.pending() == 0
+
+
+def test_claimed_row_survives_crash(config):
+    crashed = Spool()
+    crashed.add_update("task1", {"value": 1})
+    assert _rows(crashed) == [("update", "task1", {"value": 1})]
+    # the process is killed before the update is sent: the row is still claimed by it
+    crashed.close()
+
+    local_spool = Spool()
+    local_spool._mug = Badger(Badger.current.settings)
+    assert local_spool.pending() == 1
+    with mock.patch("taskbadger.sdk.update_task") as update:
+        assert local_spool.replay() == 0
+        with mock.patch("taskbadger._spool.time.time", return_value=time.time() + config.claim_timeout + 1):
+            assert local_spool.replay() == 1
+    update.assert_called_once_with("task1", return_task=False, value=1)
+    assert local_spool.pending() == 0
+
+
+def test_replay_drops_rejected(caplog):
+    local_spool = Spool()
+    local_spool.add_update("task1", {"value": 1})
+    local_spool.add_update("task2", {"value": 1})
+    with mock.patch("taskbadger.sdk.update_task", side_effect=[UnexpectedStatus(400, b""), None]):
+        with caplog.at_level(logging.WARNING, logger="taskbadger"):
+            assert local_spool.replay() == 1
+    assert "Dropping spooled update" in caplog.text
+    assert local_spool.pending() == 0
+
+
+def test_replay_matches_project():
+    local_spool = Spool()
+    local_spool.add_update("task1", {"value": 1})
+    Badger.current.bind(
+        Settings("https://taskbadger.net", "token", "org", "other", spool=Badger.current.settings.spool)
+    )
+    local_spool._mug = Badger(Badger.current.settings)
+    assert local_spool.pending() == 0
+    assert local_spool.replay() == 0
+
+
+def test_safe_sdk_spools_when_unavailable(httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectError("refused"), url=URL, method="POST")
+    httpx_mock.add_response(url=f"{URL}task1/", method="PATCH", status_code=503)
+    assert create_task_safe("name", value=1) is None
+    assert update_task_safe("task1", status=StatusEnum.SUCCESS) is None
+    # creates are not spooled: later updates to the task couldn't be sent
+    assert _rows(spool) == [("update", "task1", {"status": "success"})]
+
+
+def test_safe_sdk_rejected_not_spooled(httpx_mock):
+    httpx_mock.add_response(url=f"{URL}task1/", method="PATCH", status_code=400)
+    assert update_task_safe("task1", status=StatusEnum.SUCCESS) is None
+    assert spool.pending() == 0
+
+
+def test_replayed_after_success(httpx_mock, config):
+    httpx_mock.add_response(url=f"{URL}task1/", method="PATCH", status_code=503)
+    httpx_mock.add_response(url=f"{URL}task2/", method="PATCH", json=_json_task_response())
+    httpx_mock.add_response(
+        url=f"{URL}task1/", method="PATCH", match_json={"status": "success"}, json=_json_task_response()
+    )
+
+    update_task_safe("task1", status=StatusEnum.SUCCESS)
+    assert spool.pending() == 1
+
+    # a successful request wakes up the replay thread
+    assert update_task_safe("task2", value=1) is not None
+    _wait_for(lambda: spool.pending() == 0)
+    assert [(r.method, r.url.path) for r in httpx_mock.get_requests()][-1] == ("PATCH", "/api/org/proj/tasks/task1/")
+
+
+def test_dispatch_errors_spooled():
+    from taskbadger import DispatchConfig
+    from taskbadger._dispatch import dispatcher
+
+    Badger.current.settings.dispatch = DispatchConfig(coalesce_window=0)
+    with (
+        mock.patch("taskbadger.sdk._update") as update,
+        mock.patch("taskbadger.sdk._patch_task", new=update),
+    ):
+        update.return_value = mock.Mock(status_code=HTTPStatus.BAD_GATEWAY, content=b"")
+        update_task_safe("task1", value=5)
+        assert dispatcher.flush(timeout=5)
+    assert spool.pending() == 1
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
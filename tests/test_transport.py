@@ -0,0 +1,175 @@
+import os
+import threading
+
+import httpcore
+import httpx
+import pytest
+
+from taskbadger._integrations import task_cache
+from taskbadger._transport import ClientPool, _environment_proxies, client_pool
+from taskbadger.mug import Badger, Session, Settings, TransportConfig
+
+
+@pytest.fixture
+def pool():
+    pool = ClientPool()
+    yield pool
+    pool.close()
+
+
+def test_pool_shares_httpx_client(pool):
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    client1 = pool.get_client(settings)
+    client2 = pool.get_client(settings)
+    assert client1 is not client2
+    assert client1.get_httpx_client() is client2.get_httpx_client()
+    assert client1.get_httpx_client().headers["Authorization"] == "Bearer token"
+
+
+def test_pool_keyed_by_settings(pool):
+    client1 = pool.get_httpx_client(Settings("https://taskbadger.net", "token1", "org", "proj"))
+    client2 = pool.get_httpx_client(Settings("https://taskbadger.net", "token2", "org", "proj"))
+    client3 = pool.get_httpx_client(Settings("https://example.com", "token1", "org", "proj"))
+    assert len({id(client1), id(client2), id(client3)}) == 3
+
+
+def test_pool_transport_config(pool):
+    transport = TransportConfig(connect_timeout=1, read_timeout=2, max_connections=3)
+    settings = Settings("https://taskbadger.net", "token", "org", "proj", transport=transport)
+    client = pool.get_httpx_client(settings)
+    assert client.timeout == httpx.Timeout(connect=1, read=2, write=5, pool=5)
+    assert client is not pool.get_httpx_client(Settings("https://taskbadger.net", "token", "org", "proj"))
+    same_transport = TransportConfig(connect_timeout=1, read_timeout=2, max_connections=3)
+    same_settings = Settings("https://taskbadger.net", "token", "org", "proj", transport=same_transport)
+    assert client is pool.get_httpx_client(same_settings)
+
+
+@pytest.mark.parametrize("is_async", [False, True])
+def test_pool_env_proxy(pool, monkeypatch, is_async):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    monkeypatch.setenv("NO_PROXY", "internal.example.com")
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    client_cls = httpx.AsyncClient if is_async else httpx.Client
+    client = client_cls(**pool._client_kwargs(settings, is_async=is_async))
+    transport = client._transport_for_url(httpx.URL("https://taskbadger.net/api/"))
+    assert transport is not client._transport
+    # the proxy transport is wrapped like the default one
+    while hasattr(transport, "transport"):
+        transport = transport.transport
+    assert isinstance(transport._pool, (httpcore.HTTPProxy, httpcore.AsyncHTTPProxy))
+    assert client._transport_for_url(httpx.URL("https://internal.example.com/")) is client._transport
+
+
+def test_environment_proxies(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "all_proxy", "no_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTPS_PROXY", "proxy.example.com:3128")
+    monkeypatch.setenv("HTTP_PROXY", "http://proxy.example.com:8080")
+    monkeypatch.setenv("NO_PROXY", "localhost, 10.0.0.1,::1,.internal.example.com,http://plain.example.com")
+    assert _environment_proxies() == {
+        "http://": "http://proxy.example.com:8080",
+        "https://": "http://proxy.example.com:3128",
+        "all://localhost": None,
+        "all://10.0.0.1": None,
+        "all://[::1]": None,
+        "all://*.internal.example.com": None,
+        "http://plain.example.com": None,
+    }
+    monkeypatch.setenv("NO_PROXY", "*")
+    assert _environment_proxies() == {}
+
+
+def test_pool_env_proxy_not_trusted(pool, monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    transport = TransportConfig(httpx_args={"trust_env": False})
+    settings = Settings("https://taskbadger.net", "token", "org", "proj", transport=transport)
+    client = pool.get_httpx_client(settings)
+    assert client._transport_for_url(httpx.URL("https://taskbadger.net/api/")) is client._transport
+
+
+def test_pool_close(pool):
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    client = pool.get_httpx_client(settings)
+    pool.close()
+    assert client.is_closed
+    assert pool.get_httpx_client(settings) is not client
+
+
+def test_pool_threads(pool):
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    clients = []
+    barrier = threading.Barrier(5, timeout=5)
+
+    def _get():
+        barrier.wait()
+        clients.append(pool.get_httpx_client(settings))
+
+    threads = [threading.Thread(target=_get) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(c) for c in clients}) == 1
+
+
+@pytest.mark.usefixtures("_bind_settings")
+def test_session_does_not_close_pooled_client():
+    with Session() as client:
+        httpx_client = client.get_httpx_client()
+    assert not httpx_client.is_closed
+    with Session() as client:
+        assert client.get_httpx_client() is httpx_client
+    assert Badger.current.session().client is None
+    assert client_pool.get_httpx_client(Badger.current.settings) is httpx_client
+
+
+def test_pool_reset_does_not_close(pool):
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    client = pool.get_httpx_client(settings)
+    pool.reset()
+    assert not client.is_closed
+    assert pool.get_httpx_client(settings) is not client
+    client.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+@pytest.mark.usefixtures("_bind_settings")
+def test_fork_discards_inherited_state():
+    task_cache.set("task_id", "task")
+    with Session() as parent_client:
+        parent_httpx = parent_client.get_httpx_client()
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - runs in the child
+            session = Badger.current.session()
+            ok = (
+                session.client is not None
+                and session.client.get_httpx_client() is not parent_httpx
+                and client_pool.get_httpx_client(Badger.current.settings) is session.client.get_httpx_client()
+                and task_cache.get("task_id") is None
+                and not parent_httpx.is_closed
+            )
+            os.write(write_fd, b"1" if ok else b"0")
+            os._exit(0)
+
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd, "rb") as fp:
+            assert fp.read() == b"1"
+
+        # parent state is untouched
+        assert Badger.current.session().client is parent_client
+        assert client_pool.get_httpx_client(Badger.current.settings) is parent_httpx
+        assert task_cache.get("task_id") == "task"
+
+
+def test_warm_up(pool, httpx_mock):
+    httpx_mock.add_response(url="https://taskbadger.net/", method="HEAD", status_code=200)
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    assert pool.warm_up(settings)
+
+
+def test_warm_up_error(pool, httpx_mock):
+    httpx_mock.add_exception(httpx.ConnectError("boom"), url="https://taskbadger.net/")
+    settings = Settings("https://taskbadger.net", "token", "org", "proj")
+    assert not pool.warm_up(settings)
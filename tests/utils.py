@@ -21,3 +21,9 @@ def task_for_test(**kwargs):
         "task_name",
         **kwargs,
     )
+
+
+def update_body(call) -> dict:
+    """The JSON body of a mocked update call, whether it was sent with a model or a plain dict body."""
+    body = call.kwargs["body"]
+    return body if isinstance(body, dict) else body.to_dict()